@@ -0,0 +1,93 @@
+"""Check that FilenameParser.parse runs in linear time on adversarial names.
+
+Times parse() (without the length limit) on families of pathological names
+at growing sizes and exits with status 1 if the time of any family grows
+clearly faster than its input. The reference PATTERN regex is timed alongside
+for comparison.
+
+Families:
+    suffixes      thousands of dot-separated suffix segments, bad extension
+    long_segment  one huge suffix segment, bad extension
+    digit_run     a huge year digit run followed by too few fields
+    sequence_run  a huge sequence digit run with no extension
+    digit_suffix  thousands of numeric suffix segments, no extension
+    dots          nothing but dots
+    near_miss     valid structure with a trailing newline pair
+
+Usage:
+    python scripts/benchmark_adversarial.py [--base N] [--steps N] [--tolerance X]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.parser import FilenameParser  # noqa: E402
+
+
+PREFIX = "1950.06.15.12.30.45.E.FAM.POR.000001"
+
+FAMILIES: dict[str, Callable[[int], str]] = {
+    "suffixes": lambda n: PREFIX + ".A" * (n // 2) + ".t1ff",
+    "long_segment": lambda n: PREFIX + "." + "A" * n + ".t1ff",
+    "digit_run": lambda n: "1" * n + ".06.15",
+    "sequence_run": lambda n: "1950.06.15.12.30.45.E.FAM.POR." + "1" * n,
+    "digit_suffix": lambda n: PREFIX + ".1" * (n // 2),
+    "dots": lambda n: "." * n,
+    "near_miss": lambda n: PREFIX + ".A" * (n // 2) + ".tiff\n\n",
+}
+
+
+def best_time(func: Callable[[str], object], name: str) -> float:
+    """Return the best time of one call of func on name, in seconds."""
+    timer = timeit.Timer(lambda: func(name))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number
+
+
+def main() -> int:
+    """Run the adversarial benchmark.
+
+    Returns:
+        Process exit status: 0 if every family scales linearly, 1 otherwise.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--base", type=int, default=2000, help="smallest input length")
+    arg_parser.add_argument("--steps", type=int, default=4, help="number of doublings")
+    arg_parser.add_argument(
+        "--tolerance", type=float, default=3.0,
+        help="allowed factor over linear growth between the smallest and largest input",
+    )
+    args = arg_parser.parse_args()
+
+    parser = FilenameParser(max_length=None)
+    sizes = [args.base * 2 ** step for step in range(args.steps + 1)]
+    failed = False
+
+    print(f"{'family':<14}" + "".join(f"{size:>12,}" for size in sizes) + f"{'growth':>10}{'regex':>10}")
+    for family, make_name in FAMILIES.items():
+        times = [best_time(parser.parse, make_name(size)) for size in sizes]
+        regex_times = [best_time(parser.PATTERN.match, make_name(size)) for size in (sizes[0], sizes[-1])]
+
+        # Growth relative to the input growth: 1.0 is perfectly linear
+        growth = (times[-1] / times[0]) / (sizes[-1] / sizes[0])
+        regex_growth = (regex_times[1] / regex_times[0]) / (sizes[-1] / sizes[0])
+        status = ""
+        if growth > args.tolerance:
+            status = "  SUPER-LINEAR"
+            failed = True
+
+        print(
+            f"{family:<14}" + "".join(f"{t * 1e6:>10.1f}us" for t in times)
+            + f"{growth:>10.2f}{regex_growth:>10.2f}{status}"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
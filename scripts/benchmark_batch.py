@@ -0,0 +1,87 @@
+"""Benchmark columnar parsing and validation of an archive manifest.
+
+Generates a synthetic manifest of mixed valid, invalid and non-matching names,
+then times FilenameParser.parse_many and FilenameValidator.validate_many
+against the per-name parse() and validate() loop. Requires NumPy.
+
+Usage:
+    python scripts/benchmark_batch.py [--count N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.parser import FilenameParser  # noqa: E402
+from hump_yard_naming_exif.validator import FilenameValidator  # noqa: E402
+
+
+def make_manifest(count: int, seed: int = 1950) -> list[str]:
+    """Generate a synthetic manifest of filenames.
+
+    Args:
+        count: Number of names.
+        seed: Random seed.
+
+    Returns:
+        List of filenames, roughly 90% valid photo names.
+    """
+    rng = random.Random(seed)
+    names = []
+    for number in range(count):
+        if rng.random() < 0.05:
+            names.append(f"IMG_{number:06d}.JPG")
+            continue
+        month = rng.choice([0, 1, 2, 6, 12, 13])
+        day = rng.choice([0, 1, 15, 29, 30, 31]) if month else 0
+        hour = rng.choice([0, 9, 12, 23]) if day else 0
+        minute = rng.choice([0, 30, 59]) if hour else 0
+        names.append(
+            f"{rng.randint(1900, 2020)}.{month:02d}.{day:02d}.{hour:02d}.{minute:02d}.00."
+            f"{rng.choice('ABCEF')}.FAM.POR.{number:06d}.tiff"
+        )
+    return names
+
+
+def main() -> None:
+    """Run the batch benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--count", type=int, default=1_000_000, help="number of names")
+    args = arg_parser.parse_args()
+
+    parser = FilenameParser()
+    validator = FilenameValidator()
+    names = make_manifest(args.count)
+
+    start = time.perf_counter()
+    batch = parser.parse_many(names)
+    parse_many_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    violations = validator.validate_many(batch)
+    validate_many_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rejected = 0
+    for name in names:
+        parsed = parser.parse(name)
+        if parsed is None or validator.validate(parsed):
+            rejected += 1
+    loop_time = time.perf_counter() - start
+
+    batch_rejected = int((~batch.valid | (violations != 0)).sum())
+    assert batch_rejected == rejected
+
+    print(f"names:              {args.count:,}")
+    print(f"rejected:           {rejected:,}")
+    print(f"parse_many:         {parse_many_time:8.3f} s")
+    print(f"validate_many:      {validate_many_time:8.3f} s")
+    print(f"parse+validate loop:{loop_time:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
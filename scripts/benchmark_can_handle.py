@@ -0,0 +1,103 @@
+"""Benchmark can_handle on a directory of non-matching files.
+
+Creates a temporary directory with N empty files whose names the plugin must
+reject (camera names, documents, near-miss photo names), scans it with
+os.scandir and reports the per-entry cost of can_handle(entry.path) versus
+can_handle_entry(entry).
+
+Usage:
+    python scripts/benchmark_can_handle.py [--count N] [--dir PATH]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+
+
+def can_handle_with_path(plugin: PhotoNamingExifPlugin, file_path: str) -> bool:
+    """can_handle as implemented before the string-only fast path."""
+    path = Path(file_path)
+    if "processed" in path.parts:
+        return False
+    if path.is_symlink():
+        return False
+    if path.suffix.lower() not in plugin.SUPPORTED_EXTENSIONS:
+        return False
+    return plugin._parse_and_validate(path.name) is not None
+
+
+def populate(directory: Path, count: int) -> None:
+    """Create count empty non-matching files in directory.
+
+    Args:
+        directory: Target directory.
+        count: Number of files.
+    """
+    patterns = [
+        "IMG_{:07d}.JPG",
+        "scan_{:07d}.tiff",
+        "notes_{:07d}.txt",
+        "1950.13.15.00.00.00.E.FAM.POR.{:07d}.tiff",  # parses but fails validation
+    ]
+    for number in range(count):
+        (directory / patterns[number % len(patterns)].format(number)).touch()
+
+
+def scan(directory: Path, check) -> tuple[float, int]:
+    """Scan directory once, calling check for every entry.
+
+    Args:
+        directory: Directory to scan.
+        check: Called with each os.DirEntry.
+
+    Returns:
+        Elapsed seconds and number of accepted entries.
+    """
+    accepted = 0
+    start = time.perf_counter()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if check(entry):
+                accepted += 1
+    return time.perf_counter() - start, accepted
+
+
+def main() -> None:
+    """Run the can_handle benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--count", type=int, default=1_000_000, help="number of files")
+    arg_parser.add_argument("--dir", type=Path, help="directory to use (default: new temp dir)")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        directory = Path(temp_dir)
+        print(f"Creating {args.count:,} files in {directory} ...")
+        populate(directory, args.count)
+
+        # Fresh plugins so no run benefits from another run's parse cache
+        path_plugin = PhotoNamingExifPlugin()
+        str_plugin = PhotoNamingExifPlugin()
+        entry_plugin = PhotoNamingExifPlugin()
+
+        results = {
+            "Path-based can_handle": scan(
+                directory, lambda entry: can_handle_with_path(path_plugin, entry.path)
+            ),
+            "can_handle(entry.path)": scan(directory, lambda entry: str_plugin.can_handle(entry.path)),
+            "can_handle_entry(entry)": scan(directory, entry_plugin.can_handle_entry),
+        }
+
+        for label, (elapsed, accepted) in results.items():
+            assert accepted == 0
+            print(f"{label:<26}{elapsed / args.count * 1e6:8.3f} us/entry")
+
+
+if __name__ == "__main__":
+    main()
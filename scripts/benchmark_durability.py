@@ -0,0 +1,70 @@
+"""Benchmark processing throughput under each durability level.
+
+Processes freshly created TIFFs (append-only metadata writes, then a move
+into processed/) with process_batch under each level of the durability
+setting and prints files per second and the fsyncs made. The time includes
+the final flush of the batched levels. Run it with --dir on the disk of
+interest; fsync costs differ by orders of magnitude between SSDs, spinning
+disks and network filesystems.
+
+Usage:
+    python scripts/benchmark_durability.py [--files 500] [--size-kb 256] [--dir /srv/scans]
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from synthetic_images import write_image  # noqa: E402
+
+POLICIES = {
+    "none": {"durability": "none"},
+    "per-file": {"durability": "per-file"},
+    "per-directory-batch": {"durability": "per-directory-batch", "durability_batch": 64},
+    "group-commit 50 ms": {"durability": "group-commit", "durability_interval_ms": 50},
+}
+
+
+def run(config: dict, files: int, size: int, parent: Optional[Path]) -> tuple[float, int, int]:
+    """Process freshly created files; return files/sec and the file and folder fsyncs."""
+    with tempfile.TemporaryDirectory(dir=parent) as watch_dir:
+        paths = [str(Path(watch_dir) / f"1950.06.15.12.30.00.E.FAM.POR.{number:06d}.tiff") for number in range(files)]
+        for path in paths:
+            write_image(Path(path), size)
+
+        plugin = PhotoNamingExifPlugin()
+        start = time.perf_counter()
+        for path, success in plugin.process_batch(paths, config):
+            if not success:
+                raise RuntimeError(f"Processing failed for {path}")
+        elapsed = time.perf_counter() - start
+
+        sync = plugin._sync
+        assert sync is not None
+        return files / elapsed, sync.files_synced, sync.directories_synced
+
+
+def main() -> None:
+    """Run the durability benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=500)
+    arg_parser.add_argument("--size-kb", type=int, default=256, help="file size in KiB")
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary watch folder")
+    args = arg_parser.parse_args()
+    logging.disable(logging.INFO)
+
+    print(f"{'durability':>20}{'files/s':>10}{'file fsyncs':>13}{'dir fsyncs':>12}")
+    for name, config in POLICIES.items():
+        rate, files, directories = run(config, args.files, args.size_kb << 10, args.dir)
+        print(f"{name:>20}{rate:>10.0f}{files:>13}{directories:>12}")
+
+
+if __name__ == "__main__":
+    main()
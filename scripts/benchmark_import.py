@@ -0,0 +1,115 @@
+"""Benchmark and guard the import time of the plugin package.
+
+Runs ``python -X importtime -c "import hump_yard_naming_exif"`` in fresh
+interpreters and reports the cumulative import time of the package, with
+and without the time of hump-yard itself (measured the same way), which
+the plugin cannot influence. Also checks that none of the modules that
+are meant to be imported lazily is loaded.
+
+Exits with status 1 if the median import time without hump-yard exceeds
+the budget or a lazily imported module was loaded, so it can run in CI.
+
+The default budget of 70 ms was set on the slow single-core VM the other
+benchmarks run on. There, the stdlib modules the plugin cannot avoid
+(logging, pathlib, typing, re, dataclasses) take about 40 ms, and the
+stub hump-yard installed there imports none of them. The original 20 ms
+budget was therefore never met on that machine, even when it was set.
+The 70 ms budget passes with the plugin modules imported lazily (52-65
+ms there), but fails with them imported eagerly, as before the lazy
+imports (69-79 ms). With a real hump-yard that imports those stdlib
+modules itself, pass a budget of about 20 ms.
+
+Usage:
+    python scripts/benchmark_import.py [--runs N] [--budget-ms MS]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_PATH = Path(__file__).parent.parent / "src"
+
+# Modules that only the code paths using them may import
+LAZY_MODULES = [
+    "pyexiv2", "asyncio", "multiprocessing", "concurrent.futures", "numpy", "ctypes", "sqlite3",
+    "mmap", "html", "xml.etree.ElementTree",
+]
+
+
+def run_python(code: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter with the source tree on the path.
+
+    Args:
+        code: Python code to run.
+        importtime: Run with ``-X importtime``.
+
+    Returns:
+        The finished process, with stdout and stderr captured.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_PATH), env.get("PYTHONPATH")]))
+    args = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", code]
+    return subprocess.run(args, env=env, capture_output=True, text=True, check=True)
+
+
+def import_time(module: str) -> tuple[float, float]:
+    """Measure the import time of a module in a fresh interpreter.
+
+    Args:
+        module: Module name.
+
+    Returns:
+        Tuple of (cumulative import time of the module, summed self time of
+        the hump_yard_naming_exif modules) in milliseconds.
+    """
+    stderr = run_python(f"import {module}", importtime=True).stderr
+    cumulative_ms = None
+    own_us = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        # import time: <self us> | <cumulative us> | <indented module name>
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        if name.split(".")[0] == "hump_yard_naming_exif":
+            own_us += int(self_us)
+        if name == module:
+            cumulative_ms = int(cumulative_us) / 1000
+    if cumulative_ms is None:
+        raise RuntimeError(f"No import time reported for {module}")
+    return cumulative_ms, own_us / 1000
+
+
+def main() -> None:
+    """Run the import-time benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--runs", type=int, default=15, help="interpreters per measurement")
+    arg_parser.add_argument("--budget-ms", type=float, default=70.0, help="allowed median import time")
+    args = arg_parser.parse_args()
+
+    plugin_runs = [import_time("hump_yard_naming_exif") for _ in range(args.runs)]
+    host_runs = [import_time("hump_yard.base_plugin") for _ in range(args.runs)]
+    plugin_times = [cumulative for cumulative, _ in plugin_runs]
+    plugin_ms = statistics.median(plugin_times)
+    without_host_ms = plugin_ms - statistics.median(cumulative for cumulative, _ in host_runs)
+    modules_ms = statistics.median(own for _, own in plugin_runs)
+
+    loaded = run_python(
+        "import sys, hump_yard_naming_exif; "
+        f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    ).stdout.split()
+
+    print(f"import hump_yard_naming_exif:      {plugin_ms:8.1f} ms median ({min(plugin_times):.1f} min)")
+    print(f"  without hump-yard:               {without_host_ms:8.1f} ms (budget {args.budget_ms:.1f} ms)")
+    print(f"  plugin modules themselves:       {modules_ms:8.1f} ms")
+    print(f"  lazily imported modules loaded:  {' '.join(loaded) or 'none'}")
+
+    if without_host_ms > args.budget_ms or loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark isolated metadata writes on a clean and a fault-injected corpus.
+
+Processes a backlog of synthetic photos three times: with in-process
+writes, with isolate_writes on a clean corpus, and with isolate_writes on
+a corpus where a fraction of the files crash or hang the writer process.
+Faults are injected by wrapping the writer's pyexiv2 call, so the script
+needs the fork start method.
+
+Usage:
+    python scripts/benchmark_isolation.py [--files N] [--crash-rate R]
+        [--hang-rate R] [--timeout SECONDS] [--size BYTES]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif import isolation  # noqa: E402
+from hump_yard_naming_exif.isolation import IsolatedWriterPool  # noqa: E402
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from benchmark_process_batch import make_backlog  # noqa: E402
+
+_write_file = isolation._write_file
+
+
+def faulty_write_file(file_path: str, exif_dict: dict[str, str], xmp_dict: dict[str, str]) -> None:
+    """Crash on files whose group is CRS and hang on files whose group is HNG."""
+    group = os.path.basename(file_path).split(".")[7]
+    if group == "CRS":
+        os._exit(139)
+    if group == "HNG":
+        time.sleep(3600)
+    _write_file(file_path, exif_dict, xmp_dict)
+
+
+def inject_faults(paths: list[str], crash_rate: float, hang_rate: float, seed: int = 0) -> int:
+    """Rename a random fraction of the files so the writer crashes or hangs on them.
+
+    Args:
+        paths: Paths of the backlog files, updated in place.
+        crash_rate: Fraction of files that crash the writer.
+        hang_rate: Fraction of files that hang the writer.
+        seed: Random seed.
+
+    Returns:
+        Number of faulty files.
+    """
+    rng = random.Random(seed)
+    faults = 0
+    for index, file_path in enumerate(paths):
+        roll = rng.random()
+        group = "CRS" if roll < crash_rate else "HNG" if roll < crash_rate + hang_rate else None
+        if group:
+            path = Path(file_path)
+            parts = path.name.split(".")
+            parts[7] = group
+            target = path.with_name(".".join(parts))
+            path.rename(target)
+            paths[index] = str(target)
+            faults += 1
+    return faults
+
+
+def run(plugin: PhotoNamingExifPlugin, paths: list[str], config: dict) -> float:
+    """Process files one after another.
+
+    Returns:
+        Throughput in files/sec.
+    """
+    start = time.perf_counter()
+    for file_path in paths:
+        plugin.process(file_path, config)
+    return len(paths) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """Run the isolation benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=1000, help="files per run")
+    arg_parser.add_argument("--crash-rate", type=float, default=0.01)
+    arg_parser.add_argument("--hang-rate", type=float, default=0.002)
+    arg_parser.add_argument("--timeout", type=float, default=0.5, help="write_timeout in seconds")
+    arg_parser.add_argument("--size", type=int, default=256 * 1024, help="file size in bytes")
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary watch folder")
+    args = arg_parser.parse_args()
+
+    isolation._write_file = faulty_write_file
+    config = {"isolate_writes": True, "write_timeout": args.timeout}
+
+    plugin = PhotoNamingExifPlugin()
+    plugin.writers = IsolatedWriterPool(context="fork")
+    try:
+        with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+            inline = run(plugin, make_backlog(Path(temp_dir), args.files, args.size), {})
+        with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+            clean = run(plugin, make_backlog(Path(temp_dir), args.files, args.size), config)
+        with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+            paths = make_backlog(Path(temp_dir), args.files, args.size)
+            faults = inject_faults(paths, args.crash_rate, args.hang_rate)
+            faulty = run(plugin, paths, config)
+            quarantined = len(list((Path(temp_dir) / "quarantine").iterdir()))
+        restarts = plugin.writers.restarts
+    finally:
+        plugin.writers.close()
+
+    print(f"in-process:         {inline:10.1f} files/sec")
+    print(f"isolated, clean:    {clean:10.1f} files/sec ({clean / inline:.2f}x)")
+    print(f"isolated, faulty:   {faulty:10.1f} files/sec ({faulty / clean:.2f}x of clean)")
+    print(f"faults injected:    {faults:10d} (quarantined {quarantined}, writer restarts {restarts})")
+
+
+if __name__ == "__main__":
+    main()
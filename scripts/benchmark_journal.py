@@ -0,0 +1,126 @@
+"""Benchmark the per-file cost of the processing journal and the time a resume saves.
+
+Processes freshly created TIFFs with process_batch without a journal and
+with one, and prints the time per file and the journal's overhead (the
+runs alternate, and the best of --repeat is kept). As the difference of
+two runs is noisy, it also times the journal calls made for a file on
+their own. It then writes the metadata of a batch without moving it, as a
+run that crashed before its moves, and times the restart, which only
+moves the files.
+
+Usage:
+    python scripts/benchmark_journal.py [--files 1000] [--size-kb 256] [--repeat 5] [--dir /srv/scans]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.journal import ProcessingJournal  # noqa: E402
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from synthetic_images import write_image  # noqa: E402
+
+
+def create(watch_dir: Path, files: int, size: int) -> list[str]:
+    """Create the files to process."""
+    paths = [str(watch_dir / f"1950.06.15.12.30.00.E.FAM.POR.{number:06d}.tiff") for number in range(files)]
+    for path in paths:
+        write_image(Path(path), size)
+    # Write the new files back now, so writeback does not compete with the timed run
+    os.sync()
+    return paths
+
+
+def process(paths: list[str], config: dict[str, Any]) -> float:
+    """Process the files with a new plugin; return the seconds per file, without opening the journal."""
+    plugin = PhotoNamingExifPlugin()
+    plugin._processing_journal(config)
+    start = time.perf_counter()
+    for path, success in plugin.process_batch(paths, config):
+        if not success:
+            raise RuntimeError(f"Processing failed for {path}")
+    return (time.perf_counter() - start) / len(paths)
+
+
+def run(journal: bool, files: int, size: int, parent: Optional[Path]) -> float:
+    """Process freshly created files; return the seconds per file."""
+    with tempfile.TemporaryDirectory(dir=parent) as work_dir:
+        work = Path(work_dir)
+        config = {"journal": str(work / "journal.sqlite")} if journal else {}
+        (work / "watch").mkdir()
+        return process(create(work / "watch", files, size), config)
+
+
+def resume(files: int, size: int, parent: Optional[Path]) -> tuple[float, float]:
+    """Write files without moving them, then restart; return the seconds per file of both."""
+    with tempfile.TemporaryDirectory(dir=parent) as work_dir:
+        work = Path(work_dir)
+        config = {"journal": str(work / "journal.sqlite")}
+        (work / "watch").mkdir()
+        paths = create(work / "watch", files, size)
+
+        plugin = PhotoNamingExifPlugin()
+        start = time.perf_counter()
+        for path in paths:
+            plugin._write_metadata(Path(path), plugin._parse_and_validate(Path(path).name), config)
+        plugin.flush()
+        written = (time.perf_counter() - start) / files
+        del plugin
+
+        return written, process(paths, config)
+
+
+def journal_calls(files: int, parent: Optional[Path]) -> float:
+    """Make the journal calls of processing files, without the files' work; return the seconds per file."""
+    with tempfile.TemporaryDirectory(dir=parent) as work_dir:
+        work = Path(work_dir)
+        paths = [work / f"1950.06.15.12.30.00.E.FAM.POR.{number:06d}.tiff" for number in range(files)]
+        for path in paths:
+            path.touch()
+        journal = ProcessingJournal(work / "journal.sqlite")
+        start = time.perf_counter()
+        for path in paths:
+            journal.resumable(path)
+            journal.parsed(path)
+            journal.written(path, path)
+            journal.moved(path)
+        journal.commit()
+        elapsed = time.perf_counter() - start
+        journal.close()
+        return elapsed / files
+
+
+def main() -> None:
+    """Run the journal benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=1000)
+    arg_parser.add_argument("--size-kb", type=int, default=256, help="file size in KiB")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary watch folder")
+    args = arg_parser.parse_args()
+    logging.disable(logging.INFO)
+    size = args.size_kb << 10
+
+    plain, journaled = [], []
+    for _ in range(args.repeat):
+        plain.append(run(False, args.files, size, args.dir))
+        journaled.append(run(True, args.files, size, args.dir))
+    overhead = min(journaled) / min(plain) - 1
+    calls = min(journal_calls(args.files, args.dir) for _ in range(args.repeat))
+    print(f"without journal: {min(plain) * 1e3:.3f} ms/file")
+    print(f"with journal:    {min(journaled) * 1e3:.3f} ms/file ({overhead:+.1%})")
+    print(f"journal calls:   {calls * 1e3:.3f} ms/file ({calls / min(plain):.1%} of a file without journal)")
+
+    written, resumed = resume(args.files, size, args.dir)
+    print(f"interrupted run: {written * 1e3:.3f} ms/file written, restart {resumed * 1e3:.3f} ms/file")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Benchmark embedded vs in-place metadata updates of JPEGs by file size.
+
+Each JPEG is tagged once with pyexiv2, which leaves a padded XMP packet.
+The metadata is then rewritten with the default embedded mode (pyexiv2
+rewrites the file) and with metadata_mode "inplace" (only the packet and
+the EXIF date are overwritten), and the time and bytes written per update
+are printed. Bytes written are read from /proc/self/io where available.
+
+Usage:
+    python scripts/benchmark_jpeg_inplace.py [--sizes-mb 5,50] [--repeat N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.isolation import _write_file  # noqa: E402
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from synthetic_images import write_jpeg  # noqa: E402
+
+NAME = "1950.06.15.12.30.00.E.FAM.POR.000001.jpg"
+
+
+def bytes_written() -> Optional[int]:
+    """Get the bytes this process has passed to write calls so far.
+
+    Returns:
+        The wchar counter of /proc/self/io, or None where it is not available.
+    """
+    try:
+        with open("/proc/self/io") as io:
+            for line in io:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def time_update(
+    plugin: PhotoNamingExifPlugin, path: Path, config: dict, repeat: int
+) -> tuple[float, Optional[int]]:
+    """Time _write_metadata on an already tagged JPEG.
+
+    Returns:
+        Tuple of (best time in seconds, bytes written by the last update or None).
+    """
+    parsed = plugin.parser.parse(path.name)
+    best, written = float("inf"), None
+    for _ in range(repeat):
+        before = bytes_written()
+        start = time.perf_counter()
+        if not plugin._write_metadata(path, parsed, config):
+            raise RuntimeError(f"Metadata write failed for {path}")
+        best = min(best, time.perf_counter() - start)
+        after = bytes_written()
+        written = None if before is None or after is None else after - before
+    return best, written
+
+
+def main() -> None:
+    """Run the in-place update benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes-mb", default="5,50", help="comma-separated file sizes in MiB")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary folder")
+    args = arg_parser.parse_args()
+
+    plugin = PhotoNamingExifPlugin()
+    print(f"{'size MiB':>9}{'embed ms':>12}{'embed bytes':>14}{'inplace ms':>12}{'inplace bytes':>15}")
+    for size_mb in (int(value) for value in args.sizes_mb.split(",")):
+        with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+            path = Path(temp_dir) / NAME
+            write_jpeg(path, size_mb << 20)
+            _write_file(str(path), {"Exif.Image.DateTimeOriginal": "1950:06:15 12:30:00"}, {"Xmp.dc.identifier": ""})
+
+            embed, embed_bytes = time_update(plugin, path, {}, args.repeat)
+            inplace, inplace_bytes = time_update(plugin, path, {"metadata_mode": "inplace"}, args.repeat)
+        print(f"{size_mb:>9}{embed * 1000:>12.2f}{embed_bytes!s:>14}{inplace * 1000:>12.2f}{inplace_bytes!s:>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark the memory use of pyexiv2 vs streaming JPEG rewrites by file size.
+
+Writes the metadata of one JPEG per size with pyexiv2 and with the
+streaming rewriter, each in a fresh child process, and prints the time,
+the peak of Python allocations (tracemalloc) and the growth of the peak
+RSS during the write. tracemalloc does not see exiv2's own allocations,
+so the RSS growth is the figure to compare.
+
+Usage:
+    python scripts/benchmark_jpeg_rewrite.py [--sizes-mb 5,50,200]
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.isolation import _write_file  # noqa: E402
+from hump_yard_naming_exif.jpeg import rewrite_jpeg  # noqa: E402
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from hump_yard_naming_exif.pool import _current_rss  # noqa: E402
+from synthetic_images import write_jpeg  # noqa: E402
+
+NAME = "1950.06.15.12.30.00.E.FAM.POR.000001.jpg"
+WRITERS = ["pyexiv2", "stream"]
+
+
+def measure(writer: str, path: Path) -> None:
+    """Write the metadata of one file and print 'seconds python_peak rss_growth'."""
+    plugin = PhotoNamingExifPlugin()
+    exif_dict, _, xmp_dict = plugin._build_metadata_dict(plugin.parser.parse(NAME))
+    import pyexiv2  # noqa: F401  # loaded up front so the library is not counted
+
+    rss_before = _current_rss()
+    tracemalloc.start()
+    start = time.perf_counter()
+    if writer == "pyexiv2":
+        _write_file(str(path), exif_dict, xmp_dict)
+    elif rewrite_jpeg(path, exif_dict, xmp_dict) is None:
+        raise RuntimeError(f"Streaming rewrite failed for {path}")
+    elapsed = time.perf_counter() - start
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(elapsed, python_peak, max(peak_rss - rss_before, 0))
+
+
+def main() -> None:
+    """Run the streaming rewrite benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes-mb", default="5,50,200", help="comma-separated file sizes in MiB")
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary folder")
+    arg_parser.add_argument("--measure", nargs=2, metavar=("WRITER", "PATH"), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+
+    if args.measure:
+        measure(args.measure[0], Path(args.measure[1]))
+        return
+
+    print(f"{'size MiB':>9}{'writer':>9}{'ms':>10}{'python peak KiB':>17}{'RSS growth KiB':>16}")
+    for size_mb in (int(value) for value in args.sizes_mb.split(",")):
+        with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+            path = Path(temp_dir) / NAME
+            for writer in WRITERS:
+                write_jpeg(path, size_mb << 20)
+                output = subprocess.run(
+                    [sys.executable, __file__, "--measure", writer, str(path)],
+                    check=True, capture_output=True, text=True,
+                ).stdout.split()
+                seconds, python_peak, rss_growth = float(output[0]), int(output[1]), int(output[2])
+                print(f"{size_mb:>9}{writer:>9}{seconds * 1000:>10.1f}{python_peak >> 10:>17}{rss_growth >> 10:>16}")
+
+
+if __name__ == "__main__":
+    main()
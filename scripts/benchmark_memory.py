@@ -0,0 +1,115 @@
+"""Measure the memory held per parsed record.
+
+Parses a synthetic archive listing and reports the bytes allocated per record
+for the previous __dict__-backed ParsedFilename layout, the current slotted
+layout and the columnar ParsedBatch (if NumPy is installed).
+
+Usage:
+    python scripts/benchmark_memory.py [--count N]
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.parser import FilenameParser  # noqa: E402
+
+
+@dataclass
+class DictParsedFilename:
+    """ParsedFilename as it was laid out before slots and interning."""
+
+    year: int
+    month: int
+    day: int
+    hour: int
+    minute: int
+    second: int
+    modifier: str
+    group: str
+    subgroup: str
+    sequence: str
+    extension: str
+
+
+def make_names(count: int) -> list[str]:
+    """Generate archive-like filenames (shared dates and codes, unique sequences).
+
+    Args:
+        count: Number of names.
+
+    Returns:
+        List of filenames.
+    """
+    groups = ["FAM", "TRV", "WRK", "SCH"]
+    subgroups = ["POR", "LND", "GRP", "VAC", "EVT"]
+    return [
+        f"{1950 + number % 50}.{number % 12 + 1:02d}.{number % 28 + 1:02d}.12.30.00.E."
+        f"{groups[number % 4]}.{subgroups[number % 5]}.{number:06d}.tiff"
+        for number in range(count)
+    ]
+
+
+def bytes_per_record(build: Callable[[list[str]], Any], names: list[str]) -> float:
+    """Measure memory still allocated after building records for names.
+
+    Args:
+        build: Function turning the list of names into records.
+        names: Filenames to parse.
+
+    Returns:
+        Bytes held per name.
+    """
+    gc.collect()
+    tracemalloc.start()
+    records = build(names)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current / len(names)
+
+
+def main() -> None:
+    """Run the memory benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--count", type=int, default=200_000, help="number of records")
+    args = arg_parser.parse_args()
+
+    parser = FilenameParser()
+    names = make_names(args.count)
+
+    def build_dict_records(names: list[str]) -> list[DictParsedFilename]:
+        # Copy the strings so they are not shared, as the regex parser returned them
+        return [
+            DictParsedFilename(*(
+                "".join(value) if isinstance(value, str) else value
+                for value in astuple(parser.parse(name))
+            ))
+            for name in names
+        ]
+
+    results = {
+        "dict dataclass": bytes_per_record(build_dict_records, names),
+        "slotted + interned": bytes_per_record(lambda names: [parser.parse(n) for n in names], names),
+    }
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        pass
+    else:
+        results["ParsedBatch"] = bytes_per_record(parser.parse_many, names)
+
+    print(f"records: {args.count:,}")
+    for label, size in results.items():
+        print(f"{label:<20}{size:>8.1f} bytes/record")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark the per-file cost of building metadata dictionaries.
+
+Builds the EXIF/XMP dictionaries for a batch of files that share dates (as
+the frames of one scanned roll do) with and without the date value cache.
+
+Usage:
+    python scripts/benchmark_metadata.py [--files N] [--dates N]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.parser import FilenameParser  # noqa: E402
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+
+
+def main() -> None:
+    """Run the metadata build benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=10_000, help="number of files")
+    arg_parser.add_argument("--dates", type=int, default=20, help="number of distinct dates")
+    args = arg_parser.parse_args()
+
+    parser = FilenameParser()
+    records = [
+        parser.parse(f"1950.06.{number % args.dates + 1:02d}.12.30.00.E.FAM.POR.{number:06d}.tiff")
+        for number in range(args.files)
+    ]
+
+    plugins = {
+        "uncached": PhotoNamingExifPlugin(metadata_cache_size=0),
+        "cached": PhotoNamingExifPlugin(),
+    }
+    for label, plugin in plugins.items():
+        timer = timeit.Timer(lambda: [plugin._build_metadata_dict(parsed) for parsed in records])
+        best = min(timer.repeat(repeat=5, number=1))
+        print(f"{label:<10}{best / args.files * 1e6:8.3f} us/file")
+
+    # The identifier alone, which is generated fresh for every file
+    uuid_time = min(timeit.repeat("str(uuid.uuid4())", "import uuid", repeat=5, number=args.files))
+    print(f"{'uuid4':<10}{uuid_time / args.files * 1e6:8.3f} us/file")
+
+
+if __name__ == "__main__":
+    main()
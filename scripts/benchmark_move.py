@@ -0,0 +1,77 @@
+"""Benchmark moving files to another filesystem with each copy strategy.
+
+Moves freshly written files from a folder under --dir to one under
+--other-dir, which should be on another filesystem (for example a
+loop-mounted image or /dev/shm), with shutil.move and with move_file
+restricted to each strategy in COPY_STRATEGIES, plus the chunked copy
+computing a SHA-256 checksum. Prints the time per file, the throughput and
+the strategy move_file ended up using: copy_file_range between different
+filesystems needs kernel and filesystem support (such as NFS server-side
+copy) and otherwise falls back to the chunked copy.
+
+Usage:
+    python scripts/benchmark_move.py --other-dir /mnt/archive [--size-mb 64] [--files N]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.fileio import COPY_STRATEGIES, move_file  # noqa: E402
+
+
+def strategies() -> dict[str, Callable[[Path, Path], object]]:
+    """Build the move functions to compare, keyed by name."""
+    moves: dict[str, Callable[[Path, Path], object]] = {
+        "shutil.move": lambda source, target: shutil.move(str(source), str(target)),
+    }
+    for strategy in COPY_STRATEGIES:
+        moves[strategy] = lambda source, target, strategy=strategy: move_file(
+            source, target, strategies=(strategy,)
+        )
+    moves["chunked+sha256"] = lambda source, target: move_file(source, target, "sha256", ("chunked",))
+    return moves
+
+
+def run(
+    move: Callable[[Path, Path], object], size: int, files: int, parent: Optional[Path], other: Path
+) -> tuple[float, object]:
+    """Move freshly written files and return the seconds per file and the last move's result."""
+    with tempfile.TemporaryDirectory(dir=parent) as watch_dir, tempfile.TemporaryDirectory(dir=other) as archive:
+        if os.stat(watch_dir).st_dev == os.stat(archive).st_dev:
+            raise SystemExit(f"{other} is on the same filesystem as the watch folder")
+        paths = [Path(watch_dir) / f"photo{number:04d}.jpg" for number in range(files)]
+        for path in paths:
+            path.write_bytes(os.urandom(size))
+
+        start = time.perf_counter()
+        for path in paths:
+            result = move(path, Path(archive) / path.name)
+        return (time.perf_counter() - start) / files, result
+
+
+def main() -> None:
+    """Run the move benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--size-mb", type=int, default=64, help="file size in MiB")
+    arg_parser.add_argument("--files", type=int, default=5)
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary watch folder")
+    arg_parser.add_argument("--other-dir", type=Path, required=True, help="folder on another filesystem")
+    args = arg_parser.parse_args()
+
+    print(f"{'strategy':>16}{'ms/file':>10}{'MiB/s':>10}  used")
+    for name, move in strategies().items():
+        elapsed, result = run(move, args.size_mb << 20, args.files, args.dir, args.other_dir)
+        used = result[0] if isinstance(result, tuple) else "-"
+        print(f"{name:>16}{elapsed * 1000:>10.1f}{args.size_mb / elapsed:>10.0f}  {used}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Benchmark the metadata system calls of moving files to processed/.
+
+Counts the calls _move_to_processed makes per file that go to the
+filesystem's metadata (mkdir, stat, rename, link, unlink, renameat2), and
+compares them with the previous sequence (mkdir, two existence checks and
+a rename). With --latency-ms, each of those calls is delayed, roughly as
+a network round trip to an NFS server would, and the time per file shows
+what the saved calls are worth.
+
+Usage:
+    python scripts/benchmark_move_metadata.py [--files 200] [--latency-ms 0.5]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif import fileio  # noqa: E402
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+
+# os functions that reach the filesystem's metadata
+CALLS = ("mkdir", "stat", "lstat", "rename", "link", "unlink")
+
+
+def previous_move(file_path: Path) -> None:
+    """Move a file the way _move_to_processed did before."""
+    processed_dir = file_path.parent / "processed"
+    processed_dir.mkdir(parents=True, exist_ok=True)
+    dest_path = processed_dir / file_path.name
+    sidecar = file_path.with_name(file_path.name + ".xmp")
+    if sidecar.exists() or dest_path.exists():
+        raise FileExistsError(dest_path)
+    os.rename(file_path, dest_path)
+
+
+def instrument(counts: Counter, latency: float) -> Callable[[], None]:
+    """Count (and delay) the metadata calls; return a function undoing it."""
+    originals = {name: getattr(os, name) for name in CALLS}
+
+    def wrap(name: str, function: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            if latency:
+                time.sleep(latency)
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    for name, function in originals.items():
+        setattr(os, name, wrap(name, function))
+    renameat2 = fileio._load_renameat2()
+    if renameat2 is not None:
+        fileio._renameat2 = wrap("renameat2", renameat2)
+
+    def restore() -> None:
+        for name, function in originals.items():
+            setattr(os, name, function)
+        fileio._renameat2 = renameat2
+
+    return restore
+
+
+def run(move: Callable[[Path], object], files: int, latency: float) -> tuple[float, Counter]:
+    """Move freshly created files and return the seconds per file and the call counts."""
+    with tempfile.TemporaryDirectory() as watch_dir:
+        paths = [Path(watch_dir) / f"1950.06.15.12.30.00.E.FAM.POR.{number:06d}.jpg" for number in range(files)]
+        for path in paths:
+            path.write_bytes(b"\xff\xd8\xff\xd9")
+
+        counts: Counter = Counter()
+        restore = instrument(counts, latency)
+        try:
+            start = time.perf_counter()
+            for path in paths:
+                move(path)
+            elapsed = (time.perf_counter() - start) / files
+        finally:
+            restore()
+    return elapsed, counts
+
+
+def main() -> None:
+    """Run the move metadata benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=200)
+    arg_parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to each metadata call")
+    args = arg_parser.parse_args()
+
+    plugin = PhotoNamingExifPlugin()
+    moves = {"previous": previous_move, "current": plugin._move_to_processed}
+
+    print(f"{'move':>10}{'calls/file':>12}{'ms/file':>10}  calls")
+    for name, move in moves.items():
+        elapsed, counts = run(move, args.files, args.latency_ms / 1000)
+        per_file = sum(counts.values()) / args.files
+        detail = ", ".join(f"{call} {count / args.files:g}" for call, count in sorted(counts.items()))
+        print(f"{name:>10}{per_file:>12.2f}{elapsed * 1000:>10.3f}  {detail}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark FilenameParser.parse against the original one-group()-per-field PATTERN parse.
+
+Times both parsers over a mixed corpus of valid photo names and typical
+non-matching names seen by the watcher (thumbnails, documents, near misses).
+
+Usage:
+    python scripts/benchmark_parser.py [--repeat N]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.parser import FilenameParser, ParsedFilename  # noqa: E402
+
+
+VALID_NAMES = [
+    "1950.06.15.12.30.45.E.FAM.POR.000001.tiff",
+    "1950.06.00.00.00.00.C.FAM.POR.000002.jpg",
+    "1950.00.00.00.00.00.C.TRV.LND.000003.tiff",
+    "0000.00.00.00.00.00.A.UNK.000.000004.jpg",
+    "1950.06.15.12.00.00.E.FAM.POR.000005.A.RAW.WEB.tiff",
+]
+
+INVALID_NAMES = [
+    "IMG_1234.JPG",
+    "Thumbs.db",
+    ".DS_Store",
+    "document.final.v2.pdf",
+    "1950.06.15.tiff",
+    "1950.06.15.12.30.45.E.FAM.POR.A0001.tiff",
+    "1950.06.15.12.30.45.EX.FAM.POR.000001.tiff",
+    "1950.06.15.12.30.45.E.FAM.POR.000001.tif2",
+]
+
+
+def parse_with_pattern(filename: str) -> Optional[ParsedFilename]:
+    """Parse a filename the way FilenameParser originally did, with a group() call per field.
+
+    Args:
+        filename: Filename to parse.
+
+    Returns:
+        ParsedFilename object if parsing successful, None otherwise.
+    """
+    match = FilenameParser.PATTERN.match(filename)
+    if not match:
+        return None
+
+    try:
+        return ParsedFilename(
+            year=int(match.group(1)),
+            month=int(match.group(2)),
+            day=int(match.group(3)),
+            hour=int(match.group(4)),
+            minute=int(match.group(5)),
+            second=int(match.group(6)),
+            modifier=match.group(7).upper(),
+            group=match.group(8),
+            subgroup=match.group(9),
+            sequence=match.group(10),
+            extension=match.group(11).lower()
+        )
+    except (ValueError, IndexError):
+        return None
+
+
+def time_per_name(func, names: list[str], repeat: int) -> float:
+    """Return the best per-name time of func over names, in microseconds."""
+    timer = timeit.Timer(lambda: [func(name) for name in names])
+    best = min(timer.repeat(repeat=repeat, number=20))
+    return best / (20 * len(names)) * 1e6
+
+
+def main() -> None:
+    """Run the parser benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--repeat", type=int, default=7, help="timing repetitions")
+    args = arg_parser.parse_args()
+
+    parser = FilenameParser()
+    corpora = {
+        "valid": VALID_NAMES * 200,
+        "invalid": INVALID_NAMES * 200,
+        "mixed": (VALID_NAMES + INVALID_NAMES) * 200,
+    }
+
+    for name in corpora["mixed"]:
+        assert parser.parse(name) == parse_with_pattern(name), name
+
+    print(f"{'corpus':<10}{'group() us':>12}{'parse us':>12}{'speedup':>10}")
+    for label, names in corpora.items():
+        regex_time = time_per_name(parse_with_pattern, names, args.repeat)
+        parse_time = time_per_name(parser.parse, names, args.repeat)
+        print(f"{label:<10}{regex_time:>12.3f}{parse_time:>12.3f}{regex_time / parse_time:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark the staged Pipeline against sequential process() calls.
+
+Creates a backlog of synthetic photos, processes it once with a plain
+process() loop and once through the pipeline, and prints files/sec plus the
+per-stage busy, idle and blocked times and the peak queue depths.
+
+Usage:
+    python scripts/benchmark_pipeline.py [--files N] [--size BYTES]
+        [--parse-workers N] [--write-workers N] [--move-workers N] [--queue-size N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.pipeline import Pipeline  # noqa: E402
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from benchmark_process_batch import make_backlog  # noqa: E402
+
+
+def main() -> None:
+    """Run the pipeline benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=2000, help="files per run")
+    arg_parser.add_argument("--size", type=int, default=1 << 20, help="file size in bytes")
+    arg_parser.add_argument("--parse-workers", type=int, default=1)
+    arg_parser.add_argument("--write-workers", type=int, default=2)
+    arg_parser.add_argument("--move-workers", type=int, default=1)
+    arg_parser.add_argument("--queue-size", type=int, default=Pipeline.QUEUE_SIZE)
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary watch folder")
+    args = arg_parser.parse_args()
+
+    plugin = PhotoNamingExifPlugin()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        paths = make_backlog(Path(temp_dir), args.files, args.size)
+        start = time.perf_counter()
+        for path in paths:
+            plugin.process(path, {})
+        sequential = args.files / (time.perf_counter() - start)
+
+    pipeline = Pipeline(
+        plugin,
+        {},
+        parse_workers=args.parse_workers,
+        write_workers=args.write_workers,
+        move_workers=args.move_workers,
+        queue_size=args.queue_size,
+    )
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        paths = make_backlog(Path(temp_dir), args.files, args.size)
+        start = time.perf_counter()
+        for _ in pipeline.run(paths):
+            pass
+        pipelined = args.files / (time.perf_counter() - start)
+
+    print(f"sequential: {sequential:10.1f} files/sec")
+    print(f"pipeline:   {pipelined:10.1f} files/sec ({pipelined / sequential:.2f}x)")
+    print()
+    print(f"{'stage':<8}{'workers':>8}{'busy s':>10}{'idle s':>10}{'blocked s':>11}{'max depth':>11}")
+    for stats in pipeline.stats().values():
+        print(
+            f"{stats.name:<8}{stats.workers:>8}{stats.busy_seconds:>10.2f}"
+            f"{stats.idle_seconds:>10.2f}{stats.blocked_seconds:>11.2f}{stats.max_queue_depth:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark the persistent WorkerPool against in-process threads.
+
+Creates a backlog of synthetic photos and processes it with
+process_batch on N threads, then with a WorkerPool of N processes whose
+workers were started (and imported pyexiv2) before the clock starts. The
+pool's startup time is reported separately.
+
+Usage:
+    python scripts/benchmark_pool.py [--files N] [--workers N] [--size BYTES]
+        [--context fork|spawn|forkserver]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from hump_yard_naming_exif.pool import WorkerPool  # noqa: E402
+from benchmark_process_batch import make_backlog  # noqa: E402
+
+
+def main() -> None:
+    """Run the worker pool benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=2000, help="files per run")
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    arg_parser.add_argument("--size", type=int, default=256 * 1024, help="file size in bytes")
+    arg_parser.add_argument("--context", choices=["fork", "spawn", "forkserver"])
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary watch folder")
+    args = arg_parser.parse_args()
+
+    plugin = PhotoNamingExifPlugin()
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        paths = make_backlog(Path(temp_dir), args.files, args.size)
+        start = time.perf_counter()
+        list(plugin.process_batch(paths, {}, workers=args.workers, executor="thread"))
+        threads = args.files / (time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+        paths = make_backlog(Path(temp_dir), args.files, args.size)
+        with WorkerPool({}, workers=args.workers, max_tasks=None, context=args.context) as pool:
+            # Round-trip one request per worker so every worker has finished starting
+            start = time.perf_counter()
+            list(pool.map(["/nonexistent/warmup.jpg"] * args.workers))
+            startup = time.perf_counter() - start
+
+            start = time.perf_counter()
+            list(pool.map(paths))
+            pooled = args.files / (time.perf_counter() - start)
+
+    print(f"threads ({args.workers}):   {threads:10.1f} files/sec")
+    print(f"pool ({args.workers}):      {pooled:10.1f} files/sec ({pooled / threads:.2f}x)")
+    print(f"pool startup:    {startup * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
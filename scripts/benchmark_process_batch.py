@@ -0,0 +1,73 @@
+"""Benchmark PhotoNamingExifPlugin.process_batch throughput by worker count.
+
+Creates a backlog of synthetic photos in a temporary watch folder and
+processes it with 1..N workers, reporting files/sec for each worker count.
+The backlog is recreated before every run.
+
+Usage:
+    python scripts/benchmark_process_batch.py [--files N] [--workers 1,2,4,8]
+        [--executor thread|process] [--size BYTES] [--dir PATH]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from synthetic_images import write_image  # noqa: E402
+
+
+def make_backlog(directory: Path, count: int, size: int) -> list[str]:
+    """Create count synthetic photos with valid names.
+
+    Args:
+        directory: Watch folder.
+        count: Number of files.
+        size: Size of each file in bytes.
+
+    Returns:
+        Paths of the created files.
+    """
+    paths = []
+    for number in range(count):
+        extension = "tiff" if number % 2 else "jpg"
+        path = directory / f"1950.06.{number % 28 + 1:02d}.12.30.00.E.FAM.POR.{number:06d}.{extension}"
+        write_image(path, size)
+        paths.append(str(path))
+    return paths
+
+
+def main() -> None:
+    """Run the process_batch benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--files", type=int, default=2000, help="files per run")
+    arg_parser.add_argument(
+        "--workers", default=",".join(str(2 ** n) for n in range(6) if 2 ** n <= (os.cpu_count() or 1)),
+        help="comma-separated worker counts",
+    )
+    arg_parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    arg_parser.add_argument("--size", type=int, default=64 * 1024, help="file size in bytes")
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary watch folder")
+    args = arg_parser.parse_args()
+
+    plugin = PhotoNamingExifPlugin()
+    print(f"{'workers':>8}{'files/sec':>12}{'failed':>8}")
+    for workers in (int(value) for value in args.workers.split(",")):
+        with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+            paths = make_backlog(Path(temp_dir), args.files, args.size)
+
+            start = time.perf_counter()
+            results = list(plugin.process_batch(paths, {}, workers=workers, executor=args.executor))
+            elapsed = time.perf_counter() - start
+
+            failed = sum(1 for _, success in results if not success)
+            print(f"{workers:>8}{len(results) / elapsed:>12.1f}{failed:>8}")
+
+
+if __name__ == "__main__":
+    main()
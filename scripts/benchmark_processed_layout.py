@@ -0,0 +1,156 @@
+"""Benchmark lookups and listings in a flat processed/ folder vs sharded layouts.
+
+Fills a processed/ folder with --entries empty files named like scans, once
+per layout: flat, grouped by year/group/subgroup and sharded by a hash
+prefix. For each layout it then times:
+
+- lookup: stat of random existing files (warm, and with --drop-caches also
+  after dropping the kernel's dentry and inode caches, which needs root)
+- move: the no-overwrite rename of new files into the layout
+- listing: os.scandir of the folder a file lands in, as a tool browsing
+  the archive or a backup job would
+
+Usage:
+    python scripts/benchmark_processed_layout.py [--entries 1000000] [--dir /tmp] [--drop-caches]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.fileio import rename_noreplace  # noqa: E402
+from hump_yard_naming_exif.layout import render_layout  # noqa: E402
+from hump_yard_naming_exif.parser import FilenameParser  # noqa: E402
+
+LAYOUTS = {
+    "flat": "",
+    "year/group/subgroup": "{year}/{group}/{subgroup}",
+    "hash prefix": "{hash:.3}",
+}
+
+GROUPS = ["FAM", "ARC", "MIL", "SCH", "CHU", "TRV", "WRK", "CLB", "SPT", "EVT"]
+SUBGROUPS = ["POR", "GRP", "LND", "DOC", "BLD", "VEH"]
+
+
+def names(count: int, seed: int = 1) -> Iterator[str]:
+    """Generate distinct scan filenames."""
+    generator = random.Random(seed)
+    for number in range(count):
+        year = generator.randrange(1880, 2000)
+        month, day = generator.randrange(1, 13), generator.randrange(1, 29)
+        group, subgroup = generator.choice(GROUPS), generator.choice(SUBGROUPS)
+        yield f"{year}.{month:02d}.{day:02d}.00.00.00.E.{group}.{subgroup}.{number:06d}.jpg"
+
+
+def drop_caches() -> bool:
+    """Drop the page, dentry and inode caches; return False if not permitted."""
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as control:
+            control.write("3\n")
+    except OSError:
+        return False
+    return True
+
+
+class Archive:
+    """A processed/ folder filled according to a layout."""
+
+    def __init__(self, root: Path, layout: str) -> None:
+        """Initialize the archive."""
+        self.root = root
+        self.layout = layout
+        self.parser = FilenameParser()
+        self.folders: set[Path] = set()
+
+    def path(self, name: str) -> Path:
+        """Get the path a file goes to, creating its folder on first use."""
+        folder = self.root
+        if self.layout:
+            folder = self.root / render_layout(self.layout, self.parser.parse(name), name)
+        if folder not in self.folders:
+            folder.mkdir(parents=True, exist_ok=True)
+            self.folders.add(folder)
+        return folder / name
+
+
+def timed(label: str, samples: int, start: float) -> str:
+    """Format the time per sample since start."""
+    return f"{label} {(time.perf_counter() - start) / samples * 1e6:.1f} us"
+
+
+def run(layout: str, entries: int, samples: int, parent: Optional[Path], cold: bool) -> list[str]:
+    """Fill an archive and time lookups, moves and listings in it."""
+    with tempfile.TemporaryDirectory(dir=parent) as work_dir:
+        work = Path(work_dir)
+        archive = Archive(work / "processed", layout)
+        stored = []
+        start = time.perf_counter()
+        for name in names(entries):
+            path = archive.path(name)
+            os.close(os.open(path, os.O_CREAT | os.O_WRONLY, 0o644))
+            stored.append(path)
+        results = [f"fill {time.perf_counter() - start:.1f} s, {len(archive.folders)} folders"]
+
+        lookups = random.Random(2).sample(stored, samples)
+        start = time.perf_counter()
+        for path in lookups:
+            os.stat(path)
+        results.append(timed("lookup warm", samples, start))
+
+        if cold and drop_caches():
+            start = time.perf_counter()
+            for path in lookups:
+                os.stat(path)
+            results.append(timed("cold", samples, start))
+
+        incoming = work / "incoming"
+        incoming.mkdir()
+        new = [name.replace(".jpg", ".tif") for name in names(samples, seed=3)]
+        for name in new:
+            (incoming / name).touch()
+        if cold:
+            drop_caches()
+        start = time.perf_counter()
+        for name in new:
+            rename_noreplace(incoming / name, archive.path(name))
+        results.append(timed("move", samples, start))
+
+        listed = lookups[: max(1, samples // 100)]
+        if cold:
+            drop_caches()
+        start = time.perf_counter()
+        for path in listed:
+            with os.scandir(path.parent) as folder:
+                sum(1 for _ in folder)
+        results.append(timed("listing", len(listed), start))
+
+        # Deleting a million files takes as long as creating them
+        shutil.rmtree(work / "processed")
+    return results
+
+
+def main() -> None:
+    """Run the processed/ layout benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--entries", type=int, default=1_000_000)
+    arg_parser.add_argument("--samples", type=int, default=10_000, help="lookups and moves timed")
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary archive")
+    arg_parser.add_argument("--drop-caches", action="store_true", help="also time with cold caches (root)")
+    args = arg_parser.parse_args()
+
+    for name, layout in LAYOUTS.items():
+        results = run(layout, args.entries, args.samples, args.dir, args.drop_caches)
+        print(f"{name:>20}: {'; '.join(results)}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
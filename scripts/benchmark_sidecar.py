@@ -0,0 +1,65 @@
+"""Benchmark embedded vs sidecar metadata writes by file size.
+
+Writes the metadata of one TIFF per size with the default embedded mode
+(pyexiv2 rewrites the file) and with metadata_mode "sidecar" (only a small
+.xmp file is written), and prints the time per write.
+
+Usage:
+    python scripts/benchmark_sidecar.py [--sizes-mb 1,16,128,512] [--repeat N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from synthetic_images import write_tiff  # noqa: E402
+
+NAME = "1950.06.15.12.30.00.E.FAM.POR.000001.tiff"
+
+
+def time_write(plugin: PhotoNamingExifPlugin, directory: Path, size: int, config: dict, repeat: int) -> float:
+    """Time the first _write_metadata call on freshly created files.
+
+    Only the first write adds the tags; later writes of the same values can
+    be done in place, so every repeat uses a new file.
+
+    Returns:
+        Best time of the repeats in seconds.
+    """
+    path = directory / NAME
+    parsed = plugin.parser.parse(path.name)
+    best = float("inf")
+    for _ in range(repeat):
+        write_tiff(path, size)
+        start = time.perf_counter()
+        if not plugin._write_metadata(path, parsed, config):
+            raise RuntimeError(f"Metadata write failed for {path}")
+        best = min(best, time.perf_counter() - start)
+        path.unlink()
+    return best
+
+
+def main() -> None:
+    """Run the sidecar benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes-mb", default="1,16,128,512", help="comma-separated file sizes in MiB")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary folder")
+    args = arg_parser.parse_args()
+
+    plugin = PhotoNamingExifPlugin()
+    print(f"{'size MiB':>9}{'embed ms':>12}{'sidecar ms':>12}")
+    for size_mb in (int(value) for value in args.sizes_mb.split(",")):
+        with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+            embed = time_write(plugin, Path(temp_dir), size_mb << 20, {}, args.repeat)
+            sidecar = time_write(plugin, Path(temp_dir), size_mb << 20, {"metadata_mode": "sidecar"}, args.repeat)
+        print(f"{size_mb:>9}{embed * 1000:>12.2f}{sidecar * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
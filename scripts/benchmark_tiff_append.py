@@ -0,0 +1,78 @@
+"""Benchmark pyexiv2 vs append-only metadata writes of TIFFs by file size.
+
+Writes the metadata of one TIFF per size with pyexiv2 (which rewrites the
+file) and with the append-only IFD0 writer the plugin uses for TIFFs, and
+prints the time and bytes written per write. Bytes written are read from
+/proc/self/io where available.
+
+Usage:
+    python scripts/benchmark_tiff_append.py [--sizes-mb 16,128,512] [--repeat N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from benchmark_jpeg_inplace import bytes_written  # noqa: E402
+from hump_yard_naming_exif.isolation import _write_file  # noqa: E402
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from hump_yard_naming_exif.tiff import update_tiff_by_append  # noqa: E402
+from synthetic_images import write_tiff  # noqa: E402
+
+NAME = "1950.06.15.12.30.00.E.FAM.POR.000001.tiff"
+
+
+def time_write(
+    write: Callable[[str, dict, dict], object], directory: Path, size: int, repeat: int
+) -> tuple[float, Optional[int]]:
+    """Time one metadata write on freshly created TIFFs.
+
+    Returns:
+        Tuple of (best time in seconds, bytes written by the last write or None).
+    """
+    plugin = PhotoNamingExifPlugin()
+    exif_dict, _, xmp_dict = plugin._build_metadata_dict(plugin.parser.parse(NAME))
+    path = directory / NAME
+    best, written = float("inf"), None
+    for _ in range(repeat):
+        write_tiff(path, size)
+        before = bytes_written()
+        start = time.perf_counter()
+        write(str(path), exif_dict, xmp_dict)
+        best = min(best, time.perf_counter() - start)
+        after = bytes_written()
+        written = None if before is None or after is None else after - before
+        path.unlink()
+    return best, written
+
+
+def main() -> None:
+    """Run the TIFF append benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--sizes-mb", default="16,128,512", help="comma-separated file sizes in MiB")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary folder")
+    args = arg_parser.parse_args()
+
+    def append(file_path: str, exif_dict: dict, xmp_dict: dict) -> None:
+        if update_tiff_by_append(Path(file_path), exif_dict, xmp_dict) is None:
+            raise RuntimeError(f"Append-only write failed for {file_path}")
+
+    print(f"{'size MiB':>9}{'pyexiv2 ms':>12}{'pyexiv2 bytes':>15}{'append ms':>11}{'append bytes':>14}")
+    for size_mb in (int(value) for value in args.sizes_mb.split(",")):
+        with tempfile.TemporaryDirectory(dir=args.dir) as temp_dir:
+            rewrite, rewrite_bytes = time_write(_write_file, Path(temp_dir), size_mb << 20, args.repeat)
+            appended, appended_bytes = time_write(append, Path(temp_dir), size_mb << 20, args.repeat)
+        print(
+            f"{size_mb:>9}{rewrite * 1000:>12.2f}{rewrite_bytes!s:>15}"
+            f"{appended * 1000:>11.2f}{appended_bytes!s:>14}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark writing into processed/ directly vs writing in place and moving.
+
+Processes JPEGs and TIFFs with metadata_mode "inplace", once the usual way
+(the file is updated in the watch folder, then moved) and once with
+write_to_processed (a copy with the metadata is written into processed/
+and renamed into place). With --other-dir, processed/ is a symlink to a
+folder there, so that moves cross filesystems as with a separately mounted
+archive volume. Prints the time and the bytes read and written per file,
+from /proc/self/io where available.
+
+Usage:
+    python scripts/benchmark_write_to_processed.py [--size-mb 64] [--files N] [--other-dir /dev/shm]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin  # noqa: E402
+from synthetic_images import write_image  # noqa: E402
+
+MODES = {
+    "write+move": {"metadata_mode": "inplace"},
+    "direct": {"metadata_mode": "inplace", "write_to_processed": True},
+}
+
+
+def io_counters() -> Optional[tuple[int, int]]:
+    """Get the bytes this process has read and written so far.
+
+    Returns:
+        The (rchar, wchar) counters of /proc/self/io, or None where they are not available.
+    """
+    try:
+        with open("/proc/self/io") as io:
+            counters = dict(line.split(": ") for line in io.read().splitlines())
+    except OSError:
+        return None
+    return int(counters["rchar"]), int(counters["wchar"])
+
+
+def run(suffix: str, config: dict, size: int, files: int, parent: Optional[Path], other: Optional[Path]) -> str:
+    """Process freshly created files and format the time and I/O per file."""
+    with tempfile.TemporaryDirectory(dir=parent) as watch_dir, tempfile.TemporaryDirectory(dir=other) as archive:
+        watch = Path(watch_dir)
+        if other is not None:
+            (watch / "processed").symlink_to(archive, target_is_directory=True)
+        paths = [watch / f"1950.06.15.12.30.00.E.FAM.POR.{number:06d}{suffix}" for number in range(files)]
+        for path in paths:
+            write_image(path, size)
+
+        plugin = PhotoNamingExifPlugin()
+        before = io_counters()
+        start = time.perf_counter()
+        for path in paths:
+            if not plugin.process(str(path), config):
+                raise RuntimeError(f"Processing failed for {path}")
+        elapsed = (time.perf_counter() - start) / files
+        after = io_counters()
+
+    if before is None or after is None:
+        return f"{elapsed * 1000:>10.1f}{'-':>12}{'-':>12}"
+    read, written = ((end - begin) / files / 2**20 for begin, end in zip(before, after))
+    return f"{elapsed * 1000:>10.1f}{read:>12.1f}{written:>12.1f}"
+
+
+def main() -> None:
+    """Run the write_to_processed benchmark."""
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--size-mb", type=int, default=64, help="file size in MiB")
+    arg_parser.add_argument("--files", type=int, default=5)
+    arg_parser.add_argument("--dir", type=Path, help="parent of the temporary watch folder")
+    arg_parser.add_argument("--other-dir", type=Path, help="folder on another filesystem for processed/")
+    args = arg_parser.parse_args()
+
+    print(f"{'format':>7}{'mode':>12}{'ms/file':>10}{'MiB read':>12}{'MiB written':>12}")
+    for suffix in (".jpg", ".tiff"):
+        for name, config in MODES.items():
+            result = run(suffix, config, args.size_mb << 20, args.files, args.dir, args.other_dir)
+            print(f"{suffix[1:]:>7}{name:>12}{result}")
+
+
+if __name__ == "__main__":
+    main()
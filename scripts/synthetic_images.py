@@ -0,0 +1,103 @@
+"""Synthetic JPEG and TIFF files for the benchmark scripts.
+
+The images have a valid marker/IFD structure (all that metadata writers look
+at) and a payload of arbitrary size, so benchmarks can exercise multi-gigabyte
+scans without needing real photos.
+"""
+
+import struct
+from pathlib import Path
+
+
+CHUNK_SIZE = 1 << 20
+
+
+def _jpeg_segment(marker: int, payload: bytes) -> bytes:
+    """Encode a JPEG marker segment."""
+    return b"\xff" + bytes([marker]) + struct.pack(">H", len(payload) + 2) + payload
+
+
+def jpeg_header() -> bytes:
+    """Return the markers of a 1x1 grayscale baseline JPEG, up to and including SOS."""
+    return (
+        b"\xff\xd8"
+        + _jpeg_segment(0xE0, b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00")
+        + _jpeg_segment(0xDB, b"\x00" + bytes([1] * 64))
+        + _jpeg_segment(0xC0, b"\x08\x00\x01\x00\x01\x01\x01\x11\x00")
+        + _jpeg_segment(0xC4, b"\x00" + bytes([0, 1] + [0] * 14) + b"\x00")
+        + _jpeg_segment(0xDA, b"\x01\x01\x00\x00\x3f\x00")
+    )
+
+
+def write_jpeg(path: Path, size: int = 4096) -> None:
+    """Write a synthetic JPEG of roughly size bytes.
+
+    Args:
+        path: Destination file.
+        size: Total file size; the scan data fills whatever the markers leave.
+    """
+    header = jpeg_header()
+    remaining = max(size - len(header) - 2, 1)
+    with open(path, "wb") as file:
+        file.write(header)
+        chunk = b"\x00" * min(remaining, CHUNK_SIZE)
+        while remaining > 0:
+            file.write(chunk[:remaining])
+            remaining -= len(chunk)
+        file.write(b"\xff\xd9")
+
+
+def write_tiff(path: Path, size: int = 4096, byte_order: str = "<") -> None:
+    """Write a synthetic uncompressed grayscale TIFF of roughly size bytes.
+
+    Args:
+        path: Destination file.
+        size: Total file size; the single strip fills whatever the IFD leaves.
+        byte_order: "<" for little-endian (II) or ">" for big-endian (MM).
+    """
+    entries_count = 9
+    ifd_size = 2 + 12 * entries_count + 4
+    strip_offset = 8 + ifd_size
+    width = max(size - strip_offset, 1)
+
+    entries = [
+        (256, 4, 1, width),  # ImageWidth
+        (257, 4, 1, 1),  # ImageLength
+        (258, 3, 1, 8),  # BitsPerSample
+        (259, 3, 1, 1),  # Compression: none
+        (262, 3, 1, 1),  # PhotometricInterpretation: BlackIsZero
+        (273, 4, 1, strip_offset),  # StripOffsets
+        (277, 3, 1, 1),  # SamplesPerPixel
+        (278, 4, 1, 1),  # RowsPerStrip
+        (279, 4, 1, width),  # StripByteCounts
+    ]
+
+    header = (b"II" if byte_order == "<" else b"MM") + struct.pack(byte_order + "HI", 42, 8)
+    header += struct.pack(byte_order + "H", len(entries))
+    for tag, field_type, count, value in entries:
+        if field_type == 3:
+            header += struct.pack(byte_order + "HHIHH", tag, field_type, count, value, 0)
+        else:
+            header += struct.pack(byte_order + "HHII", tag, field_type, count, value)
+    header += struct.pack(byte_order + "I", 0)
+
+    with open(path, "wb") as file:
+        file.write(header)
+        remaining = width
+        chunk = b"\x80" * min(remaining, CHUNK_SIZE)
+        while remaining > 0:
+            file.write(chunk[:remaining])
+            remaining -= len(chunk)
+
+
+def write_image(path: Path, size: int = 4096) -> None:
+    """Write a synthetic JPEG or TIFF, chosen by the file extension.
+
+    Args:
+        path: Destination file.
+        size: Approximate file size in bytes.
+    """
+    if path.suffix.lower() in (".tif", ".tiff"):
+        write_tiff(path, size)
+    else:
+        write_jpeg(path, size)
@@ -0,0 +1,189 @@
+"""Columnar representation of many parsed filenames.
+
+Requires NumPy (``pip install hump-yard-naming-exif[batch]``).
+"""
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from .parser import ParsedFilename, _match_fields
+
+
+# Numeric fields that do not fit the int64 columns are clipped to this value.
+# Clipping keeps every range check in the validator exact, since all limits are far below it.
+INT64_MAX = int(np.iinfo(np.int64).max)
+
+# Longest sequence that always fits the int64 sequence column
+MAX_SEQUENCE_DIGITS = 18
+
+
+@dataclass
+class ParsedBatch:
+    """Parsed filename data for many names, stored column by column.
+
+    Row ``i`` holds the fields of the ``i``-th name passed to
+    FilenameParser.parse_many. Rows of names that did not parse have
+    ``valid[i] == False`` and zero/None placeholder values.
+
+    Rows that cannot be stored exactly in the typed columns (numbers beyond
+    int64, non-ASCII digits in the sequence or a modifier outside uint8) keep
+    clipped values in the columns and their exact ParsedFilename in ``overflow``.
+    """
+
+    year: np.ndarray
+    month: np.ndarray
+    day: np.ndarray
+    hour: np.ndarray
+    minute: np.ndarray
+    second: np.ndarray
+    modifier: np.ndarray  # uint8 code point of the uppercase modifier
+    group: np.ndarray  # object array of interned strings
+    subgroup: np.ndarray  # object array of interned strings
+    sequence: np.ndarray  # int64 value of the sequence digits
+    sequence_width: np.ndarray  # uint8 number of sequence digits (keeps leading zeros)
+    extension: np.ndarray  # object array of interned strings
+    valid: np.ndarray  # bool mask of names that parsed
+    overflow: dict[int, ParsedFilename] = field(default_factory=dict)
+
+    @classmethod
+    def from_names(cls, names: Iterable[str], max_length: Optional[int] = None) -> "ParsedBatch":
+        """Parse names straight into columns without creating ParsedFilename objects.
+
+        Args:
+            names: Filenames to parse.
+            max_length: Names longer than this are treated as not parsing.
+                None removes the limit.
+
+        Returns:
+            Columnar parse result, one row per name.
+        """
+        rows = array("q")  # indices of the names that parsed
+        year, month, day, hour, minute, second = (array("q") for _ in range(6))
+        sequence = array("q")
+        sequence_width = array("B")
+        modifier = array("B")
+        group: list[str] = []
+        subgroup: list[str] = []
+        extension: list[str] = []
+        overflow: dict[int, ParsedFilename] = {}
+        size = 0
+
+        for size, name in enumerate(names, 1):
+            if max_length is not None and len(name) > max_length:
+                continue
+
+            fields = _match_fields(name)
+            if fields is None:
+                continue
+
+            index = size - 1
+            y, mo, d, h, mi, s, mod, g, sg, seq, ext = fields
+            code = ord(mod)
+            seq_exact = seq.isascii() and len(seq) <= MAX_SEQUENCE_DIGITS
+
+            if max(y, mo, d, h, mi, s) > INT64_MAX or code > 0xFF or not seq_exact:
+                overflow[index] = ParsedFilename(*fields)
+                y, mo, d, h, mi, s = (min(value, INT64_MAX) for value in (y, mo, d, h, mi, s))
+                if code > 0xFF:
+                    code = 0
+
+            rows.append(index)
+            year.append(y)
+            month.append(mo)
+            day.append(d)
+            hour.append(h)
+            minute.append(mi)
+            second.append(s)
+            modifier.append(code)
+            if seq_exact:
+                sequence.append(int(seq))
+                sequence_width.append(len(seq))
+            else:
+                sequence.append(0)
+                sequence_width.append(0)
+            group.append(g)  # already interned by _match_fields
+            subgroup.append(sg)
+            extension.append(ext)
+
+        index_array = np.frombuffer(rows, dtype=np.int64)
+
+        def scatter(values: array, dtype: type) -> np.ndarray:
+            column = np.zeros(size, dtype=dtype)
+            column[index_array] = np.frombuffer(values, dtype=dtype)
+            return column
+
+        def scatter_objects(values: list[str]) -> np.ndarray:
+            column = np.full(size, None, dtype=object)
+            column[index_array] = np.array(values, dtype=object)
+            return column
+
+        valid = np.zeros(size, dtype=np.bool_)
+        valid[index_array] = True
+
+        return cls(
+            year=scatter(year, np.int64),
+            month=scatter(month, np.int64),
+            day=scatter(day, np.int64),
+            hour=scatter(hour, np.int64),
+            minute=scatter(minute, np.int64),
+            second=scatter(second, np.int64),
+            modifier=scatter(modifier, np.uint8),
+            group=scatter_objects(group),
+            subgroup=scatter_objects(subgroup),
+            sequence=scatter(sequence, np.int64),
+            sequence_width=scatter(sequence_width, np.uint8),
+            extension=scatter_objects(extension),
+            valid=valid,
+            overflow=overflow,
+        )
+
+    def __len__(self) -> int:
+        """Get the number of rows in the batch.
+
+        Returns:
+            Number of parsed names, valid or not.
+        """
+        return len(self.valid)
+
+    def row(self, index: int) -> Optional[ParsedFilename]:
+        """Build the ParsedFilename for one row.
+
+        Args:
+            index: Row index.
+
+        Returns:
+            The same value FilenameParser.parse returns for that name.
+        """
+        if not self.valid[index]:
+            return None
+
+        if index in self.overflow:
+            return self.overflow[index]
+
+        width = int(self.sequence_width[index])
+        return ParsedFilename(
+            int(self.year[index]),
+            int(self.month[index]),
+            int(self.day[index]),
+            int(self.hour[index]),
+            int(self.minute[index]),
+            int(self.second[index]),
+            chr(self.modifier[index]),
+            self.group[index],
+            self.subgroup[index],
+            f"{int(self.sequence[index]):0{width}d}",
+            self.extension[index],
+        )
+
+    def rows(self) -> Iterator[Optional[ParsedFilename]]:
+        """Iterate over all rows as ParsedFilename objects.
+
+        Yields:
+            ParsedFilename for each valid row, None for the others.
+        """
+        for index in range(len(self)):
+            yield self.row(index)
+
@@ -0,0 +1,129 @@
+"""Bounded least-recently-used cache with usage counters."""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class LRUCache(Generic[K, V]):
+    """Bounded mapping with least-recently-used eviction.
+
+    Counts hits, misses and evictions so the capacity can be sized from real
+    workloads. Safe to share between threads.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            capacity: Maximum number of entries. 0 disables caching.
+
+        Raises:
+            ValueError: If capacity is negative.
+        """
+        if capacity < 0:
+            raise ValueError(f"Cache capacity must not be negative: {capacity}")
+
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[K, V] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Get the number of cached entries.
+
+        Returns:
+            Number of entries.
+        """
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        """Check if a key is cached, without touching its recency or the counters.
+
+        Args:
+            key: Key to look up.
+
+        Returns:
+            True if the key is cached.
+        """
+        return key in self._data
+
+    def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Get the cached value for a key.
+
+        Args:
+            key: Key to look up.
+            default: Value returned on a miss.
+
+        Returns:
+            The cached value, or default.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def get_or_set(self, key: K, factory: Callable[[K], V]) -> V:
+        """Get the cached value for a key, computing and caching it on a miss.
+
+        Args:
+            key: Key to look up.
+            factory: Called with the key to compute a missing value.
+
+        Returns:
+            The cached or newly computed value.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = factory(key)
+        self.put(key, value)
+        return value
+
+    def put(self, key: K, value: V) -> None:
+        """Cache a value, evicting the least recently used entries over capacity.
+
+        Args:
+            key: Key to store.
+            value: Value to store.
+        """
+        if self.capacity == 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key: K) -> None:
+        """Remove an entry if it is cached.
+
+        Args:
+            key: Key to remove.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries. Counters are kept."""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,187 @@
+"""When written and moved files are flushed to disk."""
+
+import os
+import threading
+import weakref
+from pathlib import Path
+from typing import Optional
+
+from .fileio import fsync_directory
+
+DURABILITY_LEVELS = ("none", "per-file", "per-directory-batch", "group-commit")
+
+
+def fsync_file(path: Path) -> None:
+    """Flush a file's data and metadata to disk.
+
+    Args:
+        path: File to flush.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _sync_pending(files: set[Path], directories: dict[Path, int], lock: threading.Lock) -> tuple[int, int]:
+    """Flush and forget the pending files, then the pending directories.
+
+    Args:
+        files: Files to fsync.
+        directories: Directories to fsync, with the number of entries changed in each.
+        lock: Lock guarding files and directories.
+
+    Returns:
+        Tuple of (files synced, directories synced).
+    """
+    with lock:
+        pending_files, pending_directories = list(files), list(directories)
+        files.clear()
+        directories.clear()
+
+    for path in pending_files:
+        try:
+            fsync_file(path)
+        except FileNotFoundError:  # moved or removed since
+            pass
+    for directory in pending_directories:
+        try:
+            fsync_directory(directory)
+        except FileNotFoundError:
+            pass
+    return len(pending_files), len(pending_directories)
+
+
+class SyncPolicy:
+    """Flushes metadata writes and moves to disk at one of the DURABILITY_LEVELS.
+
+    - ``none``: nothing is flushed; the kernel writes the changes back in
+      its own time.
+    - ``per-file``: a file is fsynced after its metadata is written, and the
+      folder it is moved to after the move.
+    - ``per-directory-batch``: files are fsynced as with ``per-file``, but a
+      folder is fsynced once per ``batch_size`` files moved into it, and at
+      the latest ``interval_ms`` milliseconds after the first of them (and
+      on flush), covering all of their moves.
+    - ``group-commit``: the moved files and their folders are fsynced
+      together every ``interval_ms`` milliseconds, each folder once.
+
+    In the batched levels a crash loses at most the moves (and with
+    ``group-commit`` the writes) not yet flushed; since a rename is atomic, a
+    file whose move is lost is back in the watch folder and gets processed
+    again. A copy whose source is about to be removed is the exception: at
+    every level but ``none`` it is flushed with its folder right away.
+    Pending changes are also flushed when the policy is garbage collected or
+    the interpreter exits.
+    """
+
+    def __init__(self, level: str = "none", batch_size: int = 64, interval_ms: float = 50.0) -> None:
+        """Initialize the policy.
+
+        Args:
+            level: One of DURABILITY_LEVELS.
+            batch_size: Moves into a folder between its fsyncs, for
+                ``per-directory-batch``.
+            interval_ms: Milliseconds between flushes, for ``group-commit``,
+                and at most until a partial batch is flushed, for
+                ``per-directory-batch``.
+
+        Raises:
+            ValueError: If the level is unknown or batch_size or interval_ms
+                is not positive.
+        """
+        if level not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"Unknown durability: {level!r} (must be one of: {', '.join(DURABILITY_LEVELS)})"
+            )
+        if batch_size < 1:
+            raise ValueError(f"durability_batch must be at least 1: {batch_size}")
+        if interval_ms <= 0:
+            raise ValueError(f"durability_interval_ms must be positive: {interval_ms}")
+
+        self.level = level
+        self.batch_size = batch_size
+        self.interval_ms = interval_ms
+        self.files_synced = 0
+        self.directories_synced = 0
+        self._files: set[Path] = set()
+        self._directories: dict[Path, int] = {}
+        self._lock = threading.Lock()
+        # Held for a whole flush, so flush() returns only when earlier changes are on disk
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        weakref.finalize(self, _sync_pending, self._files, self._directories, self._lock)
+
+    def written(self, path: Path) -> None:
+        """Record that a file's metadata was written in place.
+
+        Args:
+            path: The written file, before it is moved.
+        """
+        if self.level in ("per-file", "per-directory-batch"):
+            fsync_file(path)
+            with self._lock:
+                self.files_synced += 1
+
+    def moved(self, path: Path, copied: bool = False) -> None:
+        """Record that a file was renamed to a new path.
+
+        Args:
+            path: The file's new path.
+            copied: The file is a copy whose source is removed next, so
+                unless the level is ``none`` it and its folder are flushed
+                now rather than batched.
+        """
+        directory = path.parent
+        if copied and self.level != "none":
+            files = 0
+            if self.level == "group-commit":  # not fsynced when written
+                fsync_file(path)
+                files = 1
+            fsync_directory(directory)
+            with self._lock:
+                self.files_synced += files
+                self.directories_synced += 1
+
+        elif self.level == "per-file":
+            fsync_directory(directory)
+            with self._lock:
+                self.directories_synced += 1
+
+        elif self.level == "per-directory-batch":
+            with self._lock:
+                count = self._directories.get(directory, 0) + 1
+                if count < self.batch_size:
+                    self._directories[directory] = count
+                    self._start_timer()
+                    return
+                self._directories.pop(directory, None)
+                self.directories_synced += 1
+            fsync_directory(directory)
+
+        elif self.level == "group-commit":
+            with self._lock:
+                self._files.add(path)
+                self._directories[directory] = self._directories.get(directory, 0) + 1
+                self._start_timer()
+
+    def flush(self) -> None:
+        """Flush all pending files and folders now."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+
+        with self._flush_lock:
+            files, directories = _sync_pending(self._files, self._directories, self._lock)
+            with self._lock:
+                self.files_synced += files
+                self.directories_synced += directories
+
+    def _start_timer(self) -> None:
+        """Schedule a flush in ``interval_ms`` milliseconds, unless one is scheduled; call with _lock held."""
+        if self._timer is None:
+            self._timer = threading.Timer(self.interval_ms / 1000, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
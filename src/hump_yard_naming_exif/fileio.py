@@ -0,0 +1,341 @@
+"""Low-level file I/O helpers shared by the metadata writers."""
+
+import errno
+import os
+import shutil
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Optional
+
+from .cache import LRUCache
+
+if TYPE_CHECKING:
+    from hashlib import _Hash
+
+# Chunk size for streaming file data
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Ways move_file copies data across filesystems, in the order they are tried
+COPY_STRATEGIES = ("copy_file_range", "sendfile", "chunked")
+
+# Largest count passed to one kernel copy call (sendfile stops at 2 GiB)
+_KERNEL_COPY_CHUNK = 1 << 30
+
+# Errors of the first kernel copy call meaning "not supported here, copy another way"
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+# renameat2() arguments: paths relative to the working directory, fail on an existing target
+_AT_FDCWD = -100
+_RENAME_NOREPLACE = 1
+
+# Errors meaning the filesystem cannot do a no-overwrite rename or a hard link
+_NO_RENAMEAT2 = {errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP}
+_NO_LINK = {errno.EPERM, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EMLINK}
+
+# Fallback rename_noreplace uses in a target directory where renameat2 failed
+_rename_fallbacks: LRUCache[Path, str] = LRUCache(256)
+
+# libc renameat2 once looked up: None before, False if missing
+_renameat2: Any = None
+
+
+def pwrite(file: BinaryIO, payload: bytes, offset: int) -> None:
+    """Write bytes at an offset with one system call where the platform has pwrite.
+
+    Args:
+        file: File opened for writing.
+        payload: Bytes to write.
+        offset: File offset.
+    """
+    if hasattr(os, "pwrite"):
+        written = os.pwrite(file.fileno(), payload, offset)
+        if written == len(payload):
+            return
+        payload, offset = payload[written:], offset + written
+    file.seek(offset)
+    file.write(payload)
+
+
+def _kernel_copy(strategy: str, source_fd: int, target_fd: int) -> Optional[int]:
+    """Copy the rest of a file without passing the data through userspace.
+
+    Both descriptors are read and written from their current positions,
+    which are advanced past the copied bytes.
+
+    Args:
+        strategy: ``"copy_file_range"`` or ``"sendfile"``.
+        source_fd: Descriptor to read from.
+        target_fd: Descriptor to write to.
+
+    Returns:
+        Number of bytes copied, or None if the platform or the pair of files
+        does not support the strategy, including when the first call copies
+        nothing (as on FUSE and procfs, and across filesystems on some
+        kernels). Nothing has been copied then.
+
+    Raises:
+        OSError: If the copy fails after it started.
+    """
+    if not hasattr(os, strategy):
+        return None
+
+    copied = 0
+    while True:
+        try:
+            if strategy == "copy_file_range":
+                count = os.copy_file_range(source_fd, target_fd, _KERNEL_COPY_CHUNK)
+            else:
+                count = os.sendfile(target_fd, source_fd, None, _KERNEL_COPY_CHUNK)
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED:
+                return None
+            raise
+        if not count:
+            # Also 0 for an empty source, which the buffered copy handles as well
+            return copied if copied else None
+        copied += count
+
+
+def copy_stream(
+    source: BinaryIO,
+    target: BinaryIO,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+    digest: "Optional[_Hash]" = None,
+    strategies: tuple[str, ...] = COPY_STRATEGIES,
+) -> int:
+    """Copy the rest of a file.
+
+    The kernel copies the data (copy_file_range, then sendfile) when both
+    are real files; otherwise, or when a digest is asked for, the data goes
+    through a single reused buffer.
+
+    Args:
+        source: Unbuffered file to read from, at the position to copy from.
+        target: File to write to.
+        chunk_size: Size of the buffer.
+        digest: Hash object updated with the copied bytes.
+        strategies: Strategies to try, out of COPY_STRATEGIES; the buffered
+            copy is used when none of them works.
+
+    Returns:
+        Number of bytes copied.
+    """
+    if digest is None:
+        for strategy in strategies:
+            if strategy == "chunked":
+                break
+            try:
+                source_fd, target_fd = source.fileno(), target.fileno()
+            except (AttributeError, OSError):  # in-memory file
+                break
+            target.flush()
+            position = target.tell()
+            copied = _kernel_copy(strategy, source_fd, target_fd)
+            if copied is not None:
+                # Move a buffered target past the bytes written below it
+                target.seek(position + copied)
+                return copied
+
+    buffer = memoryview(bytearray(chunk_size))
+    copied = 0
+    while True:
+        count = source.readinto(buffer)
+        if not count:
+            return copied
+        chunk = buffer[:count]
+        target.write(chunk)
+        if digest is not None:
+            digest.update(chunk)
+        copied += count
+
+
+def copy_file(
+    source: BinaryIO,
+    target: BinaryIO,
+    checksum: Optional[str] = None,
+    strategies: tuple[str, ...] = COPY_STRATEGIES,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> tuple[str, Optional[str]]:
+    """Copy an open file, reporting how it was copied.
+
+    Args:
+        source: Unbuffered file to read from, at its start.
+        target: Unbuffered empty file to write to.
+        checksum: Name of a hashlib algorithm to compute a checksum of the
+            data with. The data then goes through userspace, hashed in the
+            same pass that copies it.
+        strategies: Strategies to try, out of COPY_STRATEGIES.
+        chunk_size: Buffer size of the chunked copy.
+
+    Returns:
+        Tuple of (strategy used, hex digest or None).
+    """
+    if checksum is None:
+        for strategy in strategies:
+            if strategy == "chunked":
+                break
+            if _kernel_copy(strategy, source.fileno(), target.fileno()) is not None:
+                return strategy, None
+
+    # Deferred: only needed for checksums
+    import hashlib
+
+    digest = hashlib.new(checksum) if checksum else None
+    copy_stream(source, target, chunk_size, digest, strategies=("chunked",))
+    return "chunked", digest.hexdigest() if digest else None
+
+
+def move_file(
+    source: Path,
+    target: Path,
+    checksum: Optional[str] = None,
+    strategies: tuple[str, ...] = COPY_STRATEGIES,
+) -> tuple[str, Optional[str]]:
+    """Move a file, copying it when the target is on another filesystem.
+
+    A rename is tried first. Across filesystems the data is copied into a
+    temporary file next to the target (see copy_file), which gets the
+    source's permissions and times and is renamed to the target; the
+    source is removed last, once the copy is known to have the source's
+    size and it and its name are flushed to disk. An interrupted or short
+    copy leaves no partial target, and a crash never loses both.
+    An existing target is never replaced (see rename_noreplace).
+
+    Args:
+        source: File to move.
+        target: New path.
+        checksum: Name of a hashlib algorithm to compute a checksum of the
+            copied data with.
+        strategies: Copy strategies to try, out of COPY_STRATEGIES.
+
+    Returns:
+        Tuple of (``"rename"`` or the copy strategy used, hex digest of the
+        copied data or None). Renamed files are not read, so have no digest.
+
+    Raises:
+        FileExistsError: If target exists. The source is then unchanged.
+        OSError: If the file cannot be moved. The source is then unchanged.
+    """
+    try:
+        rename_noreplace(source, target)
+        return "rename", None
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    # Deferred: only needed for moves across filesystems
+    import tempfile
+
+    fd, temp_name = tempfile.mkstemp(prefix=f".{target.name}.", suffix=".tmp", dir=target.parent)
+    try:
+        with open(source, "rb", buffering=0) as reader, open(fd, "wb", buffering=0) as writer:
+            result = copy_file(reader, writer, checksum, strategies)
+            size, copied = os.fstat(reader.fileno()).st_size, os.fstat(writer.fileno()).st_size
+            if copied != size:
+                raise OSError(errno.EIO, f"Copied {copied} of {size} bytes", str(source))
+            os.fsync(writer.fileno())
+        shutil.copystat(source, temp_name)
+        rename_noreplace(Path(temp_name), target)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+    fsync_directory(target.parent)
+    os.unlink(source)
+    return result
+
+
+def _load_renameat2() -> Any:
+    """Look up renameat2 in the C library.
+
+    Returns:
+        The ctypes function, or None where the platform or C library lacks it.
+    """
+    global _renameat2
+    if _renameat2 is None:
+        _renameat2 = False
+        if sys.platform.startswith("linux"):
+            # Deferred: ctypes is only needed for the first no-overwrite rename
+            import ctypes
+
+            try:
+                function = ctypes.CDLL(None, use_errno=True).renameat2
+            except (OSError, AttributeError):  # glibc < 2.28, other C libraries
+                pass
+            else:
+                path = ctypes.c_char_p
+                function.argtypes = (ctypes.c_int, path, ctypes.c_int, path, ctypes.c_uint)
+                function.restype = ctypes.c_int
+                _renameat2 = function
+    return _renameat2 or None
+
+
+def rename_noreplace(source: Path, target: Path) -> None:
+    """Rename a file unless the target exists, in one atomic step where possible.
+
+    On Linux this is renameat2 with RENAME_NOREPLACE. Where the filesystem
+    does not support that (NFS, for one), the target is hard-linked to the
+    source and the source unlinked, which fails just as atomically on an
+    existing target. On filesystems without hard links the target is checked
+    and then renamed, which is not atomic. The fallback a target directory
+    needs is remembered, so it costs no failed call after the first.
+
+    Args:
+        source: File to rename.
+        target: New path.
+
+    Raises:
+        FileExistsError: If target exists. The source is then unchanged.
+        OSError: If the file cannot be renamed, with errno EXDEV if target is
+            on another filesystem.
+    """
+    directory = target.parent
+    fallback = _rename_fallbacks.get(directory)
+
+    if fallback is None:
+        renameat2 = _load_renameat2()
+        if renameat2 is not None:
+            paths = os.fsencode(source), os.fsencode(target)
+            if renameat2(_AT_FDCWD, paths[0], _AT_FDCWD, paths[1], _RENAME_NOREPLACE) == 0:
+                return
+            # Deferred: loaded by _load_renameat2 already
+            import ctypes
+
+            error = ctypes.get_errno()
+            if error not in _NO_RENAMEAT2:
+                raise OSError(error, os.strerror(error), str(source), None, str(target))
+        fallback = "link"
+        _rename_fallbacks.put(directory, fallback)
+
+    if fallback == "link":
+        try:
+            os.link(source, target)
+        except OSError as e:
+            if e.errno not in _NO_LINK:
+                raise
+            fallback = "rename"
+            _rename_fallbacks.put(directory, fallback)
+        else:
+            os.unlink(source)
+            return
+
+    if os.path.lexists(target):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), str(target))
+    os.rename(source, target)
+
+
+def fsync_directory(path: "os.PathLike[str] | str") -> None:
+    """Flush a directory entry change (create, rename, unlink) to disk.
+
+    Does nothing on platforms where directories cannot be opened (Windows).
+
+    Args:
+        path: Directory to flush.
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except (PermissionError, IsADirectoryError):
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,249 @@
+"""Metadata writes in a supervised child process, isolated from crashes and hangs."""
+
+import threading
+from enum import Enum
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+
+class WriteStatus(Enum):
+    """Outcome of an isolated metadata write."""
+
+    OK = "ok"
+    FAILED = "failed"  # pyexiv2 raised an error; the writer is still healthy
+    CRASHED = "crashed"  # the writer process died
+    TIMED_OUT = "timed_out"  # the writer did not answer in time and was killed
+
+
+def _write_file(file_path: str, exif_dict: dict[str, str], xmp_dict: dict[str, str]) -> None:
+    """Write EXIF and XMP values to a file with pyexiv2.
+
+    Args:
+        file_path: Path to the file.
+        exif_dict: EXIF values to write.
+        xmp_dict: XMP values to write.
+    """
+    # Deferred: loading the exiv2 library is the most expensive import of the plugin
+    import pyexiv2
+
+    with pyexiv2.Image(file_path) as img:
+        if exif_dict:
+            img.modify_exif(exif_dict)
+        if xmp_dict:
+            img.modify_xmp(xmp_dict)
+
+
+def _writer_main(conn: "Connection") -> None:
+    """Serve write requests received over a pipe until told to stop.
+
+    Requests are (file_path, exif_dict, xmp_dict); None stops the writer.
+    Each reply is None on success or the error message.
+
+    Args:
+        conn: Writer end of the pipe.
+    """
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        try:
+            _write_file(*request)
+        except Exception as e:
+            conn.send(str(e) or type(e).__name__)
+        else:
+            conn.send(None)
+
+    conn.close()
+
+
+class IsolatedWriter:
+    """Child process that performs pyexiv2 writes for the parent.
+
+    A segfault or hang inside exiv2 only takes down the child: the parent
+    sees a closed pipe or a missed deadline, kills what is left of the child
+    and starts a fresh one for the next file. One writer handles one file at
+    a time; use one writer per concurrent caller.
+    """
+
+    TIMEOUT = 30.0
+    STOP_TIMEOUT = 5.0
+
+    def __init__(self, context: Optional[str] = None) -> None:
+        """Initialize the writer. The child process is started on first use.
+
+        Args:
+            context: multiprocessing start method ("fork", "spawn", "forkserver").
+                Defaults to the platform default.
+        """
+        self.restarts = 0
+        self._context_name = context
+        self._process: Optional["BaseProcess"] = None
+        self._conn: Optional["Connection"] = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Get the process ID of the child, if it is running.
+
+        Returns:
+            Child process ID, or None.
+        """
+        if self._process is None or not self._process.is_alive():
+            return None
+        return self._process.pid
+
+    def write(
+        self,
+        file_path: str,
+        exif_dict: dict[str, str],
+        xmp_dict: dict[str, str],
+        timeout: Optional[float] = TIMEOUT,
+    ) -> tuple[WriteStatus, Optional[str]]:
+        """Write EXIF and XMP values to a file in the child process.
+
+        Args:
+            file_path: Path to the file.
+            exif_dict: EXIF values to write.
+            xmp_dict: XMP values to write.
+            timeout: Seconds to wait for the write. None waits forever.
+
+        Returns:
+            Tuple of (status, error message or None).
+        """
+        if self._process is None or not self._process.is_alive():
+            self._start()
+        assert self._conn is not None
+
+        try:
+            self._conn.send((file_path, exif_dict, xmp_dict))
+            if not self._conn.poll(timeout):
+                self._kill()
+                return WriteStatus.TIMED_OUT, f"No answer within {timeout} seconds"
+            error = self._conn.recv()
+        except (EOFError, OSError):
+            exitcode = self._kill()
+            return WriteStatus.CRASHED, f"Writer process exited with code {exitcode}"
+
+        if error is not None:
+            return WriteStatus.FAILED, error
+        return WriteStatus.OK, None
+
+    def close(self) -> None:
+        """Stop the child process."""
+        if self._process is None:
+            return
+        assert self._conn is not None
+
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self._process.join(self.STOP_TIMEOUT)
+        self._kill()
+        self._process = None
+
+    def _start(self) -> None:
+        """Start a child process, replacing a dead one."""
+        if self._process is not None:
+            self._kill()
+            self.restarts += 1
+
+        import multiprocessing
+
+        context = multiprocessing.get_context(self._context_name)
+        self._conn, child_conn = context.Pipe()
+        self._process = context.Process(
+            target=_writer_main,
+            args=(child_conn,),
+            name="naming_exif-writer",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+    def _kill(self) -> Optional[int]:
+        """Kill the child process if it is still running and close the pipe.
+
+        Returns:
+            Exit code of the child.
+        """
+        assert self._process is not None and self._conn is not None
+
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+        self._conn.close()
+        return self._process.exitcode
+
+
+class IsolatedWriterPool:
+    """Idle IsolatedWriters, handed out one per concurrent caller.
+
+    Writers are created on demand, so the pool grows to the peak number of
+    concurrent writes and then stays that size.
+    """
+
+    def __init__(self, context: Optional[str] = None) -> None:
+        """Initialize an empty pool.
+
+        Args:
+            context: multiprocessing start method for the writers.
+        """
+        self._context = context
+        self._idle: list[IsolatedWriter] = []
+        self._all: list[IsolatedWriter] = []
+        self._lock = threading.Lock()
+
+    @property
+    def restarts(self) -> int:
+        """Get the number of writer processes restarted after a crash or hang.
+
+        Returns:
+            Total restarts of all writers.
+        """
+        return sum(writer.restarts for writer in self._all)
+
+    def write(
+        self,
+        file_path: str,
+        exif_dict: dict[str, str],
+        xmp_dict: dict[str, str],
+        timeout: Optional[float] = IsolatedWriter.TIMEOUT,
+    ) -> tuple[WriteStatus, Optional[str]]:
+        """Write EXIF and XMP values to a file on an idle writer.
+
+        Args:
+            file_path: Path to the file.
+            exif_dict: EXIF values to write.
+            xmp_dict: XMP values to write.
+            timeout: Seconds to wait for the write. None waits forever.
+
+        Returns:
+            Tuple of (status, error message or None).
+        """
+        with self._lock:
+            if self._idle:
+                writer = self._idle.pop()
+            else:
+                writer = IsolatedWriter(self._context)
+                self._all.append(writer)
+
+        try:
+            return writer.write(file_path, exif_dict, xmp_dict, timeout)
+        finally:
+            with self._lock:
+                self._idle.append(writer)
+
+    def close(self) -> None:
+        """Stop all writer processes."""
+        with self._lock:
+            for writer in self._all:
+                writer.close()
+            self._idle.clear()
+            self._all.clear()
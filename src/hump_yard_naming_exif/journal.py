@@ -0,0 +1,284 @@
+"""SQLite journal of the files being processed, to resume them after a crash."""
+
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import sqlite3
+
+JOURNAL_STATES = ("parsed", "written", "moved")
+
+# (path, state, target, size, mtime_ns, inode, updated)
+_Row = tuple[str, str, Optional[str], Optional[int], Optional[int], Optional[int], float]
+# (size, mtime_ns, inode) of a written file
+_Signature = tuple[int, int, int]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    target TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    inode INTEGER,
+    updated REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def _signature(path: Path) -> _Signature:
+    """Get what identifies a file's current contents without reading them.
+
+    Args:
+        path: File to stat.
+
+    Returns:
+        Tuple of (size, mtime_ns, inode).
+    """
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+def _key(path: Path) -> str:
+    """Get the absolute path a file is journaled under.
+
+    Args:
+        path: File path, absolute or relative to the working directory.
+
+    Returns:
+        The absolute path as a string.
+    """
+    name = os.fspath(path)
+    # abspath normalizes even absolute paths, which is most of its cost
+    return name if os.path.isabs(name) else os.path.abspath(name)
+
+
+def _commit_rows(connection: "sqlite3.Connection", rows: dict[str, _Row], lock: threading.Lock) -> int:
+    """Write and forget the pending rows in one transaction.
+
+    Rows of moved files are deleted instead of written.
+
+    Args:
+        connection: Journal database.
+        rows: Pending rows by path.
+        lock: Lock guarding rows.
+
+    Returns:
+        Number of rows written.
+    """
+    with lock:
+        pending = list(rows.values())
+        rows.clear()
+    if pending:
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [row for row in pending if row[1] != "moved"],
+            )
+            connection.executemany(
+                "DELETE FROM files WHERE path = ?", [(row[0],) for row in pending if row[1] == "moved"]
+            )
+    return len(pending)
+
+
+def _close(connection: "sqlite3.Connection", rows: dict[str, _Row], lock: threading.Lock) -> None:
+    """Commit the pending rows and close the database.
+
+    Args:
+        connection: Journal database.
+        rows: Pending rows by path.
+        lock: Lock guarding rows.
+    """
+    try:
+        _commit_rows(connection, rows, lock)
+    finally:
+        connection.close()
+
+
+class ProcessingJournal:
+    """Records in a SQLite database how far each file got, so a restart can resume it.
+
+    Each file in progress has its latest state in one row keyed by its
+    absolute path: ``parsed`` when its metadata is about to be written, and
+    ``written`` once it is, with the size, modification time and inode of
+    the written file (the image, its sidecar or a copy in processed/). A
+    file is ``moved`` once it is in processed/, and its row is then deleted,
+    so the table does not grow with every file ever processed. A file found
+    ``written`` on restart whose written file still has that size, time and
+    inode has its metadata already, so it is only moved (see resumable).
+
+    Changes are kept in memory and committed together once ``batch_size``
+    are pending, ``interval_ms`` milliseconds after the first of them, on
+    commit() and when the journal is closed or garbage collected. The
+    database is in WAL mode with ``synchronous=NORMAL``, so a commit is a
+    sequential append to the WAL that is not fsynced. A crash loses at most
+    the changes not yet committed, and a file whose ``written`` state is lost
+    is written again, as it would be without a journal.
+    """
+
+    def __init__(self, path: Path, batch_size: int = 256, interval_ms: float = 1000.0) -> None:
+        """Open the journal, creating the database if it does not exist.
+
+        Args:
+            path: SQLite database file.
+            batch_size: Changes kept in memory before they are committed.
+            interval_ms: Milliseconds a change is kept in memory at most.
+
+        Raises:
+            ValueError: If batch_size or interval_ms is not positive.
+            sqlite3.Error: If the database cannot be opened.
+        """
+        if batch_size < 1:
+            raise ValueError(f"journal_batch must be at least 1: {batch_size}")
+        if interval_ms <= 0:
+            raise ValueError(f"journal_interval_ms must be positive: {interval_ms}")
+
+        # Deferred: only needed with the journal option
+        import sqlite3
+
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.interval_ms = interval_ms
+        self.rows_committed = 0
+        # Shared with the commit timer thread; every use is under _commit_lock
+        self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            with self._connection:
+                self._connection.execute(_SCHEMA)
+            # Files not yet moved: the only ones a restart can resume
+            self._unfinished: dict[str, tuple[str, _Signature]] = {
+                path: (target, (size, mtime_ns, inode))
+                for path, target, size, mtime_ns, inode in self._connection.execute(
+                    "SELECT path, target, size, mtime_ns, inode FROM files WHERE state = 'written'"
+                )
+            }
+        except BaseException:
+            self._connection.close()
+            raise
+
+        self._rows: dict[str, _Row] = {}
+        self._lock = threading.Lock()
+        # Held for a whole commit, so commit() returns only when earlier changes are in the database
+        self._commit_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._closer = weakref.finalize(self, _close, self._connection, self._rows, self._lock)
+
+    def resumable(self, file_path: Path) -> Optional[Path]:
+        """Get the file a previous run wrote a file's metadata to, if it is still as written.
+
+        Args:
+            file_path: Path of the file in the watch folder.
+
+        Returns:
+            The written file (the file itself, its sidecar or its copy in
+            processed/) if the file is ``written`` and the written file's
+            size, modification time and inode are unchanged, None otherwise.
+        """
+        if not self._unfinished:
+            return None
+        entry = self._unfinished.get(_key(file_path))
+        if entry is None:
+            return None
+        target, signature = entry
+        try:
+            if _signature(Path(target)) != signature:
+                return None
+        except OSError:
+            return None
+        return Path(target)
+
+    def parsed(self, file_path: Path) -> None:
+        """Record that a file's metadata is about to be written.
+
+        Args:
+            file_path: Path of the file in the watch folder.
+        """
+        key = _key(file_path)
+        self._unfinished.pop(key, None)
+        self._record((key, "parsed", None, None, None, None, time.time()))
+
+    def written(self, file_path: Path, target: Path) -> None:
+        """Record that a file's metadata was written.
+
+        Args:
+            file_path: Path of the file in the watch folder.
+            target: The file written: the file itself, its sidecar or its
+                copy in processed/.
+        """
+        key = _key(file_path)
+        target_key = key if target is file_path else _key(target)
+        signature = _signature(target)
+        self._unfinished[key] = (target_key, signature)
+        self._record((key, "written", target_key, *signature, time.time()))
+
+    def moved(self, file_path: Path) -> None:
+        """Record that a file was moved to processed/, deleting its row when committed.
+
+        Args:
+            file_path: Path the file had in the watch folder.
+        """
+        key = _key(file_path)
+        self._unfinished.pop(key, None)
+        self._record((key, "moved", None, None, None, None, time.time()))
+
+    def state(self, file_path: Path) -> Optional[str]:
+        """Get a file's latest state, committed or not.
+
+        Args:
+            file_path: Path of the file in the watch folder.
+
+        Returns:
+            One of JOURNAL_STATES, or None if the file is not in the journal,
+            as a moved file is not once the move is committed.
+        """
+        key = _key(file_path)
+        with self._lock:
+            row = self._rows.get(key)
+        if row is not None:
+            return row[1]
+        with self._commit_lock:
+            found = self._connection.execute("SELECT state FROM files WHERE path = ?", (key,)).fetchone()
+        return found[0] if found else None
+
+    def commit(self) -> None:
+        """Commit all pending changes now."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None and timer is not threading.current_thread():
+            timer.cancel()
+
+        with self._commit_lock:
+            if not self._closer.alive:
+                return
+            committed = _commit_rows(self._connection, self._rows, self._lock)
+            with self._lock:
+                self.rows_committed += committed
+
+    def close(self) -> None:
+        """Commit the pending changes and close the database."""
+        self.commit()
+        with self._commit_lock:
+            self._closer()
+
+    def _record(self, row: _Row) -> None:
+        """Queue a file's new state, committing the queue once it is full.
+
+        Args:
+            row: The file's row.
+        """
+        with self._lock:
+            # Only the latest state of a file matters once committed
+            self._rows[row[0]] = row
+            full = len(self._rows) >= self.batch_size
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.interval_ms / 1000, self.commit)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.commit()
@@ -0,0 +1,372 @@
+"""Metadata updates for JPEG files without exiv2.
+
+XMP packets are written with whitespace padding so that they can be edited
+without moving the rest of the file. When the updated packet fits in the
+space of the old one, and every EXIF value to write already has a slot of
+the right size, the new bytes are written over the old ones and nothing
+else in the file is touched.
+
+Otherwise the file is rewritten: the marker segments are copied with new
+Exif and XMP segments, and the image data is streamed in fixed-size chunks,
+so memory use does not grow with the size of the image.
+"""
+
+import mmap
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from .fileio import STREAM_CHUNK_SIZE, copy_stream, pwrite
+from .sidecar import build_xmp_packet
+from .tiff import EXIF_IFD0_TAGS, update_tiff_bytes
+from .xmp import update_xmp_packet
+
+XMP_SIGNATURE = b"http://ns.adobe.com/xap/1.0/\x00"
+EXIF_SIGNATURE = b"Exif\x00\x00"
+
+_SOI = b"\xff\xd8"
+_APP1 = 0xE1
+_SOS = 0xDA
+_EOI = 0xD9
+# Padding added to rewritten XMP packets, leaving room for in-place updates
+XMP_PADDING = 2048
+
+_APP0 = 0xE0
+_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD8)}
+_MAX_PAYLOAD = 0xFFFF - 2
+# Exif TIFF structure with an empty IFD0, for files without an Exif segment
+_EMPTY_EXIF_TIFF = b"II*\x00\x08\x00\x00\x00" + b"\x00\x00" + b"\x00\x00\x00\x00"
+
+# Patch to apply: (file offset, bytes)
+_Patch = tuple[int, bytes]
+
+
+def _segments(data: mmap.mmap) -> Iterator[tuple[int, int, int]]:
+    """Walk the marker segments in front of the image data.
+
+    Args:
+        data: Mapped JPEG file.
+
+    Yields:
+        (marker, payload offset, payload length) for each segment up to and
+        including the start of scan header.
+    """
+    pos = len(_SOI)
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return
+        marker = data[pos + 1]
+        if marker == 0xFF:  # fill byte
+            pos += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if marker == _EOI:
+            return
+
+        length = int.from_bytes(data[pos + 2:pos + 4], "big")
+        if length < 2 or pos + 2 + length > len(data):
+            return
+        yield marker, pos + 4, length - 2
+        if marker == _SOS:
+            return
+        pos += 2 + length
+
+
+def _xmp_patch(data: mmap.mmap, offset: int, length: int, xmp_dict: dict[str, str]) -> Optional[_Patch]:
+    """Build the replacement of an XMP packet with the values set.
+
+    Args:
+        data: Mapped JPEG file.
+        offset: Offset of the packet (after the XMP signature).
+        length: Space available for the packet, padding included.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+
+    Returns:
+        Patch with exactly ``length`` bytes, or None if the packet cannot be updated in that space.
+    """
+    packet = update_xmp_packet(data[offset:offset + length], xmp_dict, length)
+    return None if packet is None else (offset, packet)
+
+
+def _exif_patch(data: mmap.mmap, offset: int, length: int, key: str, value: str) -> Optional[_Patch]:
+    """Build the overwrite of an existing ASCII EXIF value of the same length.
+
+    Args:
+        data: Mapped JPEG file.
+        offset: Offset of the APP1 payload (at the EXIF signature).
+        length: Length of the APP1 payload.
+        key: pyexiv2 EXIF key.
+        value: New value.
+
+    Returns:
+        Patch, or None if the tag is not present in IFD0 with room for exactly this value.
+    """
+    tag = EXIF_IFD0_TAGS.get(key)
+    tiff = offset + len(EXIF_SIGNATURE)
+    end = offset + length
+    if tag is None or tiff + 8 > end:
+        return None
+
+    byte_order = {b"II": "little", b"MM": "big"}.get(bytes(data[tiff:tiff + 2]))
+    if byte_order is None:
+        return None
+
+    def read(position: int, size: int) -> int:
+        return int.from_bytes(data[position:position + size], byte_order)
+
+    ifd = tiff + read(tiff + 4, 4)
+    if ifd + 2 > end:
+        return None
+
+    encoded = value.encode("ascii") + b"\x00"
+    for entry in range(ifd + 2, min(ifd + 2 + 12 * read(ifd, 2), end - 11), 12):
+        if read(entry, 2) != tag:
+            continue
+        # ASCII (type 2) value stored outside the entry with the same length
+        if read(entry + 2, 2) != 2 or read(entry + 4, 4) != len(encoded) or len(encoded) <= 4:
+            return None
+        value_offset = tiff + read(entry + 8, 4)
+        if value_offset + len(encoded) > end:
+            return None
+        return value_offset, encoded
+
+    return None
+
+
+def update_jpeg_in_place(
+    file_path: Path, exif_dict: dict[str, str], xmp_dict: dict[str, str]
+) -> Optional[int]:
+    """Write EXIF and XMP values into a JPEG without rewriting it.
+
+    The marker segments are scanned through a read-only memory map, so only
+    the pages holding the headers are read. Either all values are updated
+    in place, or the file is left untouched.
+
+    Args:
+        file_path: Path to the JPEG.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+
+    Returns:
+        Number of bytes written, or None if the values cannot be written in
+        place (no XMP packet, not enough padding, or an EXIF slot missing).
+
+    Raises:
+        OSError: If the file cannot be opened or written.
+    """
+    with open(file_path, "r+b") as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+        with data:
+            if data[:len(_SOI)] != _SOI:
+                return None
+
+            xmp_segment = exif_segment = None
+            for marker, offset, length in _segments(data):
+                if marker != _APP1:
+                    continue
+                if xmp_segment is None and data[offset:offset + len(XMP_SIGNATURE)] == XMP_SIGNATURE:
+                    xmp_segment = (offset + len(XMP_SIGNATURE), length - len(XMP_SIGNATURE))
+                elif exif_segment is None and data[offset:offset + len(EXIF_SIGNATURE)] == EXIF_SIGNATURE:
+                    exif_segment = (offset, length)
+
+            patches: list[_Patch] = []
+            if xmp_dict:
+                xmp_patch = _xmp_patch(data, *xmp_segment, xmp_dict) if xmp_segment else None
+                if xmp_patch is None:
+                    return None
+                patches.append(xmp_patch)
+            for key, value in exif_dict.items():
+                exif_patch = _exif_patch(data, *exif_segment, key, value) if exif_segment else None
+                if exif_patch is None:
+                    return None
+                patches.append(exif_patch)
+
+        for offset, payload in patches:
+            pwrite(file, payload, offset)
+        file.flush()
+
+    return sum(len(payload) for _, payload in patches)
+
+
+def _segment(marker: int, payload: bytes) -> bytes:
+    """Encode a marker segment.
+
+    Args:
+        marker: Marker code.
+        payload: Segment payload.
+
+    Returns:
+        Marker, length and payload.
+    """
+    return bytes((0xFF, marker)) + (len(payload) + 2).to_bytes(2, "big") + payload
+
+
+def _rewritten_header(
+    data: mmap.mmap, exif_dict: dict[str, str], xmp_dict: dict[str, str]
+) -> Optional[tuple[bytes, int]]:
+    """Build the marker segments of a JPEG with the Exif and XMP segments updated.
+
+    Existing Exif and XMP segments are updated where they are; missing ones
+    are inserted after the JFIF segment. All other segments are copied as
+    they are.
+
+    Args:
+        data: Mapped JPEG file.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+
+    Returns:
+        Tuple of (new file contents up to the start of scan, offset of the
+        start of scan marker in the old file), or None if the file has no
+        start of scan or a new segment would be too large.
+    """
+    segments: list[bytes] = []
+    exif_index = xmp_index = None
+    sos = None
+    for marker, offset, length in _segments(data):
+        if marker == _SOS:
+            sos = offset - 4
+            break
+        payload = data[offset:offset + length]
+        if marker == _APP1 and exif_index is None and payload.startswith(EXIF_SIGNATURE):
+            exif_index = len(segments)
+        elif marker == _APP1 and xmp_index is None and payload.startswith(XMP_SIGNATURE):
+            xmp_index = len(segments)
+        segments.append(data[offset - 4:offset + length])
+    if sos is None:
+        return None
+
+    insert_at = 0
+    while insert_at < len(segments) and segments[insert_at][1] == _APP0:
+        insert_at += 1
+
+    if exif_dict:
+        old_tiff = _EMPTY_EXIF_TIFF if exif_index is None else segments[exif_index][4 + len(EXIF_SIGNATURE):]
+        tiff = update_tiff_bytes(old_tiff, exif_dict, {})
+        if tiff is None or len(EXIF_SIGNATURE) + len(tiff) > _MAX_PAYLOAD:
+            return None
+        exif_segment = _segment(_APP1, EXIF_SIGNATURE + tiff)
+        if exif_index is None:
+            exif_index = insert_at
+            segments.insert(exif_index, exif_segment)
+            if xmp_index is not None and xmp_index >= exif_index:
+                xmp_index += 1
+        else:
+            segments[exif_index] = exif_segment
+
+    if xmp_dict:
+        old_packet = segments[xmp_index][4 + len(XMP_SIGNATURE):] if xmp_index is not None else None
+        try:
+            packet = update_xmp_packet(old_packet or build_xmp_packet({}, xmp_dict), xmp_dict)
+        except ValueError:  # unknown namespace prefix
+            return None
+        if packet is None:
+            return None
+        trailer = packet.rindex(b"<?xpacket end=")
+        packet = packet[:trailer] + b" " * XMP_PADDING + b"\n" + packet[trailer:]
+        if len(XMP_SIGNATURE) + len(packet) > _MAX_PAYLOAD:
+            return None
+        xmp_segment = _segment(_APP1, XMP_SIGNATURE + packet)
+        if xmp_index is None:
+            segments.insert(insert_at if exif_index is None else exif_index + 1, xmp_segment)
+        else:
+            segments[xmp_index] = xmp_segment
+
+    return _SOI + b"".join(segments), sos
+
+
+def copy_jpeg_with_metadata(
+    file_path: Path,
+    exif_dict: dict[str, str],
+    xmp_dict: dict[str, str],
+    target: BinaryIO,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Optional[int]:
+    """Write a copy of a JPEG with updated Exif and XMP segments to an open file.
+
+    The marker segments are built in memory and the image data is streamed
+    in chunks, so memory use is bounded by the size of the marker segments
+    plus one chunk, whatever the size of the image. The new XMP packet gets
+    ``XMP_PADDING`` bytes of padding, so later updates can be made in place.
+
+    Args:
+        file_path: Path to the JPEG.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+        target: File to write the copy to.
+        chunk_size: Size of the chunks the image data is copied in.
+
+    Returns:
+        Number of bytes written, or None if the file cannot be copied this
+        way (not a JPEG, no start of scan, a damaged Exif segment or XMP
+        packet, or a segment that would outgrow 64 KiB). Nothing is written
+        to target then.
+
+    Raises:
+        OSError: If the file cannot be read or the copy cannot be written.
+    """
+    with open(file_path, "rb", buffering=0) as source:
+        try:
+            data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+        with data:
+            rewritten = _rewritten_header(data, exif_dict, xmp_dict) if data[:len(_SOI)] == _SOI else None
+        if rewritten is None:
+            return None
+        header, sos = rewritten
+
+        target.write(header)
+        source.seek(sos)
+        return len(header) + copy_stream(source, target, chunk_size)
+
+
+def rewrite_jpeg(
+    file_path: Path,
+    exif_dict: dict[str, str],
+    xmp_dict: dict[str, str],
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Optional[int]:
+    """Rewrite a JPEG with updated Exif and XMP segments, streaming the image data.
+
+    The copy is written to a temporary file in the same folder and renamed
+    over the original, so a failed write leaves the original as it was.
+
+    Args:
+        file_path: Path to the JPEG.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+        chunk_size: Size of the chunks the image data is copied in.
+
+    Returns:
+        Number of bytes written, or None if the file cannot be rewritten
+        this way (see copy_jpeg_with_metadata). The file is then unchanged.
+
+    Raises:
+        OSError: If the file cannot be read or the new file cannot be written.
+    """
+    # Deferred: only needed when a file has to be rewritten
+    import tempfile
+
+    fd, temp_path = tempfile.mkstemp(prefix=f".{file_path.name}.", suffix=".tmp", dir=file_path.parent)
+    try:
+        with open(fd, "wb") as target:
+            written = copy_jpeg_with_metadata(file_path, exif_dict, xmp_dict, target, chunk_size)
+        if written is not None:
+            shutil.copymode(file_path, temp_path)
+            os.replace(temp_path, file_path)
+            return written
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+    os.unlink(temp_path)
+    return None
@@ -0,0 +1,79 @@
+"""Destination layouts sharding processed/ into subfolders by filename fields."""
+
+import string
+from dataclasses import fields
+from functools import lru_cache
+
+from .parser import ParsedFilename
+
+_PARSED_FIELDS = tuple(field.name for field in fields(ParsedFilename))
+
+# Fields a layout can use: those of ParsedFilename, and a hex digest of the filename
+LAYOUT_FIELDS = frozenset(_PARSED_FIELDS) | {"hash"}
+
+
+@lru_cache(maxsize=32)
+def _uses_hash(layout: str) -> bool:
+    """Check a layout template.
+
+    Args:
+        layout: Layout template.
+
+    Returns:
+        True if the template uses the hash field.
+
+    Raises:
+        ValueError: If the template is malformed, absolute or uses an unknown field.
+    """
+    if layout.startswith("/"):
+        raise ValueError(f"processed_layout must be a relative path: {layout!r}")
+
+    names = set()
+    for _, field, _, _ in string.Formatter().parse(layout):
+        if field is None:
+            continue
+        name = field.split(".", 1)[0].split("[", 1)[0]
+        if name not in LAYOUT_FIELDS:
+            raise ValueError(
+                f"Unknown processed_layout field: {name!r} (must be one of: {', '.join(sorted(LAYOUT_FIELDS))})"
+            )
+        names.add(name)
+    return "hash" in names
+
+
+def render_layout(layout: str, parsed: ParsedFilename, filename: str) -> str:
+    """Get the subfolder of processed/ a file goes to.
+
+    The layout is a ``str.format`` template over the fields of
+    ParsedFilename and ``hash``, the 16-digit hex BLAKE2 digest of the
+    filename, with ``/`` between folder levels: ``"{year}/{group}/{subgroup}"``
+    groups files by collection, ``"{hash:.2}"`` spreads them evenly over
+    256 folders.
+
+    Args:
+        layout: Layout template.
+        parsed: Parsed filename data.
+        filename: Name of the file.
+
+    Returns:
+        Relative folder path, with ``/`` separators.
+
+    Raises:
+        ValueError: If the template is invalid or gives an empty, ``.`` or
+            ``..`` folder name.
+    """
+    values = {name: getattr(parsed, name) for name in _PARSED_FIELDS}
+    if _uses_hash(layout):
+        # Deferred: only needed for hash sharding
+        import hashlib
+
+        values["hash"] = hashlib.blake2b(filename.encode(), digest_size=8).hexdigest()
+
+    try:
+        folder = layout.format_map(values)
+    except (ValueError, IndexError, AttributeError, TypeError) as e:
+        raise ValueError(f"Invalid processed_layout {layout!r}: {e}") from e
+
+    if any(part in ("", ".", "..") for part in folder.split("/")):
+        raise ValueError(f"processed_layout {layout!r} gives an invalid folder for {filename}: {folder!r}")
+    return folder
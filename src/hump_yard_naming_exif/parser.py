@@ -1,14 +1,27 @@
 """Filename parser for structured photo filenames."""
 
 import re
+import sys
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Iterable, Optional
 
+if TYPE_CHECKING:
+    from .batch import ParsedBatch
 
-@dataclass
+
+# Field values in ParsedFilename order
+_Fields = tuple[int, int, int, int, int, int, str, str, str, str, str]
+
+
+@dataclass(slots=True)
 class ParsedFilename:
-    """Parsed filename data."""
+    """Parsed filename data.
+
+    Slotted, so records held for a whole archive carry no per-instance __dict__.
+    Group, subgroup and extension strings are interned by the parser and shared
+    between records.
+    """
 
     year: int
     month: int
@@ -23,15 +36,73 @@ class ParsedFilename:
     extension: str
 
 
+def _match_fields(filename: str) -> Optional[_Fields]:
+    """Match a filename against FilenameParser.PATTERN and convert its fields.
+
+    PATTERN runs in time linear in the name's length: it is anchored, every
+    field's character class excludes the '.' that ends it, so a name splits
+    into fields in only one way, and the only backtracking gives trailing
+    suffix segments back to the extension, one attempt per segment.
+
+    Args:
+        filename: Filename to match.
+
+    Returns:
+        Field values in ParsedFilename order, or None if the name does not match.
+    """
+    match = _PATTERN_MATCH(filename)
+    if match is None:
+        return None
+    return _convert_fields(match)
+
+
+def _convert_fields(match: "re.Match[str]") -> Optional[_Fields]:
+    """Convert the groups of a PATTERN match to field values.
+
+    All groups come from a single groups() call on the match.
+
+    Args:
+        match: Match of FilenameParser.PATTERN.
+
+    Returns:
+        Field values in ParsedFilename order, or None if a number is too long to convert.
+    """
+    year, month, day, hour, minute, second, modifier, group, subgroup, sequence, extension = match.groups()
+    try:
+        return (
+            int(year),
+            int(month),
+            int(day),
+            int(hour),
+            int(minute),
+            int(second),
+            modifier.upper(),  # Normalize to uppercase
+            sys.intern(group),
+            sys.intern(subgroup),
+            sequence,
+            sys.intern(extension.lower()),  # Normalize to lowercase
+        )
+
+    except ValueError:
+        # Digit runs longer than the int() conversion limit
+        return None
+
+
 class FilenameParser:
     """Parser for structured photo filenames.
 
     Expected format: YYYY.MM.DD.HH.NN.SS.X.GGG.SSS.NNNNNN.ext
     Optional suffixes (ignored): .A, .R, .RAW, .MSR, .WEB, .PRT, etc.
+
+    Parsing runs in time linear in the filename length. Names longer than
+    max_length are rejected before any other work.
     """
 
-    # Pattern to match the filename format
-    # First 10 components are required, everything after is ignored
+    # Longest name any common filesystem allows (255 bytes or UTF-16 units)
+    MAX_LENGTH = 255
+
+    # Grammar of the filename format.
+    # First 10 components are required, everything after is ignored.
     PATTERN = re.compile(
         r"^(\d+)\.(\d+)\.(\d+)\.(\d+)\.(\d+)\.(\d+)\.([a-zA-Z])\.([^.]+)\.([^.]+)\.(\d+)"
         r"(?:\.[^.]+)*"  # Optional suffixes (ignored)
@@ -39,6 +110,20 @@ class FilenameParser:
         re.IGNORECASE
     )
 
+    def __init__(self, max_length: Optional[int] = MAX_LENGTH) -> None:
+        """Initialize the parser.
+
+        Args:
+            max_length: Longest filename, in characters, that is parsed at all.
+                None removes the limit.
+
+        Raises:
+            ValueError: If max_length is not positive.
+        """
+        if max_length is not None and max_length <= 0:
+            raise ValueError(f"max_length must be positive: {max_length}")
+        self.max_length = max_length
+
     def parse(self, filename: str) -> Optional[ParsedFilename]:
         """Parse a filename into components.
 
@@ -48,36 +133,36 @@ class FilenameParser:
         Returns:
             ParsedFilename object if parsing successful, None otherwise.
         """
-        match = self.PATTERN.match(filename)
-        if not match:
+        if self.max_length is not None and len(filename) > self.max_length:
+            return None
+
+        # Matched here rather than in _match_fields: most names seen are rejects
+        match = _PATTERN_MATCH(filename)
+        if match is None:
             return None
 
-        try:
-            year = int(match.group(1))
-            month = int(match.group(2))
-            day = int(match.group(3))
-            hour = int(match.group(4))
-            minute = int(match.group(5))
-            second = int(match.group(6))
-            modifier = match.group(7)
-            group = match.group(8)
-            subgroup = match.group(9)
-            sequence = match.group(10)
-            extension = match.group(11)
-
-            return ParsedFilename(
-                year=year,
-                month=month,
-                day=day,
-                hour=hour,
-                minute=minute,
-                second=second,
-                modifier=modifier.upper(),  # Normalize to uppercase
-                group=group,
-                subgroup=subgroup,
-                sequence=sequence,
-                extension=extension.lower()  # Normalize to lowercase
-            )
-
-        except (ValueError, IndexError):
+        fields = _convert_fields(match)
+        if fields is None:
             return None
+
+        return ParsedFilename(*fields)
+
+    def parse_many(self, names: Iterable[str]) -> "ParsedBatch":
+        """Parse many filenames into a columnar batch.
+
+        Field values go straight into NumPy arrays; ParsedFilename objects are
+        only built when a row is requested from the batch. Requires NumPy.
+
+        Args:
+            names: Filenames to parse.
+
+        Returns:
+            ParsedBatch with one row per name, agreeing with parse() row by row.
+        """
+        from .batch import ParsedBatch
+
+        return ParsedBatch.from_names(names, self.max_length)
+
+
+# Bound once: parse() runs it for every name the watcher sees
+_PATTERN_MATCH = FilenameParser.PATTERN.match
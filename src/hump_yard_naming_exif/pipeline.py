@@ -0,0 +1,294 @@
+"""Staged pipeline that overlaps parsing, metadata writing and moving of files."""
+
+import dataclasses
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Optional
+
+from .parser import ParsedFilename
+
+if TYPE_CHECKING:
+    from .plugin import PhotoNamingExifPlugin
+
+# End-of-input marker passed from stage to stage
+_DONE = object()
+
+
+@dataclass
+class StageStats:
+    """Counters of one pipeline stage."""
+
+    name: str
+    workers: int
+    processed: int = 0  # items handled, successful or not
+    failed: int = 0  # items this stage reported as failed
+    busy_seconds: float = 0.0  # summed over workers
+    idle_seconds: float = 0.0  # waiting for input, summed over workers
+    blocked_seconds: float = 0.0  # waiting for room downstream, summed over workers
+    queue_depth: int = 0  # items waiting in the input queue
+    max_queue_depth: int = 0
+
+
+class Pipeline:
+    """Process files in three stages connected by bounded queues.
+
+    The stages are parse/validate, metadata write and move to ``processed/``.
+    Each stage runs on its own threads, so the move of one file overlaps the
+    metadata write of the next. Every queue holds at most ``queue_size``
+    items: when a stage falls behind, the stages before it block, and file
+    paths are only taken from the input as fast as the slowest stage drains,
+    so a burst of events does not pile up in memory.
+    """
+
+    STAGES = ("parse", "write", "move")
+    QUEUE_SIZE = 64
+
+    def __init__(
+        self,
+        plugin: "PhotoNamingExifPlugin",
+        config: dict[str, Any],
+        parse_workers: int = 1,
+        write_workers: int = 1,
+        move_workers: int = 1,
+        queue_size: int = QUEUE_SIZE,
+    ) -> None:
+        """Initialize the pipeline.
+
+        Args:
+            plugin: Plugin whose parse, write and move steps are run.
+            config: Plugin-specific configuration parameters.
+            parse_workers: Number of threads of the parse/validate stage.
+            write_workers: Number of threads of the metadata write stage.
+            move_workers: Number of threads of the move stage.
+            queue_size: Capacity of each queue between stages.
+
+        Raises:
+            ValueError: If a worker count or the queue size is less than 1.
+        """
+        workers = {"parse": parse_workers, "write": write_workers, "move": move_workers}
+        for stage, count in workers.items():
+            if count < 1:
+                raise ValueError(f"{stage}_workers must be at least 1: {count}")
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be at least 1: {queue_size}")
+
+        self.plugin = plugin
+        self.config = config
+        self.queue_size = queue_size
+        self.logger = logging.getLogger(__name__)
+        self._workers = workers
+        self._handlers: dict[str, Callable[[Any], Any]] = {
+            "parse": self._parse,
+            "write": self._write,
+            "move": self._move,
+        }
+        self._stats = {stage: StageStats(stage, count) for stage, count in workers.items()}
+        self._queues: dict[str, queue.Queue] = {}
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict[str, StageStats]:
+        """Get a snapshot of the stage counters.
+
+        Returns:
+            Copy of the counters of each stage, keyed by stage name, with the
+            current depth of each stage's input queue.
+        """
+        with self._lock:
+            snapshot = {stage: dataclasses.replace(stats) for stage, stats in self._stats.items()}
+        for stage, inbox in self._queues.items():
+            snapshot[stage].queue_depth = inbox.qsize()
+        return snapshot
+
+    def run(self, file_paths: Iterable[str]) -> Iterator[tuple[str, bool]]:
+        """Process files through the stages.
+
+        Closing the iterator early stops taking new files; files already in
+        the pipeline are dropped at their next stage boundary.
+
+        Args:
+            file_paths: Paths of the files to process. Consumed lazily.
+
+        Yields:
+            (file_path, success) tuples in completion order.
+        """
+        self._stats = {stage: StageStats(stage, count) for stage, count in self._workers.items()}
+        self._queues = {stage: queue.Queue(self.queue_size) for stage in self.STAGES}
+        results: queue.Queue = queue.Queue(self.queue_size)
+        stop = threading.Event()
+        remaining = dict(self._workers)
+
+        outboxes = dict(zip(self.STAGES, [*(self._queues[stage] for stage in self.STAGES[1:]), results]))
+        threads = [threading.Thread(target=self._feed, args=(file_paths, stop), daemon=True)]
+        for stage in self.STAGES:
+            for _ in range(self._workers[stage]):
+                threads.append(threading.Thread(
+                    target=self._work,
+                    args=(stage, outboxes[stage], results, stop, remaining),
+                    name=f"{self.plugin.name}-{stage}",
+                    daemon=True,
+                ))
+        for thread in threads:
+            thread.start()
+
+        finished = False
+        try:
+            while (item := results.get()) is not _DONE:
+                yield item
+            finished = True
+        finally:
+            if not finished:
+                # Closed early: let the stages drain and drop what is left
+                stop.set()
+                while results.get() is not _DONE:
+                    pass
+            for thread in threads:
+                thread.join()
+            self.plugin.flush()
+
+    def _feed(self, file_paths: Iterable[str], stop: threading.Event) -> None:
+        """Put file paths into the parse queue, blocking while it is full.
+
+        Args:
+            file_paths: Paths of the files to process.
+            stop: Set when the consumer stopped early.
+        """
+        inbox = self._queues["parse"]
+        try:
+            for file_path in file_paths:
+                if stop.is_set():
+                    break
+                self._put("parse", inbox, (file_path, file_path))
+        except Exception as e:
+            self.logger.error(f"Failed to read the file paths to process: {e}")
+        finally:
+            for _ in range(self._workers["parse"]):
+                inbox.put(_DONE)
+
+    def _work(
+        self,
+        stage: str,
+        outbox: queue.Queue,
+        results: queue.Queue,
+        stop: threading.Event,
+        remaining: dict[str, int],
+    ) -> None:
+        """Run one worker of a stage until the end-of-input marker arrives.
+
+        Args:
+            stage: Stage name.
+            outbox: Input queue of the next stage, or the results queue for the last stage.
+            results: Queue of (file_path, success) results.
+            stop: Set when the consumer stopped early.
+            remaining: Number of running workers per stage.
+        """
+        inbox = self._queues[stage]
+        handler = self._handlers[stage]
+        stats = self._stats[stage]
+        next_stage = dict(zip(self.STAGES, self.STAGES[1:])).get(stage)
+
+        while True:
+            started = time.perf_counter()
+            item = inbox.get()
+            idle = time.perf_counter() - started
+
+            if item is _DONE:
+                with self._lock:
+                    stats.idle_seconds += idle
+                    remaining[stage] -= 1
+                    last = remaining[stage] == 0
+                if last:
+                    # Every item of this stage has been passed on or reported
+                    for _ in range(self._workers[next_stage] if next_stage else 1):
+                        outbox.put(_DONE)
+                return
+
+            if stop.is_set():
+                continue
+
+            file_path, payload = item
+            started = time.perf_counter()
+            try:
+                output = handler(payload)
+            except Exception as e:
+                self.logger.error(f"Stage {stage} failed for {file_path}: {e}")
+                output = None
+            busy = time.perf_counter() - started
+
+            started = time.perf_counter()
+            if output is None:
+                results.put((file_path, False))
+            elif next_stage is None:
+                results.put((file_path, True))
+            else:
+                self._put(next_stage, outbox, (file_path, output))
+            blocked = time.perf_counter() - started
+
+            with self._lock:
+                stats.processed += 1
+                stats.failed += output is None
+                stats.busy_seconds += busy
+                stats.idle_seconds += idle
+                stats.blocked_seconds += blocked
+
+    def _put(self, stage: str, inbox: queue.Queue, item: Any) -> None:
+        """Put an item into a stage's input queue and track the queue's peak depth.
+
+        Args:
+            stage: Name of the stage reading the queue.
+            inbox: The stage's input queue.
+            item: Item to put.
+        """
+        inbox.put(item)
+        depth = inbox.qsize()
+        stats = self._stats[stage]
+        if depth > stats.max_queue_depth:
+            with self._lock:
+                stats.max_queue_depth = max(stats.max_queue_depth, depth)
+
+    def _parse(self, file_path: str) -> Optional[tuple[Path, ParsedFilename]]:
+        """Parse and validate the filename of a file.
+
+        Args:
+            file_path: Path to the file.
+
+        Returns:
+            (path, parsed) if the filename is valid, None otherwise.
+        """
+        path = Path(file_path)
+        self.plugin.logger.info(f"Processing file: {path}")
+
+        parsed = self.plugin._parse_and_validate(path.name)
+        if not parsed:
+            self.plugin._log_rejection(path.name)
+            return None
+        return path, parsed
+
+    def _write(self, item: tuple[Path, ParsedFilename]) -> Optional[Path]:
+        """Write EXIF/XMP metadata to a file.
+
+        Args:
+            item: (path, parsed) from the parse stage.
+
+        Returns:
+            The path if the metadata was written, None otherwise.
+        """
+        path, parsed = item
+        return path if self.plugin._write_metadata(path, parsed, self.config) else None
+
+    def _move(self, path: Path) -> Optional[Path]:
+        """Move a file to the processed folder.
+
+        Args:
+            path: Path to the file.
+
+        Returns:
+            The path if the file was moved, None otherwise.
+        """
+        if not self.plugin._move_to_processed(path, self.config):
+            return None
+        self.plugin.logger.info(f"Successfully processed: {path.name}")
+        return path
@@ -1,30 +1,117 @@
-"""Photo naming EXIF plugin for hump-yard."""
+"""Photo naming EXIF plugin for hump-yard.
+
+Imported whenever Hump Yard loads its plugins, so heavy modules (pyexiv2,
+asyncio, concurrent.futures, multiprocessing, and the native writers with
+mmap and xml.etree) are only imported by the code paths that use them.
+"""
 
 import logging
-import shutil
-import uuid
+import os
+import threading
 from pathlib import Path
-from typing import Any, Optional
-
-import pyexiv2
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, Optional, TypeVar, Union
+)
 
 from hump_yard.base_plugin import FileProcessorPlugin
 
 from .parser import FilenameParser, ParsedFilename
 from .validator import FilenameValidator
 
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, ThreadPoolExecutor
+
+    from .durability import SyncPolicy
+    from .isolation import IsolatedWriterPool
+    from .journal import ProcessingJournal
+
+# (year, month, day, hour, minute, second, modifier): everything the date values depend on
+_DateKey = tuple[int, int, int, int, int, int, str]
+# Prebuilt date values as (exif_items, xmp_items), without the per-file identifier
+_DateValues = tuple[tuple[tuple[str, str], ...], tuple[tuple[str, str], ...]]
+
+_T = TypeVar("_T")
+
 
 class PhotoNamingExifPlugin(FileProcessorPlugin):
     """Plugin that extracts metadata from structured photo filenames and writes to EXIF/XMP."""
 
     SUPPORTED_EXTENSIONS = {".tiff", ".tif", ".jpg", ".jpeg"}
+    PROCESSED_FOLDER = "processed"
+    QUARANTINE_FOLDER = "quarantine"
+    METADATA_MODES = ("embed", "inplace", "sidecar")
+    PARSE_CACHE_SIZE = 4096
+    METADATA_CACHE_SIZE = 1024
+    DIR_CACHE_SIZE = 1024
+    ASYNC_WORKERS = 4
+    ASYNC_CONCURRENCY = 16
+
+    def __init__(
+        self,
+        parse_cache_size: int = PARSE_CACHE_SIZE,
+        metadata_cache_size: int = METADATA_CACHE_SIZE,
+        async_workers: int = ASYNC_WORKERS,
+        dir_cache_size: int = DIR_CACHE_SIZE,
+    ) -> None:
+        """Initialize the plugin.
+
+        Args:
+            parse_cache_size: Number of filenames whose parse/validate result is
+                remembered between can_handle and process. 0 disables the cache.
+            metadata_cache_size: Number of distinct dates whose formatted EXIF/XMP
+                date values are remembered. 0 disables the cache.
+            async_workers: Number of threads that run the blocking work of
+                aprocess() and acan_handle(), shared by all their callers.
+            dir_cache_size: Number of processed/ and quarantine/ folders
+                remembered as created, so they are not created again for
+                every file. 0 disables the cache.
+        """
+        # Deferred: imported when Hump Yard creates the plugin, not when it loads the module
+        from .cache import LRUCache
 
-    def __init__(self) -> None:
-        """Initialize the plugin."""
         super().__init__()
         self.logger = logging.getLogger(__name__)
         self.parser = FilenameParser()
         self.validator = FilenameValidator()
+        self.parse_cache: "LRUCache[str, Optional[ParsedFilename]]" = LRUCache(parse_cache_size)
+        self.metadata_cache: "LRUCache[_DateKey, _DateValues]" = LRUCache(metadata_cache_size)
+        self.dir_cache: "LRUCache[Path, bool]" = LRUCache(dir_cache_size)
+        self.async_workers = async_workers
+        self._async_executor: Optional["ThreadPoolExecutor"] = None
+        self._writers: Optional["IsolatedWriterPool"] = None
+        # Files written straight into processed/: source -> temporary file awaiting its move
+        self._staged: dict[Path, Path] = {}
+        # Durability of the current config, replaced when the config changes
+        self._sync: Optional["SyncPolicy"] = None
+        self._sync_lock = threading.Lock()
+        # Journal of the current config, replaced when the config changes
+        self._journal: Optional["ProcessingJournal"] = None
+        self._journal_settings: tuple[Any, ...] = ()
+
+    @property
+    def writers(self) -> "IsolatedWriterPool":
+        """Get the writer processes of ``isolate_writes``, created on first use.
+
+        Returns:
+            The plugin's IsolatedWriterPool.
+        """
+        if self._writers is None:
+            # Deferred: only needed with isolate_writes
+            from .isolation import IsolatedWriterPool
+
+            with self._sync_lock:
+                if self._writers is None:
+                    self._writers = IsolatedWriterPool()
+        return self._writers
+
+    @writers.setter
+    def writers(self, writers: "IsolatedWriterPool") -> None:
+        """Replace the writer processes, e.g. with a pool using another start method.
+
+        Args:
+            writers: Pool to write with.
+        """
+        self._writers = writers
 
     @property
     def name(self) -> str:
@@ -53,23 +140,84 @@ class PhotoNamingExifPlugin(FileProcessorPlugin):
         Returns:
             True if the plugin can process the file, False otherwise.
         """
-        path = Path(file_path)
+        return self._can_handle(os.fspath(file_path), None)
+
+    def can_handle_entry(self, entry: Union[os.DirEntry, bytes]) -> bool:
+        """Check if the plugin can handle a directory entry or raw bytes path.
+
+        Fast path for directory scans: no Path objects are built, and the
+        symlink check of a DirEntry uses its cached file type instead of lstat.
 
-        # Skip files in 'processed' subfolder to avoid re-processing
-        if 'processed' in path.parts:
+        Args:
+            entry: Entry from os.scandir() (str or bytes), or a bytes path.
+
+        Returns:
+            True if the plugin can process the file, False otherwise.
+        """
+        if isinstance(entry, os.DirEntry):
+            return self._can_handle(os.fsdecode(entry.path), entry)
+        return self._can_handle(os.fsdecode(entry), None)
+
+    async def acan_handle(self, file_path: str) -> bool:
+        """Check if the plugin can handle the given file, without blocking the event loop.
+
+        The string checks run on the loop; only the symlink check, which needs
+        a syscall, runs on the plugin's executor.
+
+        Args:
+            file_path: Path to the file to check.
+
+        Returns:
+            True if the plugin can process the file, False otherwise.
+        """
+        file_path = os.fspath(file_path)
+        if not self._can_handle_name(file_path):
             return False
+        return not await self._run_blocking(os.path.islink, file_path)
+
+    def _can_handle(self, file_path: str, entry: Optional[os.DirEntry]) -> bool:
+        """Check a path with string operations first and the symlink check last.
 
-        # Skip symlinks
-        if path.is_symlink():
+        Args:
+            file_path: Path to the file to check.
+            entry: Directory entry for the path, used for a syscall-free symlink check.
+
+        Returns:
+            True if the plugin can process the file, False otherwise.
+        """
+        if not self._can_handle_name(file_path):
             return False
 
-        # Check extension
-        if path.suffix.lower() not in self.SUPPORTED_EXTENSIONS:
+        # Skip symlinks (the only check that may need a syscall)
+        if entry is not None:
+            return not entry.is_symlink()
+        return not os.path.islink(file_path)
+
+    def _can_handle_name(self, file_path: str) -> bool:
+        """Run the checks of can_handle that need no syscall.
+
+        Args:
+            file_path: Path to the file to check.
+
+        Returns:
+            True if the extension, folder and filename are acceptable.
+        """
+        if os.altsep:
+            file_path = file_path.replace(os.altsep, os.sep)
+        parts = file_path.split(os.sep)
+        name = parts[-1]
+
+        # Check extension (same rules as Path.suffix)
+        dot = name.rfind(".")
+        if dot <= 0 or name[dot:].lower() not in self.SUPPORTED_EXTENSIONS:
+            return False
+
+        # Skip files in 'processed' and 'quarantine' subfolders to avoid re-processing
+        if self.PROCESSED_FOLDER in parts or self.QUARANTINE_FOLDER in parts:
             return False
 
         # Try to parse and validate filename
-        parsed = self._parse_and_validate(path.name)
-        return parsed is not None
+        return self._parse_and_validate(name) is not None
 
     def process(self, file_path: str, config: dict[str, Any]) -> bool:
         """Process a file: parse filename, validate, write EXIF/XMP metadata, and move to processed folder.
@@ -87,23 +235,215 @@ class PhotoNamingExifPlugin(FileProcessorPlugin):
         # Parse and validate filename
         parsed = self._parse_and_validate(path.name)
         if not parsed:
-            self.logger.error(f"Failed to parse or validate filename: {path.name}")
+            self._log_rejection(path.name)
+            return False
+
+        # Write EXIF/XMP metadata
+        if not self._write_metadata(path, parsed, config):
+            return False
+
+        # Move to processed folder
+        if not self._move_to_processed(path, config):
+            return False
+
+        self.logger.info(f"Successfully processed: {path.name}")
+        return True
+
+    def process_batch(
+        self,
+        file_paths: Iterable[str],
+        config: dict[str, Any],
+        workers: int = 1,
+        executor: str = "thread",
+    ) -> Iterator[tuple[str, bool]]:
+        """Process many files on a pool of workers.
+
+        Args:
+            file_paths: Paths of the files to process.
+            config: Plugin-specific configuration parameters, passed to every process() call.
+            workers: Number of concurrent workers. 1 processes the files in order on
+                the calling thread.
+            executor: "thread" to share this plugin between threads, or "process" to
+                run a separate plugin in each worker process (config must be picklable).
+
+        Yields:
+            (file_path, success) tuples in completion order.
+
+        Raises:
+            ValueError: If workers is less than 1 or executor is unknown.
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1: {workers}")
+        if executor not in ("thread", "process"):
+            raise ValueError(f"Unknown executor: {executor!r} (must be 'thread' or 'process')")
+
+        if workers == 1:
+            try:
+                for file_path in file_paths:
+                    yield file_path, self.process(file_path, config)
+            finally:
+                self.flush()
+            return
+
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+        pool: "Executor"
+        if executor == "thread":
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=self.name)
+            task = self.process
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_plugin)
+            task = _process_in_worker_plugin
+
+        try:
+            futures = {pool.submit(task, file_path, config): file_path for file_path in file_paths}
+            for future in as_completed(futures):
+                file_path = futures[future]
+                try:
+                    success = future.result()
+                except Exception as e:
+                    self.logger.error(f"Worker failed while processing {file_path}: {e}")
+                    success = False
+                yield file_path, success
+        finally:
+            self.flush()
+            # Stopping early (or an error) cancels files that have not started yet
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    async def aprocess(self, file_path: str, config: dict[str, Any]) -> bool:
+        """Process a file like process(), without blocking the event loop.
+
+        The metadata write and the move run on the plugin's executor. A call
+        cancelled while its metadata is being written never moves the file;
+        the write itself finishes in the background.
+
+        Args:
+            file_path: Path to the file to process.
+            config: Plugin-specific configuration parameters.
+
+        Returns:
+            True if processing successful, False otherwise.
+        """
+        path = Path(file_path)
+        self.logger.info(f"Processing file: {path}")
+
+        # Parse and validate filename (cached string work, fine on the loop)
+        parsed = self._parse_and_validate(path.name)
+        if not parsed:
+            self._log_rejection(path.name)
             return False
 
         # Write EXIF/XMP metadata
-        if not self._write_metadata(path, parsed):
+        if not await self._run_blocking(self._write_metadata, path, parsed, config):
             return False
 
         # Move to processed folder
-        if not self._move_to_processed(path):
+        if not await self._run_blocking(self._move_to_processed, path, config):
             return False
 
         self.logger.info(f"Successfully processed: {path.name}")
         return True
 
+    async def aprocess_batch(
+        self,
+        file_paths: Union[Iterable[str], AsyncIterable[str]],
+        config: dict[str, Any],
+        concurrency: int = ASYNC_CONCURRENCY,
+    ) -> AsyncIterator[tuple[str, bool]]:
+        """Process many files concurrently with aprocess().
+
+        At most ``concurrency`` files are in progress at a time, and paths are
+        only taken from file_paths as earlier files finish. Closing or
+        cancelling the generator cancels the files still in progress.
+
+        Args:
+            file_paths: Paths of the files to process.
+            config: Plugin-specific configuration parameters, passed to every aprocess() call.
+            concurrency: Maximum number of files in progress.
+
+        Yields:
+            (file_path, success) tuples in completion order.
+
+        Raises:
+            ValueError: If concurrency is less than 1.
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1: {concurrency}")
+
+        import asyncio
+
+        semaphore = asyncio.Semaphore(concurrency)
+        pending: "set[asyncio.Task[tuple[str, bool]]]" = set()
+
+        async def process_one(file_path: str) -> tuple[str, bool]:
+            try:
+                return file_path, await self.aprocess(file_path, config)
+            except Exception as e:
+                self.logger.error(f"Failed to process {file_path}: {e}")
+                return file_path, False
+            finally:
+                semaphore.release()
+
+        async def wait_for_some() -> "set[asyncio.Task[tuple[str, bool]]]":
+            done, still_pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.intersection_update(still_pending)
+            return done
+
+        try:
+            async for file_path in _as_async_iterable(file_paths):
+                # Hand out finished results while every slot is taken
+                while semaphore.locked():
+                    for task in await wait_for_some():
+                        yield task.result()
+                await semaphore.acquire()
+                pending.add(asyncio.create_task(process_one(file_path)))
+
+            while pending:
+                for task in await wait_for_some():
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            await self._run_blocking(self.flush)
+
+    async def _run_blocking(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Run a blocking function on the plugin's executor.
+
+        Args:
+            func: Function to run.
+            *args: Positional arguments for func.
+
+        Returns:
+            The function's return value.
+        """
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        if self._async_executor is None:
+            self._async_executor = ThreadPoolExecutor(
+                max_workers=self.async_workers, thread_name_prefix=f"{self.name}-async"
+            )
+        return await asyncio.get_running_loop().run_in_executor(self._async_executor, func, *args)
+
     def _parse_and_validate(self, filename: str) -> Optional[ParsedFilename]:
         """Parse and validate a filename.
 
+        Results, including rejections, are cached by filename, so process()
+        reuses the work done by can_handle() and repeated events for an invalid
+        name are rejected by a single lookup.
+
+        Args:
+            filename: The filename to parse and validate.
+
+        Returns:
+            Parsed filename data if valid, None otherwise.
+        """
+        return self.parse_cache.get_or_set(filename, self._parse_and_validate_uncached)
+
+    def _parse_and_validate_uncached(self, filename: str) -> Optional[ParsedFilename]:
+        """Parse and validate a filename without consulting the cache.
+
         Args:
             filename: The filename to parse and validate.
 
@@ -114,12 +454,27 @@ class PhotoNamingExifPlugin(FileProcessorPlugin):
         if not parsed:
             return None
 
-        validation_errors = self.validator.validate(parsed)
-        if validation_errors:
+        # Error codes only; messages are rendered when a rejection is logged
+        if self.validator.check(parsed):
             return None
 
         return parsed
 
+    def _log_rejection(self, filename: str) -> None:
+        """Log why a filename failed parsing or validation.
+
+        Args:
+            filename: The rejected filename.
+        """
+        self.logger.error(f"Failed to parse or validate filename: {filename}")
+
+        parsed = self.parser.parse(filename)
+        if not parsed:
+            return
+
+        for message in self.validator.describe(parsed, self.validator.check(parsed)):
+            self.logger.error(f"  - {message}")
+
     def _build_metadata_dict(self, parsed: ParsedFilename) -> tuple[dict[str, str], dict[str, str], dict[str, str]]:
         """Build metadata dictionaries from parsed filename for pyexiv2.
 
@@ -129,40 +484,85 @@ class PhotoNamingExifPlugin(FileProcessorPlugin):
         Returns:
             Tuple of (exif_dict, iptc_dict, xmp_dict) for pyexiv2.
         """
-        exif_dict = {}
-        iptc_dict = {}
-        xmp_dict = {}
+        iptc_dict: dict[str, str] = {}
+
+        # Date values only depend on the date, so files sharing a date reuse them
+        key = (
+            parsed.year, parsed.month, parsed.day,
+            parsed.hour, parsed.minute, parsed.second,
+            parsed.modifier,
+        )
+        exif_items, xmp_items = self.metadata_cache.get_or_set(
+            key, lambda _: self._build_date_values(parsed)
+        )
+
+        # Deferred: uuid imports platform, which is slow to import
+        import uuid
 
         # XMP: Always add identifier (duplicate in both dc and xmp namespaces)
         identifier = str(uuid.uuid4())
-        xmp_dict["Xmp.dc.identifier"] = identifier
-        xmp_dict["Xmp.xmp.Identifier"] = identifier
+        xmp_dict = {"Xmp.dc.identifier": identifier, "Xmp.xmp.Identifier": identifier}
+        xmp_dict.update(xmp_items)
+
+        return dict(exif_items), iptc_dict, xmp_dict
+
+    def _build_date_values(self, parsed: ParsedFilename) -> _DateValues:
+        """Format the EXIF and XMP date values for a parsed filename.
+
+        Args:
+            parsed: Parsed filename data.
+
+        Returns:
+            Tuple of (exif_items, xmp_items) as key/value pairs.
+        """
+        exif_items = []
+        xmp_items = []
 
         # Add EXIF:DateTimeOriginal for exact dates only
         if parsed.modifier == "E":
-            exif_dict["Exif.Image.DateTimeOriginal"] = (
+            exif_items.append((
+                "Exif.Image.DateTimeOriginal",
                 f"{parsed.year:04d}:{parsed.month:02d}:{parsed.day:02d} "
                 f"{parsed.hour:02d}:{parsed.minute:02d}:{parsed.second:02d}"
-            )
-            
+            ))
+
             # XMP-photoshop:DateCreated also requires full exact date (modifier 'E')
             photoshop_datetime = self._format_photoshop_datetime(parsed)
             if photoshop_datetime:
-                xmp_dict["Xmp.photoshop.DateCreated"] = photoshop_datetime
-        
+                xmp_items.append(("Xmp.photoshop.DateCreated", photoshop_datetime))
+
         # XMP-Iptc4xmpCore:DateCreated - supports partial dates (year, year-month, full date)
         xmp_iptc_date = self._format_iptc_date(parsed)
         if xmp_iptc_date:
-            xmp_dict["Xmp.Iptc4xmpCore.DateCreated"] = xmp_iptc_date
+            xmp_items.append(("Xmp.Iptc4xmpCore.DateCreated", xmp_iptc_date))
 
-        return exif_dict, iptc_dict, xmp_dict
+        return tuple(exif_items), tuple(xmp_items)
 
-    def _write_metadata(self, file_path: Path, parsed: ParsedFilename) -> bool:
+    def _write_metadata(
+        self, file_path: Path, parsed: ParsedFilename, config: Optional[dict[str, Any]] = None
+    ) -> bool:
         """Write metadata to EXIF/XMP fields using pyexiv2.
 
+        With ``metadata_mode`` set to "sidecar" in config, the values go to an
+        XMP sidecar next to the file and the file itself is not opened. In the
+        other modes, TIFFs get a new IFD0 appended. With "inplace", JPEG values
+        are written over the existing ones (using the XMP packet padding) where
+        the file has room for them, and the JPEG is otherwise rewritten with
+        the image data streamed. Files these writers cannot handle are
+        written with pyexiv2. With ``write_to_processed`` set and processed/
+        on another filesystem, JPEGs and TIFFs are instead written as a new
+        file straight into processed/, which _move_to_processed then renames
+        into place. With ``isolate_writes`` set, pyexiv2 runs in a
+        supervised child process; a file that crashes or hangs it is quarantined.
+        The written file is flushed to disk as the ``durability`` setting
+        says (see SyncPolicy). With ``journal`` set, the write is recorded in
+        the ProcessingJournal, and a file a previous run wrote but did not
+        move is not written again.
+
         Args:
             file_path: Path to the file.
             parsed: Parsed filename data.
+            config: Plugin-specific configuration parameters.
 
         Returns:
             True if all metadata written successfully, False otherwise.
@@ -171,19 +571,66 @@ class PhotoNamingExifPlugin(FileProcessorPlugin):
             # Build metadata dictionaries
             exif_dict, iptc_dict, xmp_dict = self._build_metadata_dict(parsed)
 
-            # Write metadata using pyexiv2
-            with pyexiv2.Image(str(file_path)) as img:
-                if exif_dict:
-                    img.modify_exif(exif_dict)
-                    self.logger.info(f"  EXIF metadata written to {file_path.name}:")
-                    for key, value in exif_dict.items():
-                        self.logger.info(f"    - {key}: {value}")
-                
-                if xmp_dict:
-                    img.modify_xmp(xmp_dict)
-                    self.logger.info(f"  XMP metadata written to {file_path.name}:")
-                    for key, value in xmp_dict.items():
-                        self.logger.info(f"    - {key}: {value}")
+            config = config or {}
+            mode = config.get("metadata_mode", "embed")
+            target = file_path
+
+            if mode not in self.METADATA_MODES:
+                raise ValueError(
+                    f"Unknown metadata_mode: {mode!r} (must be one of: {', '.join(self.METADATA_MODES)})"
+                )
+            sync = self._sync_policy(config)
+            staged = None
+
+            journal = self._processing_journal(config)
+            if journal is not None:
+                resumed = journal.resumable(file_path)
+                if resumed is not None:
+                    if resumed.parent != file_path.parent:
+                        # A copy written straight into processed/ by the earlier run
+                        self._staged[file_path] = resumed
+                    self.logger.info(f"  Metadata already written to {resumed.name}, resuming with the move")
+                    return True
+                journal.parsed(file_path)
+
+            if mode == "sidecar":
+                # Deferred: only needed with the sidecar metadata_mode
+                from .sidecar import write_sidecar
+
+                # Write an XMP sidecar without opening the file
+                target = write_sidecar(file_path, exif_dict, xmp_dict)
+            elif config.get("write_to_processed") and self._write_to_processed(
+                file_path, exif_dict, xmp_dict, config
+            ):
+                # Written as a new file in processed/; the source is removed when it is moved
+                staged = self._staged[file_path]
+            elif self._write_native(file_path, exif_dict, xmp_dict, mode):
+                # Written without exiv2; other files fall through to pyexiv2
+                pass
+            elif config.get("isolate_writes"):
+                # Write metadata using pyexiv2 in a writer process
+                if not self._write_isolated(file_path, exif_dict, xmp_dict, config):
+                    return False
+            else:
+                # Deferred: the isolation module is only needed for pyexiv2 writes
+                from .isolation import _write_file
+
+                # Write metadata using pyexiv2
+                _write_file(str(file_path), exif_dict, xmp_dict)
+
+            sync.written(staged or target)
+            if journal is not None:
+                journal.written(file_path, staged or target)
+
+            if exif_dict:
+                self.logger.info(f"  EXIF metadata written to {target.name}:")
+                for key, value in exif_dict.items():
+                    self.logger.info(f"    - {key}: {value}")
+
+            if xmp_dict:
+                self.logger.info(f"  XMP metadata written to {target.name}:")
+                for key, value in xmp_dict.items():
+                    self.logger.info(f"    - {key}: {value}")
 
             return True
 
@@ -191,6 +638,169 @@ class PhotoNamingExifPlugin(FileProcessorPlugin):
             self.logger.error(f"Failed to write metadata to {file_path}: {e}")
             return False
 
+    def _write_to_processed(
+        self,
+        file_path: Path,
+        exif_dict: dict[str, str],
+        xmp_dict: dict[str, str],
+        config: Optional[dict[str, Any]] = None,
+    ) -> bool:
+        """Write a copy of the file with the metadata into a temporary file in processed/.
+
+        The file is read once and the copy written once; the original is not
+        touched. _move_to_processed renames the copy into place and only then
+        removes the original. The copy is flushed to disk as the
+        ``durability`` setting says (see SyncPolicy.moved). Only done when
+        processed/ is on another filesystem: on the same one, updating the
+        file and renaming it already writes it at most once.
+
+        Args:
+            file_path: Path to the file.
+            exif_dict: EXIF values to write.
+            xmp_dict: XMP values to write.
+            config: Plugin-specific configuration parameters.
+
+        Returns:
+            True if the copy was written, False if the file must be written
+            and moved the usual way.
+        """
+        # Deferred: the native writers import mmap and xml.etree
+        from . import jpeg, tiff
+
+        suffix = file_path.suffix.lower()
+        if suffix in (".tif", ".tiff"):
+            copy = tiff.copy_tiff_with_metadata
+        elif suffix in (".jpg", ".jpeg"):
+            copy = jpeg.copy_jpeg_with_metadata
+        else:
+            return False
+
+        # Deferred: only needed when writing straight into processed/
+        import tempfile
+
+        processed_dir = self._processed_dir(file_path, config)
+
+        def create_temp() -> Optional[tuple[int, str]]:
+            if not self._crosses_device(file_path.parent, processed_dir):
+                return None
+            return tempfile.mkstemp(prefix=f".{file_path.name}.", suffix=".tmp", dir=processed_dir)
+
+        # Like a move: processed/ may have been removed since it was cached
+        created = self._in_directory(processed_dir, create_temp)
+        if created is None:
+            return False
+        fd, temp_name = created
+        temp_path = Path(temp_name)
+        try:
+            with open(fd, "wb") as target:
+                written = copy(file_path, exif_dict, xmp_dict, target)
+            if written is None:
+                temp_path.unlink()
+                self.logger.debug(f"  Cannot copy {file_path.name} natively, writing it in place")
+                return False
+            # Deferred: only needed when writing straight into processed/
+            import shutil
+
+            shutil.copymode(file_path, temp_path)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+
+        # A copy left by an earlier attempt that was never moved
+        stale = self._staged.pop(file_path, None)
+        if stale is not None:
+            stale.unlink(missing_ok=True)
+        self._staged[file_path] = temp_path
+
+        self.logger.debug(f"  Wrote {file_path.name} to {processed_dir} ({written} bytes written)")
+        return True
+
+    def _crosses_device(self, source_dir: Path, target_dir: Path) -> bool:
+        """Check whether moving between two folders crosses filesystems.
+
+        Args:
+            source_dir: Folder a file is moved from.
+            target_dir: Folder it is moved to.
+
+        Returns:
+            True if the folders are on different devices, so a move copies the data.
+        """
+        return source_dir.stat().st_dev != target_dir.stat().st_dev
+
+    def _write_native(
+        self, file_path: Path, exif_dict: dict[str, str], xmp_dict: dict[str, str], mode: str
+    ) -> bool:
+        """Write metadata without exiv2 and without loading the whole file.
+
+        TIFFs get a new IFD0 appended. JPEGs, in "inplace" mode, have their
+        values written over the existing ones where there is room, and are
+        otherwise rewritten with the image data streamed.
+
+        Args:
+            file_path: Path to the file.
+            exif_dict: EXIF values to write.
+            xmp_dict: XMP values to write.
+            mode: The metadata_mode.
+
+        Returns:
+            True if the values were written, False if the file must be
+            written with pyexiv2.
+        """
+        # Deferred: the native writers import mmap and xml.etree
+        from . import jpeg, tiff
+
+        suffix = file_path.suffix.lower()
+        if suffix in (".tif", ".tiff"):
+            written = tiff.update_tiff_by_append(file_path, exif_dict, xmp_dict)
+            how = "by appending a new IFD0"
+        elif suffix in (".jpg", ".jpeg") and mode == "inplace":
+            written = jpeg.update_jpeg_in_place(file_path, exif_dict, xmp_dict)
+            how = "in place"
+            if written is None:
+                written = jpeg.rewrite_jpeg(file_path, exif_dict, xmp_dict)
+                how = "by streaming rewrite"
+        else:
+            return False
+
+        if written is None:
+            self.logger.debug(f"  Cannot update {file_path.name} natively, using pyexiv2")
+            return False
+
+        self.logger.debug(f"  Updated {file_path.name} {how} ({written} bytes written)")
+        return True
+
+    def _write_isolated(
+        self,
+        file_path: Path,
+        exif_dict: dict[str, str],
+        xmp_dict: dict[str, str],
+        config: dict[str, Any],
+    ) -> bool:
+        """Write metadata in a writer process, quarantining files that crash or hang it.
+
+        Args:
+            file_path: Path to the file.
+            exif_dict: EXIF values to write.
+            xmp_dict: XMP values to write.
+            config: Plugin-specific configuration parameters (``write_timeout``).
+
+        Returns:
+            True if the metadata was written, False otherwise.
+        """
+        # Deferred: only needed with isolate_writes
+        from .isolation import IsolatedWriter, WriteStatus
+
+        timeout = config.get("write_timeout", IsolatedWriter.TIMEOUT)
+        status, error = self.writers.write(str(file_path), exif_dict, xmp_dict, timeout)
+
+        if status is WriteStatus.OK:
+            return True
+
+        self.logger.error(f"Failed to write metadata to {file_path}: {error}")
+        if status is not WriteStatus.FAILED:
+            self._move_to_quarantine(file_path)
+        return False
+
     def _format_iptc_date(self, parsed: ParsedFilename) -> Optional[str]:
         """Format date for XMP:Iptc4xmpCore:DateCreated.
 
@@ -234,42 +844,341 @@ class PhotoNamingExifPlugin(FileProcessorPlugin):
         # Build full datetime (always with time for exact dates)
         return f"{parsed.year:04d}-{parsed.month:02d}-{parsed.day:02d}T{parsed.hour:02d}:{parsed.minute:02d}:{parsed.second:02d}"
 
-    def _move_to_processed(self, file_path: Path) -> bool:
+    def _processed_dir(self, file_path: Path, config: Optional[dict[str, Any]] = None) -> Path:
+        """Get the processed folder a file is moved to.
+
+        With ``processed_layout`` set in config, this is a subfolder of
+        processed/ named from the filename's fields (see render_layout).
+
+        Args:
+            file_path: Path to the file.
+            config: Plugin-specific configuration parameters.
+
+        Returns:
+            The processed/ subfolder of the file's folder, or the folder in it
+            the layout gives.
+
+        Raises:
+            ValueError: If the layout is invalid or the filename does not parse.
+        """
+        processed_dir = file_path.parent / self.PROCESSED_FOLDER
+        layout = (config or {}).get("processed_layout")
+        if not layout:
+            return processed_dir
+
+        parsed = self._parse_and_validate(file_path.name)
+        if parsed is None:
+            raise ValueError(f"Cannot apply processed_layout to an invalid filename: {file_path.name}")
+
+        # Deferred: only needed with processed_layout
+        from .layout import render_layout
+
+        return processed_dir / render_layout(layout, parsed, file_path.name)
+
+    def _move_to_processed(self, file_path: Path, config: Optional[dict[str, Any]] = None) -> bool:
         """Move file to processed subfolder, preserving directory structure.
 
+        The file goes to the folder _processed_dir gives, created on first
+        use. In ``"sidecar"`` mode the file's XMP sidecar is moved along with it.
+        A file whose copy _write_to_processed already wrote into processed/
+        has the copy renamed into place, and the original is removed only
+        after the rename is on disk, unless ``durability`` is ``"none"``. Other files are renamed, or copied by
+        the kernel when processed/ is on another filesystem (see move_file).
+        An existing destination is never replaced: the renames fail instead
+        of checking for it first, so a plain move costs a single rename once
+        processed/ is known to exist (see _in_directory). Renames are flushed
+        to disk as the ``durability`` setting says; copies made by the move
+        are always flushed before their source is removed. With ``journal``
+        set, the move is recorded in the ProcessingJournal.
+
         Args:
             file_path: Path to the file.
+            config: Plugin-specific configuration parameters.
 
         Returns:
             True if move successful, False otherwise.
         """
+        # Deferred: fileio is imported by the first move
+        from .fileio import move_file, rename_noreplace
+
+        config = config or {}
+        staged = self._staged.pop(file_path, None)
+        moved_sidecar = None
         try:
+            sync = self._sync_policy(config)
+            journal = self._processing_journal(config)
+
             # Determine the watched folder root
             # We need to find the base watched folder to create processed/ structure
             # For now, create processed/ in the same directory as the file
-            file_dir = file_path.parent
-            processed_dir = file_dir / "processed"
-
-            # Create processed directory if it doesn't exist
-            processed_dir.mkdir(parents=True, exist_ok=True)
+            processed_dir = self._processed_dir(file_path, config)
 
             # Destination path
             dest_path = processed_dir / file_path.name
 
-            # Check if destination already exists
-            if dest_path.exists():
+            if config.get("metadata_mode") == "sidecar":
+                # Deferred: only needed with the sidecar metadata_mode
+                from .sidecar import sidecar_path
+
+                sidecar, dest_sidecar = sidecar_path(file_path), sidecar_path(dest_path)
+                strategy, _ = self._in_directory(processed_dir, lambda: move_file(sidecar, dest_sidecar))
+                moved_sidecar = (dest_sidecar, sidecar)
+                if strategy == "rename":
+                    sync.moved(dest_sidecar)
+
+            if staged is not None:
+                # Rename the written copy into place, then drop the original
+                rename_noreplace(staged, dest_path)
+                staged = None
+                sync.moved(dest_path, copied=True)
+                file_path.unlink()
+                self.logger.info(f"  Moved to: {dest_path}")
+            else:
+                # Move file
+                checksum = config.get("move_checksum")
+                strategy, digest = self._in_directory(
+                    processed_dir, lambda: move_file(file_path, dest_path, checksum)
+                )
+                if strategy == "rename":
+                    sync.moved(dest_path)
+                else:
+                    self.logger.debug(f"  Copied {file_path.name} across filesystems with {strategy}")
+                if digest is not None:
+                    self.logger.info(f"  Moved to: {dest_path} ({checksum} {digest})")
+                else:
+                    self.logger.info(f"  Moved to: {dest_path}")
+
+            if moved_sidecar is not None:
+                self.logger.info(f"  Moved to: {moved_sidecar[0]}")
+            if journal is not None:
+                journal.moved(file_path)
+            return True
+
+        except Exception as e:
+            if staged is not None:
+                staged.unlink(missing_ok=True)
+            if moved_sidecar is not None:
+                # Keep the sidecar next to the image that stays in place
+                try:
+                    move_file(*moved_sidecar)
+                except OSError as undo_error:
+                    self.logger.error(f"Failed to move sidecar {moved_sidecar[0]} back: {undo_error}")
+            if isinstance(e, FileExistsError):
                 self.logger.error(
-                    f"Destination file already exists: {dest_path}. "
+                    f"Destination file already exists: {e.filename2 or e.filename}. "
                     f"Leaving source file in place."
                 )
-                return False
+            else:
+                self.logger.error(f"Failed to move file {file_path} to processed/: {e}")
+            return False
+
+    def _sync_policy(self, config: dict[str, Any]) -> "SyncPolicy":
+        """Get the durability policy of a config, replacing the one of an earlier config.
+
+        Args:
+            config: Plugin-specific configuration parameters.
+
+        Returns:
+            The policy for ``durability``, ``durability_batch`` and
+            ``durability_interval_ms``.
+
+        Raises:
+            ValueError: If the settings are invalid.
+        """
+        settings = (
+            config.get("durability", "none"),
+            config.get("durability_batch", 64),
+            config.get("durability_interval_ms", 50),
+        )
+        with self._sync_lock:
+            current = self._sync
+            if current is not None and (current.level, current.batch_size, current.interval_ms) == settings:
+                return current
+            # Deferred: durability imports fileio, which the first move needs anyway
+            from .durability import SyncPolicy
+
+            self._sync = sync = SyncPolicy(*settings)
+        if current is not None:
+            current.flush()
+        return sync
+
+    def _processing_journal(self, config: dict[str, Any]) -> Optional["ProcessingJournal"]:
+        """Get the journal of a config, closing the one of an earlier config.
+
+        Args:
+            config: Plugin-specific configuration parameters.
+
+        Returns:
+            The journal at ``journal`` with ``journal_batch`` and
+            ``journal_interval_ms``, or None if ``journal`` is not set.
+
+        Raises:
+            ValueError: If the settings are invalid.
+            sqlite3.Error: If the journal cannot be opened.
+        """
+        path = config.get("journal")
+        if not path and self._journal is None:
+            return None
+        settings = (path, config.get("journal_batch", 256), config.get("journal_interval_ms", 1000))
+        with self._sync_lock:
+            current = self._journal
+            if current is not None and self._journal_settings == settings:
+                return current
+            # Deferred: only needed with the journal option
+            from .journal import ProcessingJournal
+
+            self._journal = journal = ProcessingJournal(*settings) if path else None
+            self._journal_settings = settings
+        if current is not None:
+            current.close()
+        return journal
+
+    def flush(self) -> None:
+        """Flush the writes and moves the ``durability`` setting has left pending to disk.
+
+        The pending ``journal`` changes are committed after them, so the
+        journal does not get ahead of the files.
+        process_batch, aprocess_batch and Pipeline.run call this when they finish.
+        """
+        sync = self._sync
+        if sync is not None:
+            sync.flush()
+        journal = self._journal
+        if journal is not None:
+            journal.commit()
+
+    def close(self) -> None:
+        """Flush what is pending, close the journal and stop the writer processes and async threads.
+
+        The plugin can still be used afterwards; what it needs is started or
+        opened again.
+        """
+        self.flush()
+        with self._sync_lock:
+            journal, self._journal = self._journal, None
+            self._journal_settings = ()
+        if journal is not None:
+            journal.close()
+        if self._writers is not None:
+            self._writers.close()
+        executor, self._async_executor = self._async_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _in_directory(self, directory: Path, move: Callable[[], _T]) -> _T:
+        """Run a move into a directory, creating the directory unless this plugin already has.
+
+        Created directories are remembered in ``dir_cache``, so the mkdir is
+        not repeated for every file. If the move fails because the directory
+        has disappeared since, it is created again and the move retried once.
+
+        Args:
+            directory: Directory the move writes into.
+            move: Function doing the move.
+
+        Returns:
+            The result of move.
+        """
+        self.dir_cache.get_or_set(directory, self._create_directory)
+        try:
+            return move()
+        except FileNotFoundError:
+            self.dir_cache.discard(directory)
+            if directory.is_dir():  # the source is what is missing
+                raise
+        self.dir_cache.get_or_set(directory, self._create_directory)
+        return move()
 
-            # Move file
-            shutil.move(str(file_path), str(dest_path))
-            self.logger.info(f"  Moved to: {dest_path}")
+    def _create_directory(self, directory: Path) -> bool:
+        """Create a directory and its parents if they do not exist.
+
+        Args:
+            directory: Directory to create.
+
+        Returns:
+            True, the value cached in ``dir_cache``.
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        return True
+
+    def _move_to_quarantine(self, file_path: Path) -> bool:
+        """Move a file that crashed or hung the metadata writer to the quarantine subfolder.
+
+        Args:
+            file_path: Path to the file.
+
+        Returns:
+            True if move successful, False otherwise.
+        """
+        # Deferred: fileio is imported by the first move
+        from .fileio import move_file
+
+        try:
+            quarantine_dir = file_path.parent / self.QUARANTINE_FOLDER
+            dest_path = quarantine_dir / file_path.name
+            self._in_directory(quarantine_dir, lambda: move_file(file_path, dest_path))
+            self.logger.warning(f"  Quarantined: {dest_path}")
 
             return True
 
+        except FileExistsError:
+            self.logger.error(
+                f"Quarantined file already exists: {dest_path}. "
+                f"Leaving source file in place."
+            )
+            return False
+
         except Exception as e:
-            self.logger.error(f"Failed to move file {file_path} to processed/: {e}")
+            self.logger.error(f"Failed to move file {file_path} to {self.QUARANTINE_FOLDER}/: {e}")
             return False
+
+
+# Plugin instance of a process_batch worker process
+_worker_plugin: Optional[PhotoNamingExifPlugin] = None
+
+
+def _init_worker_plugin() -> None:
+    """Create the plugin instance of a process_batch worker process.
+
+    The plugin is closed when the worker exits, so the fsyncs and journal
+    changes it has left pending are not lost: the parent's flush() only
+    covers its own plugin, and workers end with os._exit, which skips atexit
+    and the garbage collection finalizers.
+    """
+    # Deferred: only loaded in worker processes, which have imported it already
+    from multiprocessing.util import Finalize
+
+    global _worker_plugin
+    _worker_plugin = PhotoNamingExifPlugin()
+    Finalize(None, _worker_plugin.close, exitpriority=10)
+
+
+def _process_in_worker_plugin(file_path: str, config: dict[str, Any]) -> bool:
+    """Process a file with the plugin instance of the current worker process.
+
+    Args:
+        file_path: Path to the file to process.
+        config: Plugin-specific configuration parameters.
+
+    Returns:
+        True if processing successful, False otherwise.
+    """
+    assert _worker_plugin is not None, "worker process was not initialized"
+    return _worker_plugin.process(file_path, config)
+
+
+async def _as_async_iterable(items: Union[Iterable[_T], AsyncIterable[_T]]) -> AsyncIterator[_T]:
+    """Iterate over a sync or async iterable with async for.
+
+    Args:
+        items: Iterable or async iterable.
+
+    Yields:
+        The items.
+    """
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
@@ -0,0 +1,292 @@
+"""Pool of long-lived worker processes with a pre-built plugin each."""
+
+import logging
+import multiprocessing
+import os
+import sys
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from typing import Any, Iterable, Iterator, Optional
+
+from .plugin import PhotoNamingExifPlugin
+
+
+def _current_rss() -> int:
+    """Get the resident set size of the current process.
+
+    Returns:
+        RSS in bytes; the peak RSS where the current value is not available,
+        or 0 where neither is.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _worker_main(conn: Connection, config: dict[str, Any]) -> None:
+    """Serve process() requests received over a pipe until told to stop.
+
+    pyexiv2 is imported before the first request. Requests are file paths;
+    None stops the worker. Each reply is (success, rss_growth) with the RSS
+    growth in bytes since the worker started.
+
+    Args:
+        conn: Worker end of the pipe.
+        config: Plugin-specific configuration parameters for every file.
+    """
+    # Imported lazily by the plugin; load it now, so the first file does not
+    # pay for it and the RSS baseline includes it
+    import pyexiv2  # noqa: F401
+
+    plugin = PhotoNamingExifPlugin()
+    baseline = _current_rss()
+
+    while True:
+        try:
+            file_path = conn.recv()
+        except EOFError:
+            break
+        if file_path is None:
+            break
+
+        try:
+            success = plugin.process(file_path, config)
+        except Exception as e:
+            plugin.logger.error(f"Failed to process {file_path}: {e}")
+            success = False
+        conn.send((success, _current_rss() - baseline))
+
+    plugin.close()
+    conn.close()
+
+
+@dataclass
+class _Worker:
+    """A worker process and the parent end of its pipe."""
+
+    process: multiprocessing.process.BaseProcess
+    conn: Connection
+    tasks: int = 0
+
+
+class WorkerPool:
+    """Long-lived worker processes, each with its own PhotoNamingExifPlugin.
+
+    Every worker imports pyexiv2 and builds its plugin (with its caches) once,
+    then processes one file per request; a request is just the file path.
+    Workers are replaced after ``max_tasks`` files or once their RSS has grown
+    by ``max_rss_growth`` bytes. A worker that dies while processing a file
+    is replaced and the file reported as failed; one that died while idle is
+    replaced when it is next given a file. The pool can be reused for any number of map()
+    calls and should be closed when done.
+    """
+
+    MAX_TASKS = 1000
+    MAX_RSS_GROWTH = 256 * 1024 * 1024
+    STOP_TIMEOUT = 5.0
+
+    def __init__(
+        self,
+        config: dict[str, Any],
+        workers: Optional[int] = None,
+        max_tasks: Optional[int] = MAX_TASKS,
+        max_rss_growth: Optional[int] = MAX_RSS_GROWTH,
+        context: Optional[str] = None,
+    ) -> None:
+        """Initialize the pool. Workers are started on first use.
+
+        Args:
+            config: Plugin-specific configuration parameters for every file.
+                Sent to each worker once, so it must be picklable.
+            workers: Number of worker processes. Defaults to the CPU count.
+            max_tasks: Files a worker processes before it is replaced. None for no limit.
+            max_rss_growth: RSS growth in bytes after which a worker is replaced.
+                None for no limit.
+            context: multiprocessing start method ("fork", "spawn", "forkserver").
+                Defaults to the platform default.
+
+        Raises:
+            ValueError: If workers, max_tasks or max_rss_growth is less than 1.
+        """
+        workers = (os.cpu_count() or 1) if workers is None else workers
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1: {workers}")
+        if max_tasks is not None and max_tasks < 1:
+            raise ValueError(f"max_tasks must be at least 1: {max_tasks}")
+        if max_rss_growth is not None and max_rss_growth < 1:
+            raise ValueError(f"max_rss_growth must be at least 1: {max_rss_growth}")
+
+        self.config = config
+        self.workers = workers
+        self.max_tasks = max_tasks
+        self.max_rss_growth = max_rss_growth
+        self.recycled = 0  # workers replaced for hitting a limit
+        self.crashed = 0  # workers that died while processing a file
+        self.logger = logging.getLogger(__name__)
+        self._context = multiprocessing.get_context(context)
+        self._workers: list[_Worker] = []
+
+    def __enter__(self) -> "WorkerPool":
+        """Start the workers.
+
+        Returns:
+            The pool.
+        """
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Stop the workers."""
+        self.close()
+
+    def pids(self) -> list[int]:
+        """Get the process IDs of the current workers.
+
+        Returns:
+            Worker process IDs.
+        """
+        return [worker.process.pid for worker in self._workers if worker.process.pid is not None]
+
+    def start(self) -> None:
+        """Start the worker processes, if not already running."""
+        while len(self._workers) < self.workers:
+            self._workers.append(self._spawn())
+
+    def close(self) -> None:
+        """Stop all worker processes."""
+        for worker in self._workers:
+            self._stop(worker)
+        self._workers.clear()
+
+    def map(self, file_paths: Iterable[str]) -> Iterator[tuple[str, bool]]:
+        """Process files on the workers.
+
+        Each worker has at most one file in progress, and paths are only
+        taken from file_paths as workers become free.
+
+        Args:
+            file_paths: Paths of the files to process.
+
+        Yields:
+            (file_path, success) tuples in completion order.
+        """
+        self.start()
+        paths = iter(file_paths)
+        idle = list(range(len(self._workers)))
+        busy: dict[Connection, tuple[int, str]] = {}
+
+        try:
+            while True:
+                while idle:
+                    file_path = next(paths, None)
+                    if file_path is None:
+                        break
+                    slot = idle.pop()
+                    self._dispatch(slot, file_path)
+                    busy[self._workers[slot].conn] = (slot, file_path)
+
+                if not busy:
+                    return
+
+                for conn in wait(list(busy)):
+                    slot, file_path = busy.pop(conn)
+                    success = self._collect(slot, file_path)
+                    idle.append(slot)
+                    yield file_path, success
+        finally:
+            # Closed early: wait for the files in progress so every pipe is idle again
+            for slot, file_path in busy.values():
+                self._collect(slot, file_path)
+
+    def _dispatch(self, slot: int, file_path: str) -> None:
+        """Send a file to an idle worker, replacing the worker if it died while idle.
+
+        Args:
+            slot: Index of the worker.
+            file_path: The file to process.
+        """
+        worker = self._workers[slot]
+        try:
+            worker.conn.send(file_path)
+            return
+        except OSError:
+            self.logger.warning(f"Worker {worker.process.pid} died while idle, replacing it")
+        self._stop(worker)
+        self._workers[slot] = self._spawn()
+        self._workers[slot].conn.send(file_path)
+
+    def _collect(self, slot: int, file_path: str) -> bool:
+        """Receive a worker's reply, replacing the worker if it died or hit a limit.
+
+        Args:
+            slot: Index of the worker.
+            file_path: The file the worker was processing.
+
+        Returns:
+            True if the file was processed successfully.
+        """
+        worker = self._workers[slot]
+        try:
+            success, rss_growth = worker.conn.recv()
+        except (EOFError, OSError):
+            self.logger.error(f"Worker {worker.process.pid} died while processing {file_path}")
+            self.crashed += 1
+            self._stop(worker)
+            self._workers[slot] = self._spawn()
+            return False
+
+        worker.tasks += 1
+        over_tasks = self.max_tasks is not None and worker.tasks >= self.max_tasks
+        over_rss = self.max_rss_growth is not None and rss_growth >= self.max_rss_growth
+        if over_tasks or over_rss:
+            self.logger.debug(
+                f"Recycling worker {worker.process.pid} after {worker.tasks} files "
+                f"(RSS growth {rss_growth} bytes)"
+            )
+            self.recycled += 1
+            self._stop(worker)
+            self._workers[slot] = self._spawn()
+
+        return success
+
+    def _spawn(self) -> _Worker:
+        """Start a worker process.
+
+        Returns:
+            The new worker.
+        """
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.config),
+            name="naming_exif-worker",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def _stop(self, worker: _Worker) -> None:
+        """Ask a worker to exit, terminating it if it does not.
+
+        Args:
+            worker: The worker to stop.
+        """
+        try:
+            worker.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        worker.process.join(self.STOP_TIMEOUT)
+        if worker.process.is_alive():
+            worker.process.terminate()
+            worker.process.join()
+        worker.conn.close()
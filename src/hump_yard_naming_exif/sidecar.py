@@ -0,0 +1,121 @@
+"""XMP sidecar files, written without touching the image."""
+
+import re
+from html import escape
+from pathlib import Path
+
+SIDECAR_SUFFIX = ".xmp"
+
+# Namespaces of the properties the plugin writes
+XMP_NAMESPACES = {
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "xmp": "http://ns.adobe.com/xap/1.0/",
+    "photoshop": "http://ns.adobe.com/photoshop/1.0/",
+    "Iptc4xmpCore": "http://iptc.org/std/Iptc4xmpCore/1.0/xmlns/",
+    "exif": "http://ns.adobe.com/exif/1.0/",
+}
+
+# Properties whose XMP value type is an unordered array
+BAG_PROPERTIES = {"xmp:Identifier"}
+
+_EXIF_DATETIME = re.compile(r"(\d{4}):(\d{2}):(\d{2}) (\d{2}):(\d{2}):(\d{2})")
+
+
+def sidecar_path(file_path: Path) -> Path:
+    """Get the sidecar path of an image.
+
+    The full image name is kept (``photo.tiff.xmp``), so a JPEG and a TIFF
+    with the same stem get separate sidecars.
+
+    Args:
+        file_path: Path to the image.
+
+    Returns:
+        Path to the sidecar.
+    """
+    return file_path.with_name(file_path.name + SIDECAR_SUFFIX)
+
+
+def _exif_to_xmp(key: str, value: str) -> tuple[str, str]:
+    """Convert a pyexiv2 EXIF key and value to the XMP exif: property.
+
+    Args:
+        key: pyexiv2 EXIF key, such as ``Exif.Image.DateTimeOriginal``.
+        value: EXIF value; dates use the EXIF ``YYYY:MM:DD HH:MM:SS`` format.
+
+    Returns:
+        Tuple of (qualified XMP name, XMP value), with dates in ISO 8601.
+    """
+    match = _EXIF_DATETIME.fullmatch(value)
+    if match:
+        value = "{}-{}-{}T{}:{}:{}".format(*match.groups())
+    return f"exif:{key.rsplit('.', 1)[-1]}", value
+
+
+def build_xmp_packet(exif_dict: dict[str, str], xmp_dict: dict[str, str]) -> bytes:
+    """Build an XMP packet holding the given values.
+
+    Args:
+        exif_dict: EXIF values keyed by pyexiv2 key, stored as exif: properties.
+        xmp_dict: XMP values keyed by pyexiv2 key (``Xmp.<prefix>.<Name>``).
+
+    Returns:
+        UTF-8 encoded XMP packet.
+
+    Raises:
+        ValueError: If a key uses a namespace prefix the plugin does not know.
+    """
+    properties = [_exif_to_xmp(key, value) for key, value in exif_dict.items()]
+    properties += [(key.split(".", 1)[1].replace(".", ":", 1), value) for key, value in xmp_dict.items()]
+
+    prefixes = sorted({name.split(":", 1)[0] for name, _ in properties})
+    unknown = [prefix for prefix in prefixes if prefix not in XMP_NAMESPACES]
+    if unknown:
+        raise ValueError(f"Unknown XMP namespace prefix: {', '.join(unknown)}")
+
+    lines = [
+        '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>',
+        '<x:xmpmeta xmlns:x="adobe:ns:meta/">',
+        ' <rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">',
+        '  <rdf:Description rdf:about=""',
+    ]
+    lines += [f'    xmlns:{prefix}="{XMP_NAMESPACES[prefix]}"' for prefix in prefixes]
+    lines[-1] += ">"
+
+    for name, value in properties:
+        if name in BAG_PROPERTIES:
+            lines += [
+                f"   <{name}>",
+                "    <rdf:Bag>",
+                f"     <rdf:li>{escape(value, quote=False)}</rdf:li>",
+                "    </rdf:Bag>",
+                f"   </{name}>",
+            ]
+        else:
+            lines.append(f"   <{name}>{escape(value, quote=False)}</{name}>")
+
+    lines += [
+        "  </rdf:Description>",
+        " </rdf:RDF>",
+        "</x:xmpmeta>",
+        '<?xpacket end="w"?>',
+    ]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def write_sidecar(file_path: Path, exif_dict: dict[str, str], xmp_dict: dict[str, str]) -> Path:
+    """Write the values into the image's XMP sidecar, replacing an existing one.
+
+    The image itself is not opened, so the cost does not depend on its size.
+
+    Args:
+        file_path: Path to the image.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+
+    Returns:
+        Path to the sidecar.
+    """
+    path = sidecar_path(file_path)
+    path.write_bytes(build_xmp_packet(exif_dict, xmp_dict))
+    return path
@@ -0,0 +1,349 @@
+"""Append-only metadata updates for TIFF and BigTIFF files.
+
+Instead of rewriting the image, the new values, the XMP packet and a copy
+of IFD0 pointing at them are appended to the end of the file, and then the
+first-IFD offset in the header is updated. Strip and tile data and all
+other IFDs stay where they are, so a few kilobytes are written whatever the
+size of the image; the old IFD0 and its replaced values remain in the file
+as unused bytes. Until the header is updated, the file still reads as before.
+"""
+
+import mmap
+from pathlib import Path
+from typing import BinaryIO, NamedTuple, Optional, Union
+
+from .fileio import STREAM_CHUNK_SIZE, copy_stream, pwrite
+from .sidecar import build_xmp_packet
+from .xmp import update_xmp_packet
+
+XMP_TAG = 700
+
+# EXIF values the native writers can set: pyexiv2 key -> IFD0 tag
+EXIF_IFD0_TAGS = {"Exif.Image.DateTimeOriginal": 0x9003}
+
+_BYTE = 1
+_ASCII = 2
+_UNDEFINED = 7
+_MAX_ENTRIES = 4096
+
+# Mapped file, or the TIFF structure of a JPEG Exif segment
+_Data = Union[mmap.mmap, bytes]
+
+
+class _Layout(NamedTuple):
+    """Field sizes of classic TIFF or BigTIFF in one byte order."""
+
+    byte_order: str
+    offset_size: int  # size of offsets, counts and inline values
+    count_size: int  # size of the IFD entry count
+    first_ifd: int  # position of the first-IFD offset in the header
+
+    @property
+    def entry_size(self) -> int:
+        """Get the size of an IFD entry.
+
+        Returns:
+            Size in bytes.
+        """
+        return 4 + 2 * self.offset_size
+
+    @property
+    def max_offset(self) -> int:
+        """Get the largest offset the format can address.
+
+        Returns:
+            Largest offset in bytes.
+        """
+        return (1 << (8 * self.offset_size)) - 1
+
+
+def _layout(data: _Data) -> Optional[_Layout]:
+    """Read the TIFF header.
+
+    Args:
+        data: TIFF data.
+
+    Returns:
+        Layout of the file, or None if it is neither classic TIFF nor BigTIFF.
+    """
+    byte_order = {b"II": "little", b"MM": "big"}.get(bytes(data[:2]))
+    if byte_order is None or len(data) < 8:
+        return None
+
+    version = int.from_bytes(data[2:4], byte_order)
+    if version == 42:
+        return _Layout(byte_order, 4, 2, 4)
+    # BigTIFF: offset size 8, then a reserved zero word
+    if version == 43 and len(data) >= 16 and data[4:8] == (8).to_bytes(2, byte_order) + b"\x00\x00":
+        return _Layout(byte_order, 8, 8, 8)
+    return None
+
+
+def _read_ifd0(data: _Data, layout: _Layout) -> Optional[tuple[dict[int, bytes], int]]:
+    """Read the entries of the first IFD.
+
+    Args:
+        data: TIFF data.
+        layout: Layout of the file.
+
+    Returns:
+        Tuple of (raw entries keyed by tag, offset of the next IFD), or None
+        if the IFD is missing or truncated.
+    """
+    order = layout.byte_order
+    ifd = int.from_bytes(data[layout.first_ifd:layout.first_ifd + layout.offset_size], order)
+    if ifd == 0 or ifd + layout.count_size > len(data):
+        return None
+
+    count = int.from_bytes(data[ifd:ifd + layout.count_size], order)
+    first_entry = ifd + layout.count_size
+    next_ifd = first_entry + count * layout.entry_size
+    if count > _MAX_ENTRIES or next_ifd + layout.offset_size > len(data):
+        return None
+
+    entries = {}
+    for position in range(first_entry, next_ifd, layout.entry_size):
+        entry = bytes(data[position:position + layout.entry_size])
+        entries[int.from_bytes(entry[:2], order)] = entry
+    return entries, int.from_bytes(data[next_ifd:next_ifd + layout.offset_size], order)
+
+
+def _read_xmp(data: _Data, layout: _Layout, entry: bytes) -> Optional[bytes]:
+    """Read the XMP packet an IFD entry refers to.
+
+    Args:
+        data: TIFF data.
+        layout: Layout of the file.
+        entry: Raw XMP (tag 700) entry.
+
+    Returns:
+        The packet, or None if the entry is not a byte array inside the file.
+    """
+    order, size = layout.byte_order, layout.offset_size
+    field_type = int.from_bytes(entry[2:4], order)
+    count = int.from_bytes(entry[4:4 + size], order)
+    field = entry[4 + size:]
+    if field_type not in (_BYTE, _UNDEFINED):
+        return None
+    if count <= size:
+        return field[:count]
+
+    offset = int.from_bytes(field, order)
+    if offset + count > len(data):
+        return None
+    return bytes(data[offset:offset + count])
+
+
+def _append_block(
+    layout: _Layout, entries: dict[int, bytes], values: dict[int, tuple[int, bytes]], next_ifd: int, end: int
+) -> Optional[tuple[bytes, int]]:
+    """Build the bytes to append: the values that do not fit in an entry, then the new IFD0.
+
+    Args:
+        layout: Layout of the file.
+        entries: Raw entries of the current IFD0, copied unchanged unless replaced.
+        values: New (field type, value) of single-byte types, keyed by tag.
+        next_ifd: Offset of the IFD after IFD0.
+        end: Size of the file.
+
+    Returns:
+        Tuple of (bytes to append at ``end``, offset of the new IFD0), or None
+        if the new IFD0 would lie beyond what the format can address.
+    """
+    order, size = layout.byte_order, layout.offset_size
+    block = bytearray()
+
+    def align() -> None:
+        # IFDs and values start on a word boundary
+        block.extend(bytes((end + len(block)) % 2))
+
+    entries = dict(entries)
+    for tag, (field_type, value) in values.items():
+        if len(value) <= size:
+            field = value.ljust(size, b"\x00")
+        else:
+            align()
+            field = (end + len(block)).to_bytes(size, order)
+            block += value
+        header = tag.to_bytes(2, order) + field_type.to_bytes(2, order) + len(value).to_bytes(size, order)
+        entries[tag] = header + field
+
+    align()
+    ifd = end + len(block)
+    block += len(entries).to_bytes(layout.count_size, order)
+    for tag in sorted(entries):
+        block += entries[tag]
+    block += next_ifd.to_bytes(size, order)
+
+    if end + len(block) > layout.max_offset:
+        return None
+    return bytes(block), ifd
+
+
+def _append_metadata(
+    data: _Data, exif_dict: dict[str, str], xmp_dict: dict[str, str]
+) -> Optional[tuple[_Layout, bytes, int]]:
+    """Build the update of a TIFF structure: a block to append and the new first-IFD offset.
+
+    The values are set in IFD0 and the XMP packet (tag 700) is merged with
+    the existing one if there is one.
+
+    Args:
+        data: TIFF data.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+
+    Returns:
+        Tuple of (layout, bytes to append at the end of data, offset of the
+        new IFD0), or None if the data cannot be updated this way (not a
+        TIFF, a damaged IFD0, an unsupported EXIF key or XMP packet, or a
+        classic TIFF that would grow past 4 GiB).
+    """
+    layout = _layout(data)
+    ifd0 = _read_ifd0(data, layout) if layout else None
+    if layout is None or ifd0 is None:
+        return None
+    entries, next_ifd = ifd0
+
+    values: dict[int, tuple[int, bytes]] = {}
+    for key, value in exif_dict.items():
+        tag = EXIF_IFD0_TAGS.get(key)
+        if tag is None or not value.isascii():
+            return None
+        values[tag] = (_ASCII, value.encode("ascii") + b"\x00")
+
+    if xmp_dict:
+        old_packet = _read_xmp(data, layout, entries[XMP_TAG]) if XMP_TAG in entries else b""
+        if old_packet is None:
+            return None
+        try:
+            if old_packet:
+                packet = update_xmp_packet(old_packet, xmp_dict)
+            else:
+                packet = build_xmp_packet({}, xmp_dict)
+        except ValueError:  # unknown namespace prefix
+            return None
+        if packet is None:
+            return None
+        values[XMP_TAG] = (_BYTE, packet)
+
+    appended = _append_block(layout, entries, values, next_ifd, len(data))
+    if appended is None:
+        return None
+    return layout, *appended
+
+
+def update_tiff_bytes(
+    data: bytes, exif_dict: dict[str, str], xmp_dict: dict[str, str]
+) -> Optional[bytes]:
+    """Set values in a TIFF structure held in memory, such as a JPEG Exif segment.
+
+    Args:
+        data: TIFF data.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+
+    Returns:
+        Updated TIFF data, or None if it cannot be updated (see update_tiff_by_append).
+    """
+    update = _append_metadata(data, exif_dict, xmp_dict)
+    if update is None:
+        return None
+
+    layout, block, ifd = update
+    header_end = layout.first_ifd + layout.offset_size
+    first_ifd = ifd.to_bytes(layout.offset_size, layout.byte_order)
+    return data[:layout.first_ifd] + first_ifd + data[header_end:] + block
+
+
+def update_tiff_by_append(
+    file_path: Path, exif_dict: dict[str, str], xmp_dict: dict[str, str]
+) -> Optional[int]:
+    """Write EXIF and XMP values into a TIFF without rewriting the image data.
+
+    The new IFD0 is appended as described in the module docstring.
+
+    Args:
+        file_path: Path to the TIFF or BigTIFF file.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+
+    Returns:
+        Number of bytes written, or None if the file cannot be updated this
+        way (not a TIFF, a damaged IFD0, an unsupported EXIF key or XMP packet,
+        or a classic TIFF that would grow past 4 GiB). The file is then unchanged.
+
+    Raises:
+        OSError: If the file cannot be opened or written.
+    """
+    with open(file_path, "r+b") as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+        with data:
+            update = _append_metadata(data, exif_dict, xmp_dict)
+            end = len(data)
+        if update is None:
+            return None
+        layout, block, ifd = update
+
+        # Data first: until the header points at the new IFD0, readers see the old one
+        pwrite(file, block, end)
+        file.flush()
+        pwrite(file, ifd.to_bytes(layout.offset_size, layout.byte_order), layout.first_ifd)
+        file.flush()
+
+    return len(block) + layout.offset_size
+
+
+def copy_tiff_with_metadata(
+    file_path: Path,
+    exif_dict: dict[str, str],
+    xmp_dict: dict[str, str],
+    target: BinaryIO,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Optional[int]:
+    """Write a copy of a TIFF with the new IFD0 appended to an open file.
+
+    The result is the file update_tiff_by_append would leave, produced while
+    the image data is streamed through in chunks.
+
+    Args:
+        file_path: Path to the TIFF or BigTIFF file.
+        exif_dict: EXIF values keyed by pyexiv2 key.
+        xmp_dict: XMP values keyed by pyexiv2 key.
+        target: File to write the copy to.
+        chunk_size: Size of the chunks the image data is copied in.
+
+    Returns:
+        Number of bytes written, or None if the file cannot be updated this
+        way (see update_tiff_by_append). Nothing is written to target then.
+
+    Raises:
+        OSError: If the file cannot be read, changes size while it is
+            copied, or the copy cannot be written.
+    """
+    with open(file_path, "rb", buffering=0) as source:
+        try:
+            data = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+
+        with data:
+            update = _append_metadata(data, exif_dict, xmp_dict)
+            end = len(data)
+            header = data[:update[0].first_ifd] if update else b""
+        if update is None:
+            return None
+        layout, block, ifd = update
+
+        target.write(header + ifd.to_bytes(layout.offset_size, layout.byte_order))
+        header_end = layout.first_ifd + layout.offset_size
+        source.seek(header_end)
+        if copy_stream(source, target, chunk_size) != end - header_end:
+            raise OSError(f"{file_path} changed size while it was copied")
+        target.write(block)
+
+    return end + len(block)
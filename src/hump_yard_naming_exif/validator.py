@@ -1,7 +1,49 @@
 """Validator for parsed filename data."""
 
+from enum import IntFlag
+from typing import TYPE_CHECKING, Iterable
+
 from .parser import ParsedFilename
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .batch import ParsedBatch
+
+
+class Violation(IntFlag):
+    """Validation rules, one flag per rule.
+
+    Flags are declared in the order FilenameValidator.validate reports the rules.
+    """
+
+    MODIFIER = 1 << 0
+    MONTH_RANGE = 1 << 1
+    DAY_RANGE = 1 << 2
+    HOUR_RANGE = 1 << 3
+    MINUTE_RANGE = 1 << 4
+    SECOND_RANGE = 1 << 5
+    MONTH_ZERO_DAY = 1 << 6
+    MONTH_ZERO_TIME = 1 << 7
+    DAY_ZERO_TIME = 1 << 8
+    HOUR_ZERO_TIME = 1 << 9
+    MINUTE_ZERO_SECOND = 1 << 10
+
+
+# Plain int copies of the flags for check(), which runs for every filesystem event;
+# arithmetic on IntFlag members costs several times more than on ints.
+_MODIFIER = Violation.MODIFIER.value
+_MONTH_RANGE = Violation.MONTH_RANGE.value
+_DAY_RANGE = Violation.DAY_RANGE.value
+_HOUR_RANGE = Violation.HOUR_RANGE.value
+_MINUTE_RANGE = Violation.MINUTE_RANGE.value
+_SECOND_RANGE = Violation.SECOND_RANGE.value
+_MONTH_ZERO_DAY = Violation.MONTH_ZERO_DAY.value
+_MONTH_ZERO_TIME = Violation.MONTH_ZERO_TIME.value
+_DAY_ZERO_TIME = Violation.DAY_ZERO_TIME.value
+_HOUR_ZERO_TIME = Violation.HOUR_ZERO_TIME.value
+_MINUTE_ZERO_SECOND = Violation.MINUTE_ZERO_SECOND.value
+
 
 class FilenameValidator:
     """Validator for parsed filename data."""
@@ -21,126 +63,196 @@ class FilenameValidator:
         Returns:
             List of validation error messages (empty if valid).
         """
-        errors = []
+        return self.describe(parsed, self.check(parsed))
+
+    def check(self, parsed: ParsedFilename) -> int:
+        """Validate parsed filename data without building any messages.
+
+        Args:
+            parsed: Parsed filename data.
+
+        Returns:
+            Bitmask of violated Violation flags (0 if valid).
+        """
+        violations = 0
+        month, day = parsed.month, parsed.day
+        hour, minute, second = parsed.hour, parsed.minute, parsed.second
 
         # Validate modifier
         if parsed.modifier not in self.VALID_MODIFIERS:
-            errors.append(
-                f"Invalid modifier: '{parsed.modifier}' (must be one of: {', '.join(sorted(self.VALID_MODIFIERS))})"
-            )
+            violations |= _MODIFIER
 
         # Validate date components
-        errors.extend(self._validate_date(parsed))
+        if month > 12:
+            violations |= _MONTH_RANGE
+        if month > 0 and day > 0:
+            # Check if day is valid for the given month
+            if day > self.DAYS_IN_MONTH.get(month, 0):
+                violations |= _DAY_RANGE
+        elif day > 31:
+            violations |= _DAY_RANGE
 
         # Validate time components
-        errors.extend(self._validate_time(parsed))
-
-        # Validate zero sequence rule
-        errors.extend(self._validate_zero_sequence(parsed))
-
-        return errors
-
-    def _validate_date(self, parsed: ParsedFilename) -> list[str]:
-        """Validate date components.
+        if hour > 23:
+            violations |= _HOUR_RANGE
+        if minute > 59:
+            violations |= _MINUTE_RANGE
+        if second > 59:
+            violations |= _SECOND_RANGE
+
+        # Validate zero sequence rule:
+        # If month=00, then day=00 and time=00:00:00
+        # If day=00, then time=00:00:00
+        # If hour=00, then minute=00 and second=00
+        # If minute=00, then second=00
+        if month == 0 or day == 0 or hour == 0 or minute == 0:
+            time_set = hour != 0 or minute != 0 or second != 0
+            if month == 0:
+                if day != 0:
+                    violations |= _MONTH_ZERO_DAY
+                if time_set:
+                    violations |= _MONTH_ZERO_TIME
+            if day == 0 and time_set:
+                violations |= _DAY_ZERO_TIME
+            if hour == 0 and (minute != 0 or second != 0):
+                violations |= _HOUR_ZERO_TIME
+            if minute == 0 and second != 0:
+                violations |= _MINUTE_ZERO_SECOND
+
+        return violations
+
+    def describe(self, parsed: ParsedFilename, violations: int) -> list[str]:
+        """Render validation error messages for violated rules.
 
         Args:
             parsed: Parsed filename data.
+            violations: Bitmask of violated rules, as returned by check().
 
         Returns:
-            List of validation error messages.
+            List of validation error messages, one per violated rule.
         """
         errors = []
 
-        # Month validation
-        if parsed.month > 12:
+        if violations & _MODIFIER:
+            errors.append(
+                f"Invalid modifier: '{parsed.modifier}' (must be one of: {', '.join(sorted(self.VALID_MODIFIERS))})"
+            )
+
+        if violations & _MONTH_RANGE:
             errors.append(f"Invalid month value: {parsed.month} (must be 00-12)")
 
-        # Day validation
-        if parsed.month > 0 and parsed.day > 0:
-            # Check if day is valid for the given month
-            max_days = self.DAYS_IN_MONTH.get(parsed.month, 0)
-            if parsed.day > max_days:
+        if violations & _DAY_RANGE:
+            if parsed.month > 0 and parsed.day > 0:
+                max_days = self.DAYS_IN_MONTH.get(parsed.month, 0)
                 errors.append(
                     f"Invalid day value: {parsed.day} for month {parsed.month} "
                     f"(must be 00-{max_days})"
                 )
-        elif parsed.day > 31:
-            errors.append(f"Invalid day value: {parsed.day} (must be 00-31)")
+            else:
+                errors.append(f"Invalid day value: {parsed.day} (must be 00-31)")
 
-        return errors
+        if violations & _HOUR_RANGE:
+            errors.append(f"Invalid hour value: {parsed.hour} (must be 00-23)")
 
-    def _validate_time(self, parsed: ParsedFilename) -> list[str]:
-        """Validate time components.
+        if violations & _MINUTE_RANGE:
+            errors.append(f"Invalid minute value: {parsed.minute} (must be 00-59)")
 
-        Args:
-            parsed: Parsed filename data.
+        if violations & _SECOND_RANGE:
+            errors.append(f"Invalid second value: {parsed.second} (must be 00-59)")
 
-        Returns:
-            List of validation error messages.
-        """
-        errors = []
+        if violations & _MONTH_ZERO_DAY:
+            errors.append(
+                f"Invalid date: month is 00 but day is {parsed.day:02d} "
+                f"(when month=00, day must also be 00)"
+            )
 
-        if parsed.hour > 23:
-            errors.append(f"Invalid hour value: {parsed.hour} (must be 00-23)")
+        if violations & _MONTH_ZERO_TIME:
+            errors.append(
+                f"Invalid date: month is 00 but time is {parsed.hour:02d}:{parsed.minute:02d}:{parsed.second:02d} "
+                f"(when month=00, time must be 00:00:00)"
+            )
 
-        if parsed.minute > 59:
-            errors.append(f"Invalid minute value: {parsed.minute} (must be 00-59)")
+        if violations & _DAY_ZERO_TIME:
+            errors.append(
+                f"Invalid date: day is 00 but time is {parsed.hour:02d}:{parsed.minute:02d}:{parsed.second:02d} "
+                f"(when day=00, time must be 00:00:00)"
+            )
 
-        if parsed.second > 59:
-            errors.append(f"Invalid second value: {parsed.second} (must be 00-59)")
+        if violations & _HOUR_ZERO_TIME:
+            errors.append(
+                f"Invalid time: hour is 00 but minutes/seconds are {parsed.minute:02d}:{parsed.second:02d} "
+                f"(when hour=00, minutes and seconds must also be 00)"
+            )
+
+        if violations & _MINUTE_ZERO_SECOND:
+            errors.append(
+                f"Invalid time: minute is 00 but second is {parsed.second:02d} "
+                f"(when minute=00, second must also be 00)"
+            )
 
         return errors
 
-    def _validate_zero_sequence(self, parsed: ParsedFilename) -> list[str]:
-        """Validate that if a component is 00, all more precise components are also 00.
+    def validate_many(self, batch: "ParsedBatch") -> "np.ndarray":
+        """Validate a columnar batch with vectorized NumPy checks.
 
-        Rule: If month=00, then day=00 and time=00:00:00
-              If day=00, then time=00:00:00
-              If hour=00, then minute=00 and second=00
-              If minute=00, then second=00
+        No messages are built; use explain() for the rows whose messages are needed.
 
         Args:
-            parsed: Parsed filename data.
+            batch: Parsed batch from FilenameParser.parse_many.
 
         Returns:
-            List of validation error messages.
+            uint16 array with the Violation flags of each row. Rows that did not
+            parse (``batch.valid`` is False) are reported as 0.
         """
-        errors = []
+        import numpy as np
 
-        # If month is 00, day and time must be 00
-        if parsed.month == 0:
-            if parsed.day != 0:
-                errors.append(
-                    f"Invalid date: month is 00 but day is {parsed.day:02d} "
-                    f"(when month=00, day must also be 00)"
-                )
-            if parsed.hour != 0 or parsed.minute != 0 or parsed.second != 0:
-                errors.append(
-                    f"Invalid date: month is 00 but time is {parsed.hour:02d}:{parsed.minute:02d}:{parsed.second:02d} "
-                    f"(when month=00, time must be 00:00:00)"
-                )
+        month, day = batch.month, batch.day
+        hour, minute, second = batch.hour, batch.minute, batch.second
+        violations = np.zeros(len(batch), dtype=np.uint16)
 
-        # If day is 00, time must be 00:00:00
-        if parsed.day == 0:
-            if parsed.hour != 0 or parsed.minute != 0 or parsed.second != 0:
-                errors.append(
-                    f"Invalid date: day is 00 but time is {parsed.hour:02d}:{parsed.minute:02d}:{parsed.second:02d} "
-                    f"(when day=00, time must be 00:00:00)"
-                )
+        def flag(rule: Violation, mask: "np.ndarray") -> None:
+            np.bitwise_or(violations, mask * np.uint16(rule), out=violations)
 
-        # If hour is 00, minute and second must be 00
-        if parsed.hour == 0:
-            if parsed.minute != 0 or parsed.second != 0:
-                errors.append(
-                    f"Invalid time: hour is 00 but minutes/seconds are {parsed.minute:02d}:{parsed.second:02d} "
-                    f"(when hour=00, minutes and seconds must also be 00)"
-                )
+        modifier_ok = np.zeros(256, dtype=np.bool_)
+        modifier_ok[[ord(modifier) for modifier in self.VALID_MODIFIERS]] = True
+        flag(Violation.MODIFIER, ~modifier_ok[batch.modifier])
 
-        # If minute is 00, second must be 00
-        if parsed.minute == 0 and parsed.second != 0:
-            errors.append(
-                f"Invalid time: minute is 00 but second is {parsed.second:02d} "
-                f"(when minute=00, second must also be 00)"
-            )
+        # Index 13 stands for every month above 12, which allows no day at all
+        days_in_month = np.zeros(14, dtype=np.int64)
+        for month_number, max_days in self.DAYS_IN_MONTH.items():
+            days_in_month[month_number] = max_days
+        max_day = days_in_month[np.minimum(month, 13)]
 
-        return errors
+        flag(Violation.MONTH_RANGE, month > 12)
+        flag(Violation.DAY_RANGE, np.where((month > 0) & (day > 0), day > max_day, day > 31))
+        flag(Violation.HOUR_RANGE, hour > 23)
+        flag(Violation.MINUTE_RANGE, minute > 59)
+        flag(Violation.SECOND_RANGE, second > 59)
+
+        time_set = (hour != 0) | (minute != 0) | (second != 0)
+        flag(Violation.MONTH_ZERO_DAY, (month == 0) & (day != 0))
+        flag(Violation.MONTH_ZERO_TIME, (month == 0) & time_set)
+        flag(Violation.DAY_ZERO_TIME, (day == 0) & time_set)
+        flag(Violation.HOUR_ZERO_TIME, (hour == 0) & ((minute != 0) | (second != 0)))
+        flag(Violation.MINUTE_ZERO_SECOND, (minute == 0) & (second != 0))
+
+        violations[~batch.valid] = 0
+        return violations
+
+    def explain(self, batch: "ParsedBatch", rows: Iterable[int]) -> dict[int, list[str]]:
+        """Render validation messages for selected rows of a batch.
+
+        Args:
+            batch: Parsed batch from FilenameParser.parse_many.
+            rows: Indices of the rows to explain.
+
+        Returns:
+            Mapping of row index to its validation error messages. Rows that did
+            not parse are omitted.
+        """
+        messages = {}
+        for index in rows:
+            parsed = batch.row(index)
+            if parsed is not None:
+                messages[index] = self.validate(parsed)
+        return messages
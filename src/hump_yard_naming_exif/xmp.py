@@ -0,0 +1,146 @@
+"""Editing of existing XMP packets."""
+
+import re
+import xml.etree.ElementTree as ET
+from typing import Optional
+
+from .sidecar import BAG_PROPERTIES, XMP_NAMESPACES
+
+_RDF = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+_XML = "http://www.w3.org/XML/1998/namespace"
+_PACKET_HEADER = '<?xpacket begin="\ufeff" id="W5M0MpCehiHzreSzNTczkc9d"?>'
+_PACKET_TRAILER = '<?xpacket end="w"?>'
+_PACKET_END = re.compile(rb"<\?xpacket end=['\"]([rw])['\"]\?>")
+_XMLNS = re.compile(rb"xmlns:([A-Za-z_][\w.-]*)=['\"]([^'\"]*)['\"]")
+
+
+def _prefixes(declarations: list[tuple[str, str]]) -> dict[str, str]:
+    """Choose the prefix each namespace is serialized with.
+
+    The packet's own prefixes come first, then those of XMP_NAMESPACES for
+    the namespaces the packet does not declare, so added properties get
+    their usual prefix instead of one made up by ElementTree.
+
+    Args:
+        declarations: (prefix, URI) pairs declared in the packet.
+
+    Returns:
+        Mapping of namespace URI to prefix.
+    """
+    prefixes = {_XML: "xml"}
+    for prefix, uri in declarations:
+        prefixes.setdefault(uri, prefix)
+    used = set(prefixes.values())
+    for prefix, uri in XMP_NAMESPACES.items():
+        if uri not in prefixes and prefix not in used:
+            prefixes[uri] = prefix
+            used.add(prefix)
+    return prefixes
+
+
+def _serialize(root: ET.Element, prefixes: dict[str, str]) -> Optional[str]:
+    """Serialize an element tree with the given prefixes, declared on its root.
+
+    Names are rewritten as prefixed names in place, so ElementTree's
+    process-wide prefix registry is neither used nor changed.
+
+    Args:
+        root: Root element, with names in ``{uri}name`` form.
+        prefixes: Mapping of namespace URI to prefix.
+
+    Returns:
+        The XML, or None if a name is in a namespace without a prefix.
+    """
+    declared: dict[str, str] = {}
+
+    def qualify(name: str) -> str:
+        if name[:1] != "{":
+            return name
+        uri, local = name[1:].split("}", 1)
+        prefix = prefixes[uri]
+        if uri != _XML:
+            declared[prefix] = uri
+        return f"{prefix}:{local}"
+
+    try:
+        for element in root.iter():
+            element.tag = qualify(element.tag)
+            element.attrib = {qualify(name): value for name, value in element.attrib.items()}
+    except KeyError:  # a namespace declared without a prefix (xmlns="...")
+        return None
+
+    for prefix, uri in sorted(declared.items()):
+        root.set(f"xmlns:{prefix}", uri)
+    return ET.tostring(root, encoding="unicode")
+
+
+def update_xmp_packet(
+    packet: bytes, xmp_dict: dict[str, str], size: Optional[int] = None
+) -> Optional[bytes]:
+    """Set values in an XMP packet.
+
+    Values are stored in the first rdf:Description, as attributes for simple
+    properties (the form exiv2 uses) and as single-item rdf:Bag elements for
+    array properties; existing copies of the properties, as attributes or
+    elements of any rdf:Description, are removed.
+
+    Args:
+        packet: XMP packet, padding included.
+        xmp_dict: XMP values keyed by pyexiv2 key (``Xmp.<prefix>.<Name>``).
+        size: Exact size of the result, reached with whitespace padding.
+            None for no padding.
+
+    Returns:
+        Updated packet, or None if the packet cannot be parsed, is read-only,
+        uses an unknown prefix or a default namespace, or the update does not
+        fit in ``size`` bytes.
+    """
+    end = _PACKET_END.search(packet)
+    if end and end.group(1) == b"r":
+        return None
+
+    start = packet.find(b"<x:xmpmeta")
+    if start < 0:
+        start = packet.find(b"<rdf:RDF")
+    stop = packet.rfind(b"</x:xmpmeta>")
+    stop = stop + len(b"</x:xmpmeta>") if stop >= 0 else packet.rfind(b"</rdf:RDF>") + len(b"</rdf:RDF>")
+    if start < 0 or stop < start:
+        return None
+
+    declarations = [(prefix.decode(), uri.decode()) for prefix, uri in _XMLNS.findall(packet)]
+    namespaces = dict(declarations)
+    try:
+        root = ET.fromstring(packet[start:stop])
+    except ET.ParseError:
+        return None
+
+    descriptions = list(root.iter(f"{{{_RDF}}}Description"))
+    if not descriptions:
+        return None
+
+    for key, value in xmp_dict.items():
+        prefix, name = key.split(".", 2)[1:]
+        uri = namespaces.get(prefix) or XMP_NAMESPACES.get(prefix)
+        if uri is None:
+            return None
+        qualified = f"{{{uri}}}{name}"
+        for description in descriptions:
+            description.attrib.pop(qualified, None)
+            for element in description.findall(qualified):
+                description.remove(element)
+        if f"{prefix}:{name}" in BAG_PROPERTIES:
+            bag = ET.SubElement(ET.SubElement(descriptions[0], qualified), f"{{{_RDF}}}Bag")
+            ET.SubElement(bag, f"{{{_RDF}}}li").text = value
+        else:
+            descriptions[0].set(qualified, value)
+
+    xml = _serialize(root, _prefixes(declarations))
+    if xml is None:
+        return None
+    body = xml.encode("utf-8")
+    header, trailer = _PACKET_HEADER.encode("utf-8"), _PACKET_TRAILER.encode("utf-8")
+    padding = 0 if size is None else size - len(header) - len(body) - len(trailer) - 1
+    if padding < 0:
+        return None
+
+    return header + body + b"\n" + b" " * padding + trailer
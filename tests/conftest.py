@@ -1,9 +1,78 @@
 """Pytest configuration and fixtures."""
 
 import pytest
+import struct
 import sys
 from pathlib import Path
 
 # Add src directory to path for imports
 src_path = Path(__file__).parent.parent / 'src'
 sys.path.insert(0, str(src_path))
+
+
+def _jpeg_segment(marker, payload):
+    """Encode a JPEG marker segment."""
+    return b'\xff' + bytes([marker]) + struct.pack('>H', len(payload) + 2) + payload
+
+
+def jpeg_bytes(scan_size=64):
+    """Build a minimal JPEG: a 1x1 grayscale frame with scan_size bytes of scan data.
+
+    The scan data is not a decodable image, but the marker structure is valid,
+    which is all metadata writers look at.
+    """
+    return (
+        b'\xff\xd8'
+        + _jpeg_segment(0xE0, b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00')
+        + _jpeg_segment(0xDB, b'\x00' + bytes([1] * 64))
+        + _jpeg_segment(0xC0, b'\x08\x00\x01\x00\x01\x01\x01\x11\x00')
+        + _jpeg_segment(0xC4, b'\x00' + bytes([0, 1] + [0] * 14) + b'\x00')
+        + _jpeg_segment(0xDA, b'\x01\x01\x00\x00\x3f\x00')
+        + b'\x00' * scan_size
+        + b'\xff\xd9'
+    )
+
+
+def tiff_bytes(byte_order='<'):
+    """Build a minimal uncompressed 1x1 grayscale TIFF."""
+    entries = [
+        (256, 3, 1, 1),  # ImageWidth
+        (257, 3, 1, 1),  # ImageLength
+        (258, 3, 1, 8),  # BitsPerSample
+        (259, 3, 1, 1),  # Compression: none
+        (262, 3, 1, 1),  # PhotometricInterpretation: BlackIsZero
+        (273, 4, 1, 0),  # StripOffsets, patched below
+        (277, 3, 1, 1),  # SamplesPerPixel
+        (278, 3, 1, 1),  # RowsPerStrip
+        (279, 4, 1, 1),  # StripByteCounts
+    ]
+    ifd_size = 2 + 12 * len(entries) + 4
+    strip_offset = 8 + ifd_size
+    magic = b'II' if byte_order == '<' else b'MM'
+
+    data = magic + struct.pack(byte_order + 'HI', 42, 8)
+    data += struct.pack(byte_order + 'H', len(entries))
+    for tag, field_type, count, value in entries:
+        if tag == 273:
+            value = strip_offset
+        if field_type == 3:
+            data += struct.pack(byte_order + 'HHIHH', tag, field_type, count, value, 0)
+        else:
+            data += struct.pack(byte_order + 'HHII', tag, field_type, count, value)
+    data += struct.pack(byte_order + 'I', 0)
+    return data + b'\x80'
+
+
+@pytest.fixture
+def make_image(tmp_path):
+    """Create an image file with a given name in a temporary watch folder."""
+    def make(name, directory=None):
+        folder = tmp_path if directory is None else tmp_path / directory
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / name
+        if path.suffix.lower() in ('.tif', '.tiff'):
+            path.write_bytes(tiff_bytes())
+        else:
+            path.write_bytes(jpeg_bytes())
+        return path
+    return make
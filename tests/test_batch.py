@@ -0,0 +1,215 @@
+"""Unit tests for columnar batch parsing."""
+
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from hump_yard_naming_exif.parser import FilenameParser
+from hump_yard_naming_exif.validator import FilenameValidator, Violation
+
+
+# Names at the edges of the grammar: empty fields, trailing newlines, non-ASCII digits, huge runs
+EDGE_CASES = [
+    '',
+    '.',
+    '..........',
+    '...........tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.tiff\n',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.tiff\n\n',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.\n',
+    '1950.06.15.12.30.45.E.FAM.POR.000001..tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.A..tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.tiff.',
+    '1950.06.15.12.30.45.E.FAM..000001.tiff',
+    '1950.06.15.12.30.45.EE.FAM.POR.000001.tiff',
+    '1950.06.15.12.30.45.1.FAM.POR.000001.tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.00000a.tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.ti3f',
+    '1950.06.15.12.30.45.E.F M.P\nR.000001.tiff',
+    '-1950.06.15.12.30.45.E.FAM.POR.000001.tiff',
+    '+1950.06.15.12.30.45.E.FAM.POR.000001.tiff',
+    '1_950.06.15.12.30.45.E.FAM.POR.000001.tiff',
+    ' 1950.06.15.12.30.45.E.FAM.POR.000001.tiff',
+    '\u0661\u0669\u0665\u0660.06.15.12.30.45.E.FAM.POR.000001.tiff',
+    '1950².06.15.12.30.45.E.FAM.POR.000001.tiff',
+    '1950.06.15.12.30.45.\u0131.FAM.POR.000001.tiff',
+    '1950.06.15.12.30.45.\u212a.FAM.POR.000001.tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.t\u0130ff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001.tiffé',
+    '9' * 5000 + '.06.15.12.30.45.E.FAM.POR.000001.tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001' + '.A' * 5000 + '.tiff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001' + '.A' * 5000 + '.t1ff',
+    '1950.06.15.12.30.45.E.FAM.POR.000001' + '.1' * 5000,
+    '1950.06.15.12.30.45.E.FAM.POR.' + '1' * 5000,
+    '.' * 5000,
+]
+
+
+def mutated_names(count, seed=1950):
+    """Generate filenames by randomly editing a valid name."""
+    rng = random.Random(seed)
+    alphabet = list('0123456789.....aEzZ_- \n') + list('\u0130\u0131\u017f\u212a\u0661\u00b2')
+    base = '1950.06.15.12.30.45.E.FAM.POR.000001.A.RAW.tiff'
+    for _ in range(count):
+        chars = list(base)
+        for _ in range(rng.randint(0, 4)):
+            position = rng.randrange(len(chars))
+            action = rng.randint(0, 2)
+            if action == 0:
+                del chars[position]
+            elif action == 1:
+                chars.insert(position, rng.choice(alphabet))
+            else:
+                chars[position] = rng.choice(alphabet)
+        yield ''.join(chars)
+
+
+class TestParsedBatch:
+    """Test cases for FilenameParser.parse_many and ParsedBatch."""
+
+    @pytest.fixture
+    def parser(self):
+        """Create parser instance."""
+        return FilenameParser()
+
+    def test_columns(self, parser):
+        """Test that fields land in typed columns."""
+        batch = parser.parse_many([
+            '1950.06.15.12.30.45.e.FAM.POR.000001.TIFF',
+            'invalid.jpg',
+        ])
+
+        assert len(batch) == 2
+        assert batch.valid.tolist() == [True, False]
+        assert batch.year.dtype == np.int64
+        assert batch.modifier.dtype == np.uint8
+        assert batch.year[0] == 1950
+        assert batch.second[0] == 45
+        assert chr(batch.modifier[0]) == 'E'
+        assert batch.group[0] == 'FAM'
+        assert batch.subgroup[0] == 'POR'
+        assert batch.extension[0] == 'tiff'
+        assert batch.group[1] is None
+
+    def test_row(self, parser):
+        """Test that rows rebuild ParsedFilename objects on request."""
+        name = '1950.06.15.12.30.45.E.FAM.POR.000001.tiff'
+        batch = parser.parse_many([name, 'invalid.jpg'])
+
+        assert batch.row(0) == parser.parse(name)
+        assert batch.row(0).sequence == '000001'
+        assert batch.row(1) is None
+
+    def test_group_strings_are_shared(self, parser):
+        """Test that repeated group and subgroup codes reference one string object."""
+        batch = parser.parse_many([
+            f'1950.06.15.12.30.45.E.FAM.POR.{number:06d}.tiff' for number in range(3)
+        ])
+
+        assert batch.group[0] is batch.group[1] is batch.group[2]
+        assert batch.subgroup[0] is batch.subgroup[2]
+
+    def test_empty(self, parser):
+        """Test parsing an empty batch."""
+        batch = parser.parse_many([])
+        assert len(batch) == 0
+        assert list(batch.rows()) == []
+
+    def test_accepts_generator(self, parser):
+        """Test that names may come from a generator."""
+        batch = parser.parse_many(name for name in ['invalid.jpg'] * 3)
+        assert len(batch) == 3
+        assert not batch.valid.any()
+
+    @pytest.mark.parametrize('filename', [
+        '1950.06.15.12.30.45.E.FAM.POR.' + '1' * 30 + '.tiff',
+        '1950.06.15.12.30.45.E.FAM.POR.\u0661\u0662.tiff',
+        '1950.06.15.12.30.45.\u212a.FAM.POR.000001.tiff',
+        '9' * 30 + '.06.15.12.30.45.E.FAM.POR.000001.tiff',
+    ])
+    def test_overflow_rows(self, parser, filename):
+        """Test rows that do not fit the typed columns."""
+        batch = parser.parse_many([filename])
+        assert 0 in batch.overflow
+        assert batch.row(0) == parser.parse(filename)
+
+    def test_agrees_with_parse(self, parser):
+        """Test that every row agrees exactly with parse()."""
+        names = EDGE_CASES + list(mutated_names(20000))
+        batch = parser.parse_many(names)
+
+        assert list(batch.rows()) == [parser.parse(name) for name in names]
+
+
+class TestBatchValidator:
+    """Test cases for FilenameValidator.validate_many and explain."""
+
+    @pytest.fixture
+    def parser(self):
+        """Create parser instance."""
+        return FilenameParser()
+
+    @pytest.fixture
+    def validator(self):
+        """Create validator instance."""
+        return FilenameValidator()
+
+    @pytest.mark.parametrize('filename, expected', [
+        ('1950.06.15.12.30.45.E.FAM.POR.000001.tiff', Violation(0)),
+        ('1950.13.15.00.00.00.E.FAM.POR.000001.tiff', Violation.DAY_RANGE | Violation.MONTH_RANGE),
+        ('1950.02.30.00.00.00.E.FAM.POR.000002.tiff', Violation.DAY_RANGE),
+        ('1950.00.32.00.00.00.C.FAM.POR.000003.tiff', Violation.DAY_RANGE | Violation.MONTH_ZERO_DAY),
+        ('1950.06.15.25.00.00.E.FAM.POR.000004.tiff', Violation.HOUR_RANGE),
+        ('1950.06.15.12.61.00.E.FAM.POR.000005.tiff', Violation.MINUTE_RANGE),
+        ('1950.06.15.12.30.61.E.FAM.POR.000006.tiff', Violation.SECOND_RANGE),
+        ('1950.06.15.12.30.00.X.FAM.POR.000007.tiff', Violation.MODIFIER),
+        ('1950.00.00.12.00.00.C.FAM.POR.000008.tiff', Violation.MONTH_ZERO_TIME | Violation.DAY_ZERO_TIME),
+        ('1950.06.15.00.30.00.E.FAM.POR.000009.tiff', Violation.HOUR_ZERO_TIME),
+        ('1950.06.15.12.00.30.E.FAM.POR.000010.tiff', Violation.MINUTE_ZERO_SECOND),
+    ])
+    def test_rule_flags(self, parser, validator, filename, expected):
+        """Test that each rule sets its own flag."""
+        violations = validator.validate_many(parser.parse_many([filename]))
+        assert Violation(int(violations[0])) == expected
+
+    def test_unparsed_rows_have_no_flags(self, parser, validator):
+        """Test that rows that did not parse report no violations."""
+        batch = parser.parse_many(['invalid.jpg'])
+        assert validator.validate_many(batch).tolist() == [0]
+
+    def test_overflow_values(self, parser, validator):
+        """Test that values clipped to int64 still fail their range checks."""
+        batch = parser.parse_many(['1950.06.15.12.' + '9' * 30 + '.00.E.FAM.POR.000001.tiff'])
+        violations = Violation(int(validator.validate_many(batch)[0]))
+        assert Violation.MINUTE_RANGE in violations
+
+    def test_explain(self, parser, validator):
+        """Test that explain renders messages only for the requested rows."""
+        batch = parser.parse_many([
+            '1950.13.15.00.00.00.E.FAM.POR.000001.tiff',
+            '1950.06.15.25.00.00.E.FAM.POR.000002.tiff',
+            'invalid.jpg',
+        ])
+        messages = validator.explain(batch, [1, 2])
+
+        assert list(messages) == [1]
+        assert any('hour' in message.lower() for message in messages[1])
+
+    def test_agrees_with_check(self, parser, validator):
+        """Test that every row reports exactly the rules check() reports."""
+        names = [
+            f'1950.{month:02d}.{day:02d}.{hour:02d}.{minute:02d}.{second:02d}.{modifier}.FAM.POR.000001.tiff'
+            for month in (0, 2, 12, 13)
+            for day in (0, 29, 30, 32)
+            for hour in (0, 23, 24)
+            for minute in (0, 60)
+            for second in (0, 60)
+            for modifier in 'EX'
+        ]
+        violations = validator.validate_many(parser.parse_many(names))
+
+        for name, flags in zip(names, violations):
+            assert int(flags) == validator.check(parser.parse(name)), name
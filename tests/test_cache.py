@@ -0,0 +1,95 @@
+"""Unit tests for the LRU cache."""
+
+import pytest
+from hump_yard_naming_exif.cache import LRUCache
+
+
+class TestLRUCache:
+    """Test cases for LRUCache."""
+
+    def test_miss_then_hit(self):
+        """Test that a value is computed once and then served from the cache."""
+        cache = LRUCache(2)
+        calls = []
+
+        def factory(key):
+            calls.append(key)
+            return key.upper()
+
+        assert cache.get_or_set('a', factory) == 'A'
+        assert cache.get_or_set('a', factory) == 'A'
+        assert calls == ['a']
+        assert cache.hits == 1
+        assert cache.misses == 1
+
+    def test_none_values_are_cached(self):
+        """Test that None results are cached like any other value."""
+        cache = LRUCache(2)
+        calls = []
+
+        def factory(key):
+            calls.append(key)
+            return None
+
+        assert cache.get_or_set('a', factory) is None
+        assert cache.get_or_set('a', factory) is None
+        assert calls == ['a']
+
+    def test_evicts_least_recently_used(self):
+        """Test that the least recently used entry is evicted over capacity."""
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get_or_set('a', lambda key: 0)
+        cache.put('c', 3)
+
+        assert 'a' in cache
+        assert 'b' not in cache
+        assert 'c' in cache
+        assert len(cache) == 2
+        assert cache.evictions == 1
+
+    def test_zero_capacity_disables_cache(self):
+        """Test that capacity 0 never stores values."""
+        cache = LRUCache(0)
+        cache.get_or_set('a', lambda key: 1)
+        cache.get_or_set('a', lambda key: 1)
+
+        assert len(cache) == 0
+        assert cache.misses == 2
+        assert cache.evictions == 0
+
+    def test_negative_capacity(self):
+        """Test that a negative capacity is rejected."""
+        with pytest.raises(ValueError):
+            LRUCache(-1)
+
+    def test_clear(self):
+        """Test that clear removes entries but keeps counters."""
+        cache = LRUCache(2)
+        cache.get_or_set('a', lambda key: 1)
+        cache.clear()
+
+        assert len(cache) == 0
+        assert cache.misses == 1
+
+    def test_get(self):
+        """Test that get returns cached values or the default and counts them."""
+        cache = LRUCache(2)
+        cache.put('a', 1)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('b', 0) == 0
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_discard(self):
+        """Test that discard removes one entry and ignores missing keys."""
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.discard('a')
+        cache.discard('c')
+
+        assert 'a' not in cache
+        assert 'b' in cache
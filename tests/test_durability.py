@@ -0,0 +1,197 @@
+"""Unit tests for the durability policy."""
+
+import asyncio
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from hump_yard_naming_exif.durability import SyncPolicy
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+
+
+@pytest.fixture
+def synced(monkeypatch):
+    """Record fsyncs instead of doing them."""
+    calls = {'files': [], 'directories': []}
+    monkeypatch.setattr('hump_yard_naming_exif.durability.fsync_file', calls['files'].append)
+    monkeypatch.setattr('hump_yard_naming_exif.durability.fsync_directory', calls['directories'].append)
+    return calls
+
+
+def write_and_move(policy, count, folders=('a', 'b')):
+    """Report count written and moved files per folder to a policy."""
+    for folder in folders:
+        for number in range(count):
+            policy.written(Path('watch') / f'{folder}{number}.jpg')
+            policy.moved(Path('processed') / folder / f'{folder}{number}.jpg')
+
+
+class TestSyncPolicy:
+    """Test cases for SyncPolicy."""
+
+    def test_none(self, synced):
+        """Test that nothing is flushed."""
+        policy = SyncPolicy('none')
+        write_and_move(policy, 5)
+        policy.flush()
+
+        assert synced == {'files': [], 'directories': []}
+
+    def test_per_file(self, synced):
+        """Test that every file and every move is flushed at once."""
+        policy = SyncPolicy('per-file')
+        write_and_move(policy, 3)
+
+        assert len(synced['files']) == 6
+        assert synced['directories'] == [Path('processed/a')] * 3 + [Path('processed/b')] * 3
+
+    def test_per_directory_batch(self, synced):
+        """Test that each folder is flushed once per batch of moves into it."""
+        policy = SyncPolicy('per-directory-batch', batch_size=4)
+        write_and_move(policy, 10)
+
+        assert len(synced['files']) == 20
+        assert synced['directories'] == [Path('processed/a')] * 2 + [Path('processed/b')] * 2
+
+        policy.flush()
+        assert sorted(synced['directories'][4:]) == [Path('processed/a'), Path('processed/b')]
+        assert policy.directories_synced == 6
+
+    def test_per_directory_batch_after_interval(self, synced):
+        """Test that a partial batch is flushed once the interval passes."""
+        policy = SyncPolicy('per-directory-batch', batch_size=64, interval_ms=20)
+        write_and_move(policy, 3)
+
+        deadline = time.monotonic() + 5
+        while len(synced['directories']) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert sorted(synced['directories']) == [Path('processed/a'), Path('processed/b')]
+        assert policy.directories_synced == 2
+
+    def test_group_commit(self, synced):
+        """Test that moved files and their folders are flushed together once the interval passes."""
+        policy = SyncPolicy('group-commit', interval_ms=20)
+        write_and_move(policy, 5)
+
+        assert synced == {'files': [], 'directories': []}
+        deadline = time.monotonic() + 5
+        while not synced['directories'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert len(synced['files']) == 10
+        assert sorted(synced['directories']) == [Path('processed/a'), Path('processed/b')]
+
+    @pytest.mark.parametrize('level, files, directories', [
+        ('none', 0, 0), ('per-file', 0, 1), ('per-directory-batch', 0, 1), ('group-commit', 1, 1),
+    ])
+    def test_copied(self, synced, level, files, directories):
+        """Test that a copy whose source is removed next is flushed at once, unless the level is none."""
+        policy = SyncPolicy(level, batch_size=4, interval_ms=60_000)
+        policy.moved(Path('processed/a/a0.jpg'), copied=True)
+
+        assert synced['files'] == [Path('processed/a/a0.jpg')] * files
+        assert synced['directories'] == [Path('processed/a')] * directories
+        policy.flush()
+        assert synced['directories'] == [Path('processed/a')] * directories
+
+    @pytest.mark.parametrize('settings', [
+        {'level': 'always'},
+        {'level': 'per-directory-batch', 'batch_size': 0},
+        {'level': 'group-commit', 'interval_ms': 0},
+    ])
+    def test_invalid(self, settings):
+        """Test that unknown levels and non-positive sizes are rejected."""
+        with pytest.raises(ValueError):
+            SyncPolicy(**settings)
+
+
+class TestDurabilityProcessing:
+    """Test cases for PhotoNamingExifPlugin with the durability setting."""
+
+    NAMES = [f'1950.06.15.12.00.00.E.FAM.POR.{number:06d}.jpg' for number in range(1, 6)]
+
+    def test_per_file(self, make_image, tmp_path, synced):
+        """Test that the written file and the processed folder are flushed."""
+        plugin = PhotoNamingExifPlugin()
+        path = make_image(self.NAMES[0])
+
+        assert plugin.process(str(path), {'durability': 'per-file'}) is True
+
+        assert synced == {'files': [path], 'directories': [tmp_path / 'processed']}
+
+    def test_batch_flushed_at_end(self, make_image, tmp_path, synced):
+        """Test that process_batch flushes the folder of a partial batch when it finishes."""
+        plugin = PhotoNamingExifPlugin()
+        paths = [str(make_image(name)) for name in self.NAMES]
+        config = {'metadata_mode': 'sidecar', 'durability': 'per-directory-batch', 'durability_batch': 4}
+
+        assert all(success for _, success in plugin.process_batch(paths, config))
+
+        # 10 moves (images and sidecars): two full batches, then the rest on flush
+        assert len(synced['files']) == 5
+        assert synced['directories'] == [tmp_path / 'processed'] * 3
+
+    @pytest.mark.parametrize('durability, files', [('none', 0), ('per-file', 1), ('group-commit', 1)])
+    def test_write_to_processed(self, make_image, tmp_path, synced, monkeypatch, durability, files):
+        """Test that a copy written straight into processed/ is flushed as the setting says."""
+        plugin = PhotoNamingExifPlugin()
+        monkeypatch.setattr(plugin, '_crosses_device', lambda source_dir, target_dir: True)
+        monkeypatch.setattr('os.fsync', pytest.fail)
+        path = make_image(self.NAMES[0])
+
+        assert plugin.process(str(path), {'write_to_processed': True, 'durability': durability}) is True
+
+        assert not path.exists()
+        assert len(synced['files']) == files
+        assert synced['directories'] == [tmp_path / 'processed'] * files
+
+    @pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='needs fork')
+    def test_process_executor(self, make_image, tmp_path, monkeypatch):
+        """Test that each worker process flushes its partial batch when it exits."""
+        log = tmp_path.parent / f'{tmp_path.name}-fsyncs'
+
+        def record(path):
+            with open(log, 'a') as fsyncs:
+                fsyncs.write(f'{path}\n')
+
+        # Patched before the workers fork, so they inherit it
+        monkeypatch.setattr('hump_yard_naming_exif.durability.fsync_directory', record)
+        paths = [str(make_image(name)) for name in self.NAMES]
+        config = {'durability': 'per-directory-batch', 'durability_interval_ms': 60_000}
+
+        results = dict(PhotoNamingExifPlugin().process_batch(paths, config, workers=2, executor='process'))
+
+        assert all(results.values())
+        # One flush per worker that moved a file
+        assert set(log.read_text().splitlines()) == {str(tmp_path / 'processed')}
+
+    def test_close(self, make_image, tmp_path, synced):
+        """Test that close flushes a partial batch, closes the journal and stops the async threads."""
+        plugin = PhotoNamingExifPlugin()
+        path = make_image(self.NAMES[0])
+        config = {
+            'durability': 'per-directory-batch', 'durability_interval_ms': 60_000,
+            'journal': str(tmp_path.parent / f'{tmp_path.name}-journal.sqlite'),
+        }
+
+        assert asyncio.run(plugin.aprocess(str(path), config)) is True
+        journal = plugin._journal
+        plugin.close()
+
+        assert synced['directories'] == [tmp_path / 'processed']
+        assert not journal._closer.alive
+        assert plugin._journal is None and plugin._async_executor is None
+
+    def test_invalid_durability(self, make_image, caplog):
+        """Test that an invalid setting fails before the file is written."""
+        plugin = PhotoNamingExifPlugin()
+        path = make_image(self.NAMES[0])
+        before = path.read_bytes()
+
+        assert plugin.process(str(path), {'durability': 'always'}) is False
+
+        assert path.read_bytes() == before
+        assert 'Unknown durability' in caplog.text
@@ -0,0 +1,289 @@
+"""Unit tests for the file I/O helpers."""
+
+import ctypes
+import errno
+import hashlib
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from hump_yard_naming_exif import fileio
+from hump_yard_naming_exif.fileio import copy_stream, move_file, rename_noreplace
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+
+DATA = os.urandom(300_000)
+
+
+@pytest.fixture(autouse=True)
+def forget_rename_fallbacks():
+    """Start every test without remembered rename fallbacks."""
+    fileio._rename_fallbacks.clear()
+    yield
+    fileio._rename_fallbacks.clear()
+
+
+@pytest.fixture
+def cross_device(monkeypatch):
+    """Make renames fail as if source and target were on different filesystems."""
+    rename = fileio.rename_noreplace
+
+    def fake_rename(source, target):
+        if not str(source).endswith('.tmp'):
+            raise OSError(errno.EXDEV, 'Invalid cross-device link')
+        rename(source, target)
+
+    monkeypatch.setattr(fileio, 'rename_noreplace', fake_rename)
+
+
+class TestMoveFile:
+    """Test cases for move_file."""
+
+    @pytest.fixture
+    def source(self, tmp_path):
+        """Create the file to move."""
+        path = tmp_path / 'photo.jpg'
+        path.write_bytes(DATA)
+        path.chmod(0o640)
+        os.utime(path, (1_000_000_000, 1_000_000_000))
+        (tmp_path / 'processed').mkdir()
+        return path
+
+    def test_rename(self, source, tmp_path):
+        """Test that a file on the same filesystem is renamed."""
+        target = tmp_path / 'processed' / source.name
+
+        assert move_file(source, target, 'sha256') == ('rename', None)
+
+        assert not source.exists()
+        assert target.read_bytes() == DATA
+
+    @pytest.mark.parametrize('strategy', fileio.COPY_STRATEGIES)
+    def test_copy_strategies(self, source, tmp_path, cross_device, strategy):
+        """Test that each strategy copies the data, mode and times, then removes the source."""
+        target = tmp_path / 'processed' / source.name
+
+        assert move_file(source, target, strategies=(strategy,)) == (strategy, None)
+
+        assert not source.exists()
+        assert target.read_bytes() == DATA
+        assert target.stat().st_mode & 0o777 == 0o640
+        assert target.stat().st_mtime == 1_000_000_000
+        assert [entry.name for entry in target.parent.iterdir()] == [source.name]
+
+    def test_checksum(self, source, tmp_path, cross_device):
+        """Test that a checksum is computed in the copying pass."""
+        target = tmp_path / 'processed' / source.name
+
+        assert move_file(source, target, 'sha256') == ('chunked', hashlib.sha256(DATA).hexdigest())
+        assert target.read_bytes() == DATA
+
+    def test_unsupported_strategy_falls_back(self, source, tmp_path, cross_device, monkeypatch):
+        """Test that a kernel copy the filesystems do not support is skipped."""
+        def unsupported(*args):
+            raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+        monkeypatch.setattr(os, 'copy_file_range', unsupported, raising=False)
+        target = tmp_path / 'processed' / source.name
+
+        assert move_file(source, target) == ('sendfile', None)
+        assert target.read_bytes() == DATA
+
+    def test_empty_kernel_copy_falls_back(self, source, tmp_path, cross_device, monkeypatch):
+        """Test that a kernel copy that copies nothing at the start is treated as unsupported."""
+        monkeypatch.setattr(os, 'copy_file_range', lambda *args: 0, raising=False)
+        target = tmp_path / 'processed' / source.name
+
+        assert move_file(source, target) == ('sendfile', None)
+
+        assert not source.exists()
+        assert target.read_bytes() == DATA
+
+    def test_short_copy_keeps_source(self, source, tmp_path, cross_device, monkeypatch):
+        """Test that a copy shorter than the source leaves the source and no partial target."""
+        def short(source_fd, target_fd, count):
+            return os.write(target_fd, DATA[:10]) if os.lseek(target_fd, 0, os.SEEK_CUR) == 0 else 0
+
+        monkeypatch.setattr(os, 'copy_file_range', short, raising=False)
+
+        with pytest.raises(OSError, match='Copied 10 of'):
+            move_file(source, tmp_path / 'processed' / source.name, strategies=('copy_file_range',))
+
+        assert source.read_bytes() == DATA
+        assert list((tmp_path / 'processed').iterdir()) == []
+
+    def test_failed_copy_keeps_source(self, source, tmp_path, cross_device, monkeypatch):
+        """Test that an error during the copy leaves the source and no partial target."""
+        def fail(*args):
+            raise OSError(errno.EIO, 'Input/output error')
+
+        monkeypatch.setattr(fileio, 'copy_file', fail)
+
+        with pytest.raises(OSError):
+            move_file(source, tmp_path / 'processed' / source.name)
+
+        assert source.read_bytes() == DATA
+        assert list((tmp_path / 'processed').iterdir()) == []
+
+
+class TestRenameNoreplace:
+    """Test cases for rename_noreplace."""
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        """Create a source and an existing target."""
+        source, target = tmp_path / 'source', tmp_path / 'target'
+        source.write_bytes(b'new')
+        target.write_bytes(b'old')
+        return source, target
+
+    @pytest.fixture(params=['renameat2', 'link', 'rename'])
+    def method(self, request, monkeypatch):
+        """Force each of the ways to rename."""
+        if request.param != 'renameat2':
+            monkeypatch.setattr(fileio, '_load_renameat2', lambda: None)
+        if request.param == 'rename':
+            def no_links(*args):
+                raise OSError(errno.EPERM, 'Operation not permitted')
+
+            monkeypatch.setattr(os, 'link', no_links)
+        return request.param
+
+    def test_renames(self, files, tmp_path, method):
+        """Test that a file is renamed to a free name."""
+        source, _ = files
+        free = tmp_path / 'free'
+
+        rename_noreplace(source, free)
+
+        assert not source.exists()
+        assert free.read_bytes() == b'new'
+
+    def test_existing_target(self, files, method):
+        """Test that an existing target is kept and the source left in place."""
+        source, target = files
+
+        with pytest.raises(FileExistsError):
+            rename_noreplace(source, target)
+
+        assert source.read_bytes() == b'new'
+        assert target.read_bytes() == b'old'
+
+    def test_missing_source(self, tmp_path, method):
+        """Test that a missing source raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            rename_noreplace(tmp_path / 'missing', tmp_path / 'target')
+
+    def test_unsupported_filesystem_remembered(self, files, tmp_path, monkeypatch):
+        """Test that renameat2 is not tried again in a directory where it failed."""
+        calls = []
+
+        def unsupported(*args):
+            calls.append(args)
+            ctypes.set_errno(errno.EINVAL)
+            return -1
+
+        monkeypatch.setattr(fileio, '_load_renameat2', lambda: unsupported)
+        source, _ = files
+
+        rename_noreplace(source, tmp_path / 'first')
+        rename_noreplace(tmp_path / 'first', tmp_path / 'second')
+
+        assert len(calls) == 1
+        assert (tmp_path / 'second').read_bytes() == b'new'
+
+
+class TestCopyStream:
+    """Test cases for copy_stream."""
+
+    def test_kernel_copy_keeps_target_position(self, tmp_path):
+        """Test that writes after a kernel copy land after the copied bytes."""
+        source_path = tmp_path / 'source'
+        source_path.write_bytes(DATA)
+
+        with open(source_path, 'rb', buffering=0) as source, open(tmp_path / 'target', 'wb') as target:
+            target.write(b'head')
+            source.seek(10)
+            assert copy_stream(source, target) == len(DATA) - 10
+            target.write(b'tail')
+
+        assert (tmp_path / 'target').read_bytes() == b'head' + DATA[10:] + b'tail'
+
+    def test_in_memory_files(self):
+        """Test that files without a descriptor are copied through the buffer."""
+        target = io.BytesIO()
+        digest = hashlib.md5()
+
+        assert copy_stream(io.BytesIO(DATA), target, chunk_size=1000, digest=digest) == len(DATA)
+
+        assert target.getvalue() == DATA
+        assert digest.digest() == hashlib.md5(DATA).digest()
+
+
+class TestMoveToProcessed:
+    """Test cases for PhotoNamingExifPlugin moving files to processed/."""
+
+    NAME = '1950.06.15.12.00.00.E.FAM.POR.000001.jpg'
+
+    def test_creates_processed_dir_once(self, make_image, tmp_path, monkeypatch):
+        """Test that processed/ is created for the first file only."""
+        plugin = PhotoNamingExifPlugin()
+        paths = [make_image(self.NAME.replace('000001', f'{number:06d}')) for number in range(3)]
+        mkdirs = []
+        mkdir = Path.mkdir
+
+        def counting_mkdir(self, *args, **kwargs):
+            mkdirs.append(self)
+            mkdir(self, *args, **kwargs)
+
+        monkeypatch.setattr(Path, 'mkdir', counting_mkdir)
+
+        for path in paths:
+            assert plugin._move_to_processed(path) is True
+
+        assert mkdirs == [tmp_path / 'processed']
+        assert len(list((tmp_path / 'processed').iterdir())) == 3
+
+    def test_recreates_removed_processed_dir(self, make_image, tmp_path):
+        """Test that a processed/ removed after it was cached is created again."""
+        plugin = PhotoNamingExifPlugin()
+        assert plugin._move_to_processed(make_image(self.NAME)) is True
+        (tmp_path / 'processed' / self.NAME).unlink()
+        (tmp_path / 'processed').rmdir()
+
+        assert plugin._move_to_processed(make_image(self.NAME)) is True
+        assert (tmp_path / 'processed' / self.NAME).exists()
+
+    def test_missing_source(self, tmp_path, caplog):
+        """Test that a file that disappeared fails to move."""
+        plugin = PhotoNamingExifPlugin()
+
+        assert plugin._move_to_processed(tmp_path / self.NAME) is False
+        assert 'Failed to move file' in caplog.text
+
+    def test_sidecar_stays_with_image(self, make_image, tmp_path):
+        """Test that the sidecar is moved back when the image cannot be moved."""
+        path = make_image(self.NAME)
+        sidecar = tmp_path / f'{self.NAME}.xmp'
+        sidecar.write_bytes(b'sidecar')
+        make_image(self.NAME, 'processed').write_bytes(b'older')
+
+        assert PhotoNamingExifPlugin()._move_to_processed(path, {'metadata_mode': 'sidecar'}) is False
+
+        assert path.exists()
+        assert sidecar.read_bytes() == b'sidecar'
+        assert [entry.name for entry in (tmp_path / 'processed').iterdir()] == [self.NAME]
+
+    def test_checksum_logged(self, make_image, tmp_path, cross_device, caplog):
+        """Test that move_checksum logs the checksum of the copied file."""
+        name = self.NAME
+        path = make_image(name)
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+
+        with caplog.at_level('DEBUG'):
+            assert PhotoNamingExifPlugin()._move_to_processed(path, {'move_checksum': 'sha256'}) is True
+
+        assert (tmp_path / 'processed' / name).exists()
+        assert 'across filesystems with chunked' in caplog.text
+        assert f'(sha256 {digest})' in caplog.text
@@ -0,0 +1,155 @@
+"""Unit tests for crash-isolated metadata writes."""
+
+import multiprocessing
+import os
+import time
+
+import pyexiv2
+import pytest
+
+from hump_yard_naming_exif import isolation
+from hump_yard_naming_exif.isolation import IsolatedWriter, IsolatedWriterPool, WriteStatus
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+
+needs_fork = pytest.mark.skipif(
+    'fork' not in multiprocessing.get_all_start_methods(), reason='needs fork'
+)
+
+EXIF = {'Exif.Image.DateTimeOriginal': '1950:06:15 12:00:00'}
+XMP = {'Xmp.dc.identifier': 'test'}
+
+
+@pytest.fixture
+def faulty_write_file(monkeypatch):
+    """Make forked writers crash on files named *crash* and hang on files named *hang*."""
+    original = isolation._write_file
+
+    def write_file(file_path, exif_dict, xmp_dict):
+        name = os.path.basename(file_path)
+        if 'crash' in name:
+            os._exit(11)
+        if 'hang' in name:
+            time.sleep(60)
+        original(file_path, exif_dict, xmp_dict)
+
+    monkeypatch.setattr(isolation, '_write_file', write_file)
+
+
+class TestIsolatedWriter:
+    """Test cases for IsolatedWriter."""
+
+    @pytest.fixture
+    def writer(self):
+        """Create a writer and stop it after the test."""
+        writer = IsolatedWriter(context='fork' if 'fork' in multiprocessing.get_all_start_methods() else None)
+        yield writer
+        writer.close()
+
+    def test_write(self, writer, make_image):
+        """Test that values are written by the child process."""
+        path = make_image('1950.06.15.12.00.00.E.FAM.POR.000001.jpg')
+
+        assert writer.write(str(path), EXIF, XMP) == (WriteStatus.OK, None)
+        with pyexiv2.Image(str(path)) as img:
+            assert img.read_exif()['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+
+    def test_write_error(self, writer, tmp_path):
+        """Test that a pyexiv2 error is reported without restarting the child."""
+        path = tmp_path / 'broken.jpg'
+        path.write_bytes(b'not an image')
+
+        writer.write(str(path), EXIF, XMP)
+        pid = writer.pid
+        status, error = writer.write(str(path), EXIF, XMP)
+
+        assert status is WriteStatus.FAILED
+        assert error
+        assert writer.pid == pid
+        assert writer.restarts == 0
+
+    @needs_fork
+    def test_crash_restarts_child(self, writer, make_image, faulty_write_file):
+        """Test that a crashed child is reported and replaced."""
+        crash = make_image('crash.jpg')
+        good = make_image('good.jpg')
+
+        status, error = writer.write(str(crash), EXIF, XMP)
+        assert status is WriteStatus.CRASHED
+        assert '11' in error
+
+        assert writer.write(str(good), EXIF, XMP) == (WriteStatus.OK, None)
+        assert writer.restarts == 1
+
+    @needs_fork
+    def test_hang_times_out(self, writer, make_image, faulty_write_file):
+        """Test that a hung child is killed after the timeout and replaced."""
+        hang = make_image('hang.jpg')
+        good = make_image('good.jpg')
+
+        start = time.monotonic()
+        status, _ = writer.write(str(hang), EXIF, XMP, timeout=0.5)
+        assert status is WriteStatus.TIMED_OUT
+        assert time.monotonic() - start < 10
+
+        assert writer.write(str(good), EXIF, XMP) == (WriteStatus.OK, None)
+        assert writer.restarts == 1
+
+    def test_pool_reuses_idle_writers(self, make_image):
+        """Test that sequential writes share one writer process."""
+        pool = IsolatedWriterPool()
+        try:
+            for number in range(3):
+                path = make_image(f'1950.06.15.12.00.00.E.FAM.POR.00000{number}.jpg')
+                assert pool.write(str(path), EXIF, XMP)[0] is WriteStatus.OK
+            assert len(pool._all) == 1
+            assert pool.restarts == 0
+        finally:
+            pool.close()
+
+
+class TestIsolatedProcessing:
+    """Test cases for PhotoNamingExifPlugin with isolate_writes."""
+
+    CONFIG = {'isolate_writes': True, 'write_timeout': 0.5}
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance and stop its writers after the test."""
+        plugin = PhotoNamingExifPlugin()
+        yield plugin
+        plugin.writers.close()
+
+    def test_process(self, plugin, make_image, tmp_path):
+        """Test that isolated writes process files normally."""
+        path = make_image('1950.06.15.12.00.00.E.FAM.POR.000001.jpg')
+
+        assert plugin.process(str(path), self.CONFIG) is True
+        assert (tmp_path / 'processed' / path.name).exists()
+
+    def test_write_error_is_not_quarantined(self, plugin, tmp_path):
+        """Test that an ordinary write error leaves the file in place."""
+        path = tmp_path / '1950.06.15.12.00.00.E.FAM.POR.000001.jpg'
+        path.write_bytes(b'not an image')
+
+        assert plugin.process(str(path), self.CONFIG) is False
+        assert path.exists()
+
+    @needs_fork
+    @pytest.mark.parametrize('group', ['crash', 'hang'])
+    def test_fault_is_quarantined(self, make_image, tmp_path, faulty_write_file, group):
+        """Test that a file that crashes or hangs the writer is quarantined."""
+        plugin = PhotoNamingExifPlugin()
+        plugin.writers = IsolatedWriterPool(context='fork')
+        path = make_image(f'1950.06.15.12.00.00.E.{group}.POR.000001.jpg')
+        good = make_image('1950.06.15.12.00.00.E.FAM.POR.000002.jpg')
+
+        try:
+            assert plugin.process(str(path), self.CONFIG) is False
+            assert plugin.process(str(good), self.CONFIG) is True
+        finally:
+            plugin.writers.close()
+
+        quarantined = tmp_path / 'quarantine' / path.name
+        assert quarantined.exists()
+        assert not path.exists()
+        assert plugin.can_handle(str(quarantined)) is False
@@ -0,0 +1,228 @@
+"""Unit tests for the processing journal."""
+
+import multiprocessing
+import sqlite3
+import time
+
+import pytest
+
+from hump_yard_naming_exif.journal import ProcessingJournal
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+
+
+def committed(database):
+    """Read the committed states by path, as another process would."""
+    connection = sqlite3.connect(database)
+    try:
+        return dict(connection.execute('SELECT path, state FROM files'))
+    finally:
+        connection.close()
+
+
+class TestProcessingJournal:
+    """Test cases for ProcessingJournal."""
+
+    @pytest.fixture
+    def database(self, tmp_path):
+        """Path of a journal database."""
+        return tmp_path / 'journal.sqlite'
+
+    @pytest.fixture
+    def files(self, tmp_path):
+        """Create files to record."""
+        paths = [tmp_path / f'{number}.tiff' for number in range(4)]
+        for path in paths:
+            path.write_bytes(b'II*\x00')
+        return paths
+
+    def test_wal_mode(self, database):
+        """Test that the database is in WAL mode."""
+        journal = ProcessingJournal(database)
+        journal.close()
+
+        connection = sqlite3.connect(database)
+        assert connection.execute('PRAGMA journal_mode').fetchone() == ('wal',)
+        connection.close()
+
+    def test_batched_commits(self, database, files):
+        """Test that changes are committed once a batch is full, keeping only the latest state of a file."""
+        journal = ProcessingJournal(database, batch_size=3, interval_ms=60_000)
+        journal.parsed(files[0])
+        journal.written(files[0], files[0])
+
+        assert committed(database) == {}
+        assert journal.state(files[0]) == 'written'
+
+        journal.parsed(files[1])
+        journal.parsed(files[2])
+
+        assert committed(database) == {
+            str(files[0]): 'written', str(files[1]): 'parsed', str(files[2]): 'parsed',
+        }
+        assert journal.rows_committed == 3
+        journal.close()
+
+    def test_commit_after_interval(self, database, files):
+        """Test that pending changes are committed once the interval passes."""
+        journal = ProcessingJournal(database, interval_ms=20)
+        journal.parsed(files[0])
+
+        deadline = time.monotonic() + 5
+        while not journal.rows_committed and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert committed(database) == {str(files[0]): 'parsed'}
+        journal.close()
+
+    def test_close_commits(self, database, files):
+        """Test that closing the journal commits what is pending."""
+        journal = ProcessingJournal(database, interval_ms=60_000)
+        journal.written(files[0], files[0])
+        journal.close()
+
+        assert committed(database) == {str(files[0]): 'written'}
+
+    def test_moved_rows_deleted(self, database, files):
+        """Test that a moved file's row is deleted, in the same commit as the other changes."""
+        journal = ProcessingJournal(database, interval_ms=60_000)
+        journal.written(files[0], files[0])
+        journal.written(files[1], files[1])
+        journal.commit()
+        journal.moved(files[0])
+        journal.parsed(files[2])
+        journal.moved(files[2])
+        journal.commit()
+
+        assert committed(database) == {str(files[1]): 'written'}
+        assert journal.state(files[0]) is None
+        journal.close()
+
+    def test_resumable_after_reopen(self, database, files):
+        """Test that only written files whose written file is unchanged are resumable."""
+        journal = ProcessingJournal(database)
+        sidecar = files[3]
+        journal.written(files[0], files[0])
+        journal.written(files[1], sidecar)
+        journal.written(files[2], files[2])
+        journal.moved(files[2])
+        journal.close()
+        files[0].write_bytes(b'II*\x00changed')
+
+        journal = ProcessingJournal(database)
+        assert journal.resumable(files[0]) is None
+        assert journal.resumable(files[1]) == sidecar
+        assert journal.resumable(files[2]) is None
+        sidecar.unlink()
+        assert journal.resumable(files[1]) is None
+        journal.close()
+
+    @pytest.mark.parametrize('settings', [{'batch_size': 0}, {'interval_ms': 0}])
+    def test_invalid(self, database, settings):
+        """Test that non-positive batch sizes and intervals are rejected."""
+        with pytest.raises(ValueError):
+            ProcessingJournal(database, **settings)
+
+
+class TestJournalProcessing:
+    """Test cases for PhotoNamingExifPlugin with the journal setting."""
+
+    NAME = '1950.06.15.12.00.00.E.FAM.POR.000001.tiff'
+
+    @pytest.fixture
+    def config(self, tmp_path):
+        """Config with a journal outside the watch folder."""
+        return {'journal': str(tmp_path.parent / f'{tmp_path.name}-journal.sqlite')}
+
+    def interrupted(self, path, config, plugin=None):
+        """Write a file's metadata and commit the journal, as a run that crashed before the move."""
+        plugin = plugin or PhotoNamingExifPlugin()
+        assert plugin._write_metadata(path, plugin._parse_and_validate(path.name), config) is True
+        plugin.flush()
+        plugin._journal.close()
+
+    def test_processed_file_leaves_no_row(self, make_image, tmp_path, config):
+        """Test that a processed file's changes are committed as the deletion of its row."""
+        plugin = PhotoNamingExifPlugin()
+        path = make_image(self.NAME)
+
+        assert plugin.process(str(path), config) is True
+        plugin.flush()
+
+        assert plugin._journal.rows_committed == 1
+        assert committed(config['journal']) == {}
+
+    def test_resume_skips_write(self, make_image, tmp_path, config, monkeypatch):
+        """Test that a file written before a crash is moved without being written again."""
+        path = make_image(self.NAME)
+        self.interrupted(path, config)
+        written = path.read_bytes()
+
+        plugin = PhotoNamingExifPlugin()
+        monkeypatch.setattr(plugin, '_write_native', pytest.fail)
+        assert plugin.process(str(path), config) is True
+
+        assert (tmp_path / 'processed' / self.NAME).read_bytes() == written
+        plugin.flush()
+        assert committed(config['journal']) == {}
+
+    def test_changed_file_written_again(self, make_image, tmp_path, config):
+        """Test that a file replaced since the crash is written again."""
+        path = make_image(self.NAME)
+        self.interrupted(path, config)
+        path.unlink()
+        path = make_image(self.NAME)
+        before = path.read_bytes()
+
+        assert PhotoNamingExifPlugin().process(str(path), config) is True
+
+        assert (tmp_path / 'processed' / self.NAME).read_bytes() != before
+
+    def test_resume_sidecar(self, make_image, tmp_path, config):
+        """Test that a sidecar written before a crash is kept and moved with the image."""
+        config = dict(config, metadata_mode='sidecar')
+        path = make_image(self.NAME)
+        self.interrupted(path, config)
+        sidecar = (tmp_path / f'{self.NAME}.xmp').read_bytes()
+
+        assert PhotoNamingExifPlugin().process(str(path), config) is True
+
+        assert (tmp_path / 'processed' / f'{self.NAME}.xmp').read_bytes() == sidecar
+
+    def test_resume_write_to_processed(self, make_image, tmp_path, config, monkeypatch):
+        """Test that a copy staged in processed/ before a crash is renamed into place."""
+        config = dict(config, write_to_processed=True)
+        path = make_image(self.NAME)
+        plugin = PhotoNamingExifPlugin()
+        monkeypatch.setattr(plugin, '_crosses_device', lambda source_dir, target_dir: True)
+        self.interrupted(path, config, plugin)
+        [staged] = (tmp_path / 'processed').iterdir()
+        copy = staged.read_bytes()
+
+        assert PhotoNamingExifPlugin().process(str(path), config) is True
+
+        assert not path.exists()
+        assert [entry.name for entry in (tmp_path / 'processed').iterdir()] == [self.NAME]
+        assert (tmp_path / 'processed' / self.NAME).read_bytes() == copy
+
+    @pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='needs fork')
+    def test_process_executor(self, make_image, config, monkeypatch):
+        """Test that the changes of the worker processes are committed when they exit."""
+        config = dict(config, journal_interval_ms=60_000)
+        paths = [str(make_image(f'1950.06.15.12.00.00.E.FAM.POR.{number:06d}.tiff')) for number in range(1, 5)]
+        # Patched before the workers fork: files stay written, so their rows are kept
+        monkeypatch.setattr(PhotoNamingExifPlugin, '_move_to_processed', lambda *args: False)
+
+        results = dict(PhotoNamingExifPlugin().process_batch(paths, config, workers=2, executor='process'))
+
+        assert not any(results.values())
+        assert committed(config['journal']) == {path: 'written' for path in paths}
+
+    def test_invalid_journal(self, make_image, config, caplog):
+        """Test that an invalid setting fails before the file is written."""
+        path = make_image(self.NAME)
+        before = path.read_bytes()
+
+        assert PhotoNamingExifPlugin().process(str(path), dict(config, journal_batch=0)) is False
+
+        assert path.read_bytes() == before
+        assert 'journal_batch must be at least 1' in caplog.text
@@ -0,0 +1,262 @@
+"""Unit tests for in-place JPEG metadata updates."""
+
+import pyexiv2
+import pytest
+
+from hump_yard_naming_exif.jpeg import XMP_SIGNATURE, rewrite_jpeg, update_jpeg_in_place
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+
+from .conftest import jpeg_bytes
+
+EXIF = {'Exif.Image.DateTimeOriginal': '1950:06:15 12:00:00'}
+XMP = {
+    'Xmp.dc.identifier': 'old-id',
+    'Xmp.xmp.Identifier': 'old-id',
+    'Xmp.Iptc4xmpCore.DateCreated': '1950-06-15',
+    'Xmp.photoshop.DateCreated': '1950-06-15T12:00:00',
+}
+
+
+def read_metadata(path):
+    """Read EXIF and XMP back with pyexiv2."""
+    with pyexiv2.Image(str(path)) as img:
+        return img.read_exif(), img.read_xmp()
+
+
+@pytest.fixture
+def tagged_jpeg(tmp_path):
+    """Create a JPEG that exiv2 has already written metadata to (with a padded XMP packet)."""
+    path = tmp_path / 'photo.jpg'
+    path.write_bytes(jpeg_bytes(scan_size=4096))
+    with pyexiv2.Image(str(path)) as img:
+        img.modify_exif(EXIF)
+        img.modify_xmp({**XMP, 'Xmp.xmp.CreatorTool': 'Scanner 1.0'})
+    return path
+
+
+class TestUpdateJpegInPlace:
+    """Test cases for update_jpeg_in_place."""
+
+    def test_update(self, tagged_jpeg):
+        """Test that values are replaced without changing the file size."""
+        size = tagged_jpeg.stat().st_size
+        xmp = {**XMP, 'Xmp.dc.identifier': 'new-id', 'Xmp.xmp.Identifier': 'new-id'}
+        exif = {'Exif.Image.DateTimeOriginal': '1951:07:16 13:31:01'}
+
+        written = update_jpeg_in_place(tagged_jpeg, exif, xmp)
+
+        assert 0 < written < size
+        assert tagged_jpeg.stat().st_size == size
+        exif_read, xmp_read = read_metadata(tagged_jpeg)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1951:07:16 13:31:01'
+        assert xmp_read['Xmp.dc.identifier'] == 'new-id'
+        assert xmp_read['Xmp.xmp.Identifier'] == ['new-id']
+        assert xmp_read['Xmp.photoshop.DateCreated'] == '1950-06-15T12:00:00'
+
+    def test_keeps_other_properties(self, tagged_jpeg):
+        """Test that properties the plugin does not write are preserved."""
+        update_jpeg_in_place(tagged_jpeg, {}, {'Xmp.dc.identifier': 'new-id'})
+
+        _, xmp_read = read_metadata(tagged_jpeg)
+        assert xmp_read['Xmp.xmp.CreatorTool'] == 'Scanner 1.0'
+        assert xmp_read['Xmp.dc.identifier'] == 'new-id'
+
+    def test_only_header_bytes_change(self, tagged_jpeg):
+        """Test that the image data after the XMP segment is not touched."""
+        before = tagged_jpeg.read_bytes()
+        update_jpeg_in_place(tagged_jpeg, EXIF, {'Xmp.dc.identifier': 'new-id'})
+        after = tagged_jpeg.read_bytes()
+
+        packet_start = before.index(XMP_SIGNATURE)
+        segment_end = packet_start - 4 + 2 + int.from_bytes(before[packet_start - 2:packet_start], 'big')
+        assert after[:packet_start] == before[:packet_start]
+        assert after[segment_end:] == before[segment_end:]
+
+    def test_no_xmp_segment(self, tmp_path):
+        """Test that a JPEG without an XMP packet is left alone."""
+        path = tmp_path / 'plain.jpg'
+        path.write_bytes(jpeg_bytes())
+
+        assert update_jpeg_in_place(path, {}, XMP) is None
+        assert path.read_bytes() == jpeg_bytes()
+
+    def test_no_room(self, tagged_jpeg):
+        """Test that a packet that would outgrow its padding is left alone."""
+        before = tagged_jpeg.read_bytes()
+
+        assert update_jpeg_in_place(tagged_jpeg, {}, {'Xmp.dc.identifier': 'x' * 10000}) is None
+        assert tagged_jpeg.read_bytes() == before
+
+    def test_missing_exif_slot(self, tmp_path):
+        """Test that an EXIF value without an existing slot is not written in place."""
+        path = tmp_path / 'photo.jpg'
+        path.write_bytes(jpeg_bytes())
+        with pyexiv2.Image(str(path)) as img:
+            img.modify_xmp(XMP)
+        before = path.read_bytes()
+
+        assert update_jpeg_in_place(path, EXIF, XMP) is None
+        assert path.read_bytes() == before
+
+    def test_read_only_packet(self, tagged_jpeg):
+        """Test that a packet marked read-only is not edited."""
+        data = tagged_jpeg.read_bytes().replace(b'<?xpacket end="w"?>', b'<?xpacket end="r"?>')
+        tagged_jpeg.write_bytes(data)
+
+        assert update_jpeg_in_place(tagged_jpeg, {}, XMP) is None
+
+    @pytest.mark.parametrize('data', [b'', b'not a jpeg', b'\xff\xd8\xff\xe1\xff\xff'])
+    def test_not_a_jpeg(self, tmp_path, data):
+        """Test that empty, foreign and truncated files are left alone."""
+        path = tmp_path / 'broken.jpg'
+        path.write_bytes(data)
+
+        assert update_jpeg_in_place(path, {}, XMP) is None
+        assert path.read_bytes() == data
+
+
+class TestInPlaceProcessing:
+    """Test cases for PhotoNamingExifPlugin with metadata_mode 'inplace'."""
+
+    CONFIG = {'metadata_mode': 'inplace'}
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance."""
+        return PhotoNamingExifPlugin()
+
+    def test_process_in_place(self, plugin, tagged_jpeg, tmp_path, caplog):
+        """Test that a JPEG with room for the values is updated in place."""
+        path = tagged_jpeg.rename(tmp_path / '1950.06.15.12.00.00.E.FAM.POR.000001.jpg')
+        size = path.stat().st_size
+
+        with caplog.at_level('DEBUG'):
+            assert plugin.process(str(path), self.CONFIG) is True
+
+        moved = tmp_path / 'processed' / path.name
+        assert moved.stat().st_size == size
+        assert 'in place' in caplog.text
+        _, xmp_read = read_metadata(moved)
+        assert xmp_read['Xmp.dc.identifier'] != 'old-id'
+        assert xmp_read['Xmp.xmp.Identifier'] == [xmp_read['Xmp.dc.identifier']]
+
+    def test_process_rewrites(self, plugin, make_image, tmp_path, caplog):
+        """Test that a JPEG without room for an in-place update is rewritten."""
+        name = '1950.06.15.12.00.00.E.FAM.POR.000002.jpg'
+        path = make_image(name)
+
+        with caplog.at_level('DEBUG'):
+            assert plugin.process(str(path), self.CONFIG) is True
+
+        assert 'by streaming rewrite' in caplog.text
+        exif_read, xmp_read = read_metadata(tmp_path / 'processed' / name)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+        assert 'Xmp.dc.identifier' in xmp_read
+
+    def test_process_falls_back(self, plugin, make_image, tmp_path, monkeypatch, caplog):
+        """Test that a JPEG the native writers cannot handle is written with pyexiv2."""
+        name = '1950.06.15.12.00.00.E.FAM.POR.000003.jpg'
+        path = make_image(name)
+        monkeypatch.setattr('hump_yard_naming_exif.jpeg.rewrite_jpeg', lambda *args: None)
+
+        with caplog.at_level('DEBUG'):
+            assert plugin.process(str(path), self.CONFIG) is True
+
+        assert 'using pyexiv2' in caplog.text
+        exif_read, _ = read_metadata(tmp_path / 'processed' / name)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+
+
+class TestRewriteJpeg:
+    """Test cases for rewrite_jpeg."""
+
+    def test_rewrite(self, tmp_path):
+        """Test that Exif and XMP segments are inserted and the image data is copied unchanged."""
+        path = tmp_path / 'photo.jpg'
+        before = jpeg_bytes(scan_size=100000)
+        path.write_bytes(before)
+
+        written = rewrite_jpeg(path, EXIF, XMP, chunk_size=4096)
+
+        after = path.read_bytes()
+        assert written == len(after)
+        scan = before.index(b'\xff\xda')
+        assert after.endswith(before[scan:])
+        # JFIF stays the first segment, followed by the new Exif segment
+        assert after[:20] == before[:20]
+        assert after[24:30] == b'Exif\x00\x00'
+
+        exif_read, xmp_read = read_metadata(path)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+        assert xmp_read['Xmp.dc.identifier'] == 'old-id'
+        assert xmp_read['Xmp.xmp.Identifier'] == ['old-id']
+        assert xmp_read['Xmp.photoshop.DateCreated'] == '1950-06-15T12:00:00'
+
+    def test_leaves_room_for_in_place_updates(self, tmp_path):
+        """Test that a rewritten file can be updated in place afterwards."""
+        path = tmp_path / 'photo.jpg'
+        path.write_bytes(jpeg_bytes())
+        rewrite_jpeg(path, EXIF, XMP)
+        size = path.stat().st_size
+
+        assert update_jpeg_in_place(path, EXIF, {**XMP, 'Xmp.dc.identifier': 'new-id'})
+        assert path.stat().st_size == size
+        _, xmp_read = read_metadata(path)
+        assert xmp_read['Xmp.dc.identifier'] == 'new-id'
+
+    def test_keeps_existing_metadata(self, tmp_path):
+        """Test that existing Exif tags and XMP properties are kept."""
+        path = tmp_path / 'photo.jpg'
+        path.write_bytes(jpeg_bytes())
+        with pyexiv2.Image(str(path)) as img:
+            img.modify_exif({'Exif.Image.Make': 'Scanner', 'Exif.Photo.UserComment': 'charset=Ascii box 3'})
+            img.modify_xmp({'Xmp.xmp.CreatorTool': 'Scanner 1.0', 'Xmp.dc.identifier': 'old-id'})
+
+        assert rewrite_jpeg(path, EXIF, {'Xmp.dc.identifier': 'new-id'})
+
+        exif_read, xmp_read = read_metadata(path)
+        assert exif_read['Exif.Image.Make'] == 'Scanner'
+        assert exif_read['Exif.Photo.UserComment'] == 'charset=Ascii box 3'
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+        assert xmp_read['Xmp.xmp.CreatorTool'] == 'Scanner 1.0'
+        assert xmp_read['Xmp.dc.identifier'] == 'new-id'
+
+    def test_keeps_file_mode(self, tmp_path):
+        """Test that the rewritten file keeps the permissions of the original."""
+        path = tmp_path / 'photo.jpg'
+        path.write_bytes(jpeg_bytes())
+        path.chmod(0o640)
+
+        rewrite_jpeg(path, EXIF, XMP)
+
+        assert path.stat().st_mode & 0o777 == 0o640
+
+    @pytest.mark.parametrize('data', [
+        b'',
+        b'not a jpeg',
+        jpeg_bytes()[:40],  # no start of scan
+        jpeg_bytes()[:2] + b'\xff\xe1\x00\x0cExif\x00\x00II*\x00' + jpeg_bytes()[2:],  # damaged Exif
+    ])
+    def test_not_a_jpeg(self, tmp_path, data):
+        """Test that empty, foreign, truncated and damaged files are left alone."""
+        path = tmp_path / 'broken.jpg'
+        path.write_bytes(data)
+
+        assert rewrite_jpeg(path, EXIF, XMP) is None
+        assert path.read_bytes() == data
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_failed_copy_keeps_original(self, tmp_path, monkeypatch):
+        """Test that an error while copying leaves the original and no temporary file."""
+        path = tmp_path / 'photo.jpg'
+        path.write_bytes(jpeg_bytes())
+
+        def fail(*args):
+            raise OSError('disk full')
+
+        monkeypatch.setattr('hump_yard_naming_exif.jpeg.copy_stream', fail)
+
+        with pytest.raises(OSError):
+            rewrite_jpeg(path, EXIF, XMP)
+        assert path.read_bytes() == jpeg_bytes()
+        assert list(tmp_path.iterdir()) == [path]
@@ -0,0 +1,102 @@
+"""Unit tests for sharded processed/ layouts."""
+
+import pytest
+
+from hump_yard_naming_exif.layout import render_layout
+from hump_yard_naming_exif.parser import FilenameParser
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+
+NAME = '1950.06.15.12.00.00.E.FAM.POR.000001.jpg'
+
+
+@pytest.fixture
+def parsed():
+    """Parse the test filename."""
+    return FilenameParser().parse(NAME)
+
+
+class TestRenderLayout:
+    """Test cases for render_layout."""
+
+    @pytest.mark.parametrize('layout, folder', [
+        ('{year}/{group}/{subgroup}', '1950/FAM/POR'),
+        ('{year:04d}-{month:02d}', '1950-06'),
+        ('scans/{extension}', 'scans/jpg'),
+    ])
+    def test_fields(self, parsed, layout, folder):
+        """Test that the fields of the parsed filename fill the template."""
+        assert render_layout(layout, parsed, NAME) == folder
+
+    def test_hash(self, parsed):
+        """Test that hash sharding is stable and spreads names over hex prefixes."""
+        other_name = NAME.replace('000001', '000002')
+        other = FilenameParser().parse(other_name)
+        folder = render_layout('{hash:.2}/{hash[2]}{hash[3]}', parsed, NAME)
+
+        assert folder == render_layout('{hash:.2}/{hash[2]}{hash[3]}', parsed, NAME)
+        assert len(folder) == 5 and folder[2] == '/'
+        assert set(folder) - {'/'} <= set('0123456789abcdef')
+        assert render_layout('{hash}', other, other_name) != render_layout('{hash}', parsed, NAME)
+
+    @pytest.mark.parametrize('layout', [
+        '{unknown}',
+        '{}',
+        '/absolute/{year}',
+        '{year}/../{group}',
+        '{year}//{group}',
+        '{group:d}',
+        '{year',
+    ])
+    def test_invalid(self, parsed, layout):
+        """Test that invalid templates and folder names are rejected."""
+        with pytest.raises(ValueError):
+            render_layout(layout, parsed, NAME)
+
+
+class TestShardedProcessing:
+    """Test cases for PhotoNamingExifPlugin with processed_layout."""
+
+    CONFIG = {'metadata_mode': 'sidecar', 'processed_layout': '{year}/{group}/{subgroup}'}
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance."""
+        return PhotoNamingExifPlugin()
+
+    def test_process(self, plugin, make_image, tmp_path):
+        """Test that the file and its sidecar land in the folder of the layout."""
+        path = make_image(NAME)
+
+        assert plugin.process(str(path), self.CONFIG) is True
+
+        folder = tmp_path / 'processed' / '1950' / 'FAM' / 'POR'
+        assert sorted(entry.name for entry in folder.iterdir()) == [NAME, f'{NAME}.xmp']
+        assert folder in plugin.dir_cache
+
+    def test_sharded_files_not_handled(self, plugin, make_image, tmp_path):
+        """Test that can_handle skips files anywhere below processed/."""
+        path = make_image(NAME)
+        assert plugin.process(str(path), self.CONFIG) is True
+
+        assert plugin.can_handle(str(tmp_path / 'processed' / '1950' / 'FAM' / 'POR' / NAME)) is False
+
+    def test_write_to_processed(self, plugin, make_image, tmp_path, monkeypatch):
+        """Test that a copy written straight into processed/ goes to the layout's folder."""
+        monkeypatch.setattr(plugin, '_crosses_device', lambda source_dir, target_dir: True)
+        path = make_image(NAME)
+        config = {'metadata_mode': 'inplace', 'write_to_processed': True, 'processed_layout': '{hash:.2}'}
+
+        assert plugin.process(str(path), config) is True
+
+        (moved,) = (tmp_path / 'processed').glob(f'*/{NAME}')
+        assert moved.parent.name == render_layout('{hash:.2}', plugin.parser.parse(NAME), NAME)
+        assert not path.exists()
+
+    def test_invalid_layout(self, plugin, make_image, caplog):
+        """Test that an invalid layout fails the move and leaves the file in place."""
+        path = make_image(NAME)
+
+        assert plugin.process(str(path), {'metadata_mode': 'sidecar', 'processed_layout': '{album}'}) is False
+
+        assert path.exists()
+        assert 'Unknown processed_layout field' in caplog.text
@@ -1,7 +1,7 @@
 """Unit tests for filename parser."""
 
 import pytest
-from hump_yard_naming_exif.parser import FilenameParser, ParsedFilename
+from hump_yard_naming_exif.parser import FilenameParser
 
 
 class TestFilenameParser:
@@ -107,3 +107,30 @@ class TestFilenameParser:
         
         assert result is not None
         assert result.extension == 'tiff'
+
+    def test_parse_rejects_names_over_max_length(self):
+        """Test that names longer than max_length are rejected."""
+        filename = '1950.06.15.12.00.00.E.FAM.POR.000001' + '.A' * 200 + '.tiff'
+        assert FilenameParser().parse(filename) is None
+        assert FilenameParser(max_length=None).parse(filename) is not None
+        assert FilenameParser(max_length=len(filename)).parse(filename) is not None
+
+    def test_max_length_must_be_positive(self):
+        """Test that a non-positive max_length is rejected."""
+        with pytest.raises(ValueError):
+            FilenameParser(max_length=0)
+
+    def test_parsed_filename_is_slotted(self, parser):
+        """Test that parsed records carry no per-instance __dict__."""
+        result = parser.parse('1950.06.15.12.00.00.E.FAM.POR.000001.tiff')
+        assert not hasattr(result, '__dict__')
+
+    def test_parse_shares_code_strings(self, parser):
+        """Test that group, subgroup and extension strings are shared between records."""
+        first = parser.parse('1950.06.15.12.00.00.E.FAM.POR.000001.tiff')
+        second = parser.parse('1951.07.16.12.00.00.E.FAM.POR.000002.TIFF')
+
+        assert first.group is second.group
+        assert first.subgroup is second.subgroup
+        assert first.extension is second.extension
+
@@ -0,0 +1,114 @@
+"""Unit tests for the staged processing pipeline."""
+
+import threading
+
+import pytest
+
+from hump_yard_naming_exif.pipeline import Pipeline
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+
+
+class TestPipeline:
+    """Test cases for Pipeline."""
+
+    NAMES = [
+        '1950.06.15.12.00.00.E.FAM.POR.000001.jpg',
+        '1950.06.00.00.00.00.C.FAM.POR.000002.jpg',
+        '1950.00.00.00.00.00.C.TRV.LND.000003.tiff',
+        '1950.13.15.00.00.00.E.FAM.POR.000004.jpg',  # Invalid month
+    ]
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance."""
+        return PhotoNamingExifPlugin()
+
+    @pytest.mark.parametrize('workers', [1, 3])
+    def test_run(self, plugin, make_image, tmp_path, workers):
+        """Test that every file goes through all stages and is reported once."""
+        paths = [str(make_image(name)) for name in self.NAMES]
+        pipeline = Pipeline(plugin, {}, parse_workers=workers, write_workers=workers, move_workers=workers)
+
+        results = dict(pipeline.run(paths))
+
+        assert results == {
+            paths[0]: True,
+            paths[1]: True,
+            paths[2]: True,
+            paths[3]: False,
+        }
+        assert sorted(path.name for path in (tmp_path / 'processed').iterdir()) == sorted(self.NAMES[:3])
+
+        stats = pipeline.stats()
+        assert (stats['parse'].processed, stats['parse'].failed) == (4, 1)
+        assert (stats['write'].processed, stats['write'].failed) == (3, 0)
+        assert (stats['move'].processed, stats['move'].failed) == (3, 0)
+        assert all(stage.queue_depth == 0 for stage in stats.values())
+        assert all(stage.max_queue_depth >= 1 for stage in stats.values())
+
+    def test_write_to_processed(self, plugin, make_image, tmp_path, monkeypatch):
+        """Test that copies written straight into processed/ are renamed into place by the move stage."""
+        monkeypatch.setattr(plugin, '_crosses_device', lambda source_dir, target_dir: True)
+        paths = [str(make_image(name)) for name in self.NAMES]
+        pipeline = Pipeline(plugin, {'write_to_processed': True}, write_workers=2, move_workers=2)
+
+        results = dict(pipeline.run(paths))
+
+        assert results == dict(zip(paths, [True, True, True, False]))
+        assert sorted(path.name for path in (tmp_path / 'processed').iterdir()) == sorted(self.NAMES[:3])
+        assert sorted(path.name for path in tmp_path.iterdir()) == sorted(['processed', self.NAMES[3]])
+
+    def test_write_failure_is_not_moved(self, plugin, tmp_path):
+        """Test that a file whose metadata cannot be written stays in place."""
+        path = tmp_path / self.NAMES[0]
+        path.write_bytes(b'not an image')
+
+        assert list(Pipeline(plugin, {}).run([str(path)])) == [(str(path), False)]
+        assert path.exists()
+        assert not (tmp_path / 'processed').exists()
+
+    def test_handler_exception_is_reported(self, plugin, make_image, monkeypatch):
+        """Test that an exception in a stage fails only that file."""
+        path = str(make_image(self.NAMES[0]))
+        monkeypatch.setattr(plugin, '_move_to_processed', lambda path, config: 1 / 0)
+        pipeline = Pipeline(plugin, {})
+
+        assert list(pipeline.run([path])) == [(path, False)]
+        assert pipeline.stats()['move'].failed == 1
+
+    def test_backpressure(self, plugin):
+        """Test that input is only consumed as fast as the stages drain."""
+        taken = 0
+
+        def burst():
+            nonlocal taken
+            for number in range(100000):
+                taken += 1
+                yield f'/watch/invalid.{number}.jpg'
+
+        queue_size = 4
+        results = Pipeline(plugin, {}, queue_size=queue_size).run(burst())
+        next(results)
+
+        # Each of the three stage queues and the result queue, plus one item per thread
+        assert taken <= 4 * queue_size + 5
+        results.close()
+        assert taken < 100000
+
+    def test_close_stops_threads(self, plugin):
+        """Test that closing the results early shuts all stage threads down."""
+        before = threading.active_count()
+        results = Pipeline(plugin, {}, parse_workers=2, queue_size=2).run(
+            f'/watch/invalid.{number}.jpg' for number in range(1000)
+        )
+        next(results)
+        results.close()
+
+        assert threading.active_count() == before
+
+    def test_rejects_bad_arguments(self, plugin):
+        """Test that invalid worker and queue settings are rejected."""
+        with pytest.raises(ValueError):
+            Pipeline(plugin, {}, write_workers=0)
+        with pytest.raises(ValueError):
+            Pipeline(plugin, {}, queue_size=0)
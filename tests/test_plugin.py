@@ -1,9 +1,15 @@
 """Unit tests for PhotoNamingExifPlugin."""
 
+import asyncio
+import os
+import shutil
+import subprocess
+import sys
 import pytest
 from pathlib import Path
 from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
 from hump_yard_naming_exif.parser import FilenameParser
+from .conftest import tiff_bytes
 
 
 class TestPhotoNamingExifPlugin:
@@ -66,6 +72,43 @@ class TestPhotoNamingExifPlugin:
         assert plugin.can_handle('C:/watch/not_processed/1950.06.15.12.00.00.E.FAM.POR.000001.jpg') is True
         assert plugin.can_handle('C:/watch/preprocessed/1950.06.15.12.00.00.E.FAM.POR.000001.tiff') is True
 
+    def test_can_handle_skips_symlinks(self, plugin, tmp_path):
+        """Test can_handle rejects symlinks after the name checks pass."""
+        target = tmp_path / '1950.06.15.12.00.00.E.FAM.POR.000001.tiff'
+        target.touch()
+        link = tmp_path / '1950.06.15.12.00.00.E.FAM.POR.000002.tiff'
+        link.symlink_to(target)
+
+        assert plugin.can_handle(str(target)) is True
+        assert plugin.can_handle(str(link)) is False
+
+    def test_can_handle_entry(self, plugin, tmp_path):
+        """Test can_handle_entry with os.scandir entries."""
+        valid = tmp_path / '1950.06.15.12.00.00.E.FAM.POR.000001.tiff'
+        valid.touch()
+        (tmp_path / 'IMG_0001.JPG').touch()
+        (tmp_path / '1950.13.15.00.00.00.E.FAM.POR.000002.tiff').touch()
+        (tmp_path / '1950.06.15.12.00.00.E.FAM.POR.000003.tiff').symlink_to(valid)
+
+        with os.scandir(tmp_path) as entries:
+            accepted = sorted(entry.name for entry in entries if plugin.can_handle_entry(entry))
+
+        assert accepted == [valid.name]
+
+    def test_can_handle_entry_bytes(self, plugin, tmp_path):
+        """Test can_handle_entry with bytes paths and bytes scandir entries."""
+        (tmp_path / '1950.06.15.12.00.00.E.FAM.POR.000001.jpg').touch()
+        (tmp_path / 'processed').mkdir()
+        (tmp_path / 'processed' / '1950.06.15.12.00.00.E.FAM.POR.000002.jpg').touch()
+
+        with os.scandir(os.fsencode(tmp_path)) as entries:
+            assert [entry.name for entry in entries if plugin.can_handle_entry(entry)] == [
+                b'1950.06.15.12.00.00.E.FAM.POR.000001.jpg'
+            ]
+        assert plugin.can_handle_entry(b'/watch/1950.06.15.12.00.00.E.FAM.POR.000003.jpg') is True
+        assert plugin.can_handle_entry(b'/watch/processed/1950.06.15.12.00.00.E.FAM.POR.000003.jpg') is False
+        assert plugin.can_handle_entry(b'/watch/IMG_0001.JPG') is False
+
     def test_parse_and_validate_valid_file(self, plugin):
         """Test _parse_and_validate with valid filename."""
         result = plugin._parse_and_validate('1950.06.15.12.00.00.E.FAM.POR.000001.tiff')
@@ -82,6 +125,48 @@ class TestPhotoNamingExifPlugin:
         result = plugin._parse_and_validate('1950.13.15.00.00.00.E.FAM.POR.000001.tiff')
         assert result is None
 
+    def test_parse_and_validate_is_cached(self, plugin):
+        """Test that a second lookup of the same filename is a cache hit."""
+        filename = '1950.06.15.12.00.00.E.FAM.POR.000001.tiff'
+        first = plugin._parse_and_validate(filename)
+        second = plugin._parse_and_validate(filename)
+
+        assert first is second
+        assert plugin.parse_cache.misses == 1
+        assert plugin.parse_cache.hits == 1
+
+    def test_parse_and_validate_caches_rejections(self, plugin):
+        """Test that invalid filenames are rejected from the cache on repeat."""
+        assert plugin.can_handle('1950.13.15.00.00.00.E.FAM.POR.000001.tiff') is False
+        assert plugin.can_handle('1950.13.15.00.00.00.E.FAM.POR.000001.tiff') is False
+        assert plugin.parse_cache.hits == 1
+
+    def test_parse_cache_size(self):
+        """Test that the parse cache capacity is configurable."""
+        plugin = PhotoNamingExifPlugin(parse_cache_size=1)
+        plugin._parse_and_validate('1950.06.15.12.00.00.E.FAM.POR.000001.tiff')
+        plugin._parse_and_validate('1950.06.15.12.00.00.E.FAM.POR.000002.tiff')
+
+        assert len(plugin.parse_cache) == 1
+        assert plugin.parse_cache.evictions == 1
+
+    def test_log_rejection_lists_violations(self, plugin, caplog):
+        """Test _log_rejection renders a message for each violated rule."""
+        with caplog.at_level('ERROR'):
+            plugin._log_rejection('1950.13.15.25.00.00.E.FAM.POR.000001.tiff')
+
+        messages = [record.getMessage() for record in caplog.records]
+        assert 'Failed to parse or validate filename' in messages[0]
+        assert any('month' in message.lower() for message in messages[1:])
+        assert any('hour' in message.lower() for message in messages[1:])
+
+    def test_log_rejection_unparsable(self, plugin, caplog):
+        """Test _log_rejection for a filename that does not parse."""
+        with caplog.at_level('ERROR'):
+            plugin._log_rejection('invalid.jpg')
+
+        assert len(caplog.records) == 1
+
     def test_build_metadata_dict_exact_date(self, plugin, parser):
         """Test _build_metadata_dict for exact date."""
         parsed = parser.parse('1950.06.15.12.30.00.E.FAM.POR.000001.tiff')
@@ -124,6 +209,39 @@ class TestPhotoNamingExifPlugin:
         assert 'Xmp.Iptc4xmpCore.DateCreated' not in xmp_dict
         assert 'Xmp.photoshop.DateCreated' not in xmp_dict
 
+    def test_build_metadata_dict_reuses_date_values(self, plugin, parser):
+        """Test that files sharing a date reuse the formatted date values."""
+        first = parser.parse('1950.06.15.12.30.00.E.FAM.POR.000001.tiff')
+        second = parser.parse('1950.06.15.12.30.00.E.FAM.POR.000002.tiff')
+        first_exif, _, first_xmp = plugin._build_metadata_dict(first)
+        second_exif, _, second_xmp = plugin._build_metadata_dict(second)
+
+        assert plugin.metadata_cache.hits == 1
+        assert first_exif == second_exif
+        assert first_xmp['Xmp.photoshop.DateCreated'] == second_xmp['Xmp.photoshop.DateCreated']
+        assert first_xmp['Xmp.dc.identifier'] != second_xmp['Xmp.dc.identifier']
+
+    def test_build_metadata_dict_returns_fresh_dicts(self, plugin, parser):
+        """Test that modifying a returned dict does not affect the cached values."""
+        parsed = parser.parse('1950.06.15.12.30.00.E.FAM.POR.000001.tiff')
+        exif_dict, _, xmp_dict = plugin._build_metadata_dict(parsed)
+        exif_dict.clear()
+        xmp_dict.clear()
+
+        exif_dict, _, xmp_dict = plugin._build_metadata_dict(parsed)
+        assert exif_dict['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:30:00'
+        assert xmp_dict['Xmp.Iptc4xmpCore.DateCreated'] == '1950-06-15'
+
+    def test_build_metadata_dict_cache_key_includes_modifier(self, plugin, parser):
+        """Test that the same date with another modifier is formatted separately."""
+        exact = parser.parse('1950.06.15.00.00.00.E.FAM.POR.000001.tiff')
+        circa = parser.parse('1950.06.15.00.00.00.C.FAM.POR.000002.tiff')
+        plugin._build_metadata_dict(exact)
+        exif_dict, _, xmp_dict = plugin._build_metadata_dict(circa)
+
+        assert exif_dict == {}
+        assert 'Xmp.photoshop.DateCreated' not in xmp_dict
+
     def test_format_iptc_date_full(self, plugin, parser):
         """Test _format_iptc_date with full date."""
         parsed = parser.parse('1950.06.15.12.00.00.E.FAM.POR.000001.tiff')
@@ -185,3 +303,319 @@ class TestPhotoNamingExifPlugin:
         for ext in extensions:
             filename = f'1950.06.15.12.00.00.E.FAM.POR.000001{ext}'
             assert plugin.can_handle(filename) is True, f"Extension {ext} should be supported"
+
+
+class TestLazyImports:
+    """Test that importing the plugin does not load the heavy modules."""
+
+    def test_import_does_not_load_heavy_modules(self):
+        """Test that pyexiv2 and friends are only imported by the code that uses them."""
+        code = (
+            'import sys, hump_yard_naming_exif.plugin; '
+            'modules = ("pyexiv2", "asyncio", "multiprocessing", "concurrent.futures", "ctypes", "sqlite3", '
+            '"mmap", "html", "xml.etree.ElementTree", "hump_yard_naming_exif.layout", '
+            '"hump_yard_naming_exif.journal"); '
+            'print(" ".join(m for m in modules if m in sys.modules))'
+        )
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        result = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+
+        assert result.stdout.split() == []
+
+
+class TestProcessBatch:
+    """Test cases for PhotoNamingExifPlugin.process_batch."""
+
+    NAMES = [
+        '1950.06.15.12.00.00.E.FAM.POR.000001.jpg',
+        '1950.06.00.00.00.00.C.FAM.POR.000002.jpg',
+        '1950.00.00.00.00.00.C.TRV.LND.000003.tiff',
+        '1950.13.15.00.00.00.E.FAM.POR.000004.jpg',  # Invalid month
+    ]
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance."""
+        return PhotoNamingExifPlugin()
+
+    @pytest.mark.parametrize('workers, executor', [(1, 'thread'), (3, 'thread'), (2, 'process')])
+    def test_process_batch(self, plugin, make_image, tmp_path, workers, executor):
+        """Test that every file is processed and reported once."""
+        paths = [str(make_image(name)) for name in self.NAMES]
+
+        results = dict(plugin.process_batch(paths, {}, workers=workers, executor=executor))
+
+        assert results == {
+            paths[0]: True,
+            paths[1]: True,
+            paths[2]: True,
+            paths[3]: False,
+        }
+        assert sorted(path.name for path in (tmp_path / 'processed').iterdir()) == sorted(self.NAMES[:3])
+
+    def test_process_batch_rejects_bad_arguments(self, plugin):
+        """Test that invalid worker settings are rejected."""
+        with pytest.raises(ValueError):
+            list(plugin.process_batch([], {}, workers=0))
+        with pytest.raises(ValueError):
+            list(plugin.process_batch([], {}, workers=2, executor='fiber'))
+
+
+class TestAsyncProcessing:
+    """Test cases for the asyncio interface."""
+
+    NAMES = TestProcessBatch.NAMES
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance."""
+        return PhotoNamingExifPlugin(async_workers=2)
+
+    def test_aprocess(self, plugin, make_image, tmp_path):
+        """Test that aprocess writes metadata and moves the file."""
+        path = make_image(self.NAMES[0])
+
+        assert asyncio.run(plugin.aprocess(str(path), {})) is True
+        assert (tmp_path / 'processed' / self.NAMES[0]).exists()
+        assert not path.exists()
+
+    def test_aprocess_invalid(self, plugin, make_image):
+        """Test that aprocess rejects an invalid filename without touching the file."""
+        path = make_image(self.NAMES[3])
+
+        assert asyncio.run(plugin.aprocess(str(path), {})) is False
+        assert path.exists()
+
+    def test_acan_handle(self, plugin, make_image, tmp_path):
+        """Test that acan_handle agrees with can_handle."""
+        path = make_image(self.NAMES[0])
+        link = tmp_path / self.NAMES[1]
+        link.symlink_to(path)
+
+        async def check():
+            return [
+                await plugin.acan_handle(str(path)),
+                await plugin.acan_handle(str(link)),
+                await plugin.acan_handle(str(tmp_path / self.NAMES[3])),
+            ]
+
+        assert asyncio.run(check()) == [True, False, False]
+
+    @pytest.mark.parametrize('concurrency', [1, 3])
+    def test_aprocess_batch(self, plugin, make_image, tmp_path, concurrency):
+        """Test that every file is processed and reported once."""
+        paths = [str(make_image(name)) for name in self.NAMES]
+
+        async def collect():
+            return {path: success async for path, success in plugin.aprocess_batch(paths, {}, concurrency)}
+
+        assert asyncio.run(collect()) == {
+            paths[0]: True,
+            paths[1]: True,
+            paths[2]: True,
+            paths[3]: False,
+        }
+        assert sorted(path.name for path in (tmp_path / 'processed').iterdir()) == sorted(self.NAMES[:3])
+
+    def test_aprocess_batch_limits_concurrency(self, plugin, monkeypatch):
+        """Test that no more than concurrency files are in progress, and the loop stays responsive."""
+        in_progress = 0
+        peak = 0
+        ticks = 0
+
+        async def fake_aprocess(file_path, config):
+            nonlocal in_progress, peak
+            in_progress += 1
+            peak = max(peak, in_progress)
+            await asyncio.sleep(0.001)
+            in_progress -= 1
+            return True
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        async def paths():
+            for number in range(200):
+                yield f'/watch/{number}.jpg'
+
+        async def run():
+            tick_task = asyncio.create_task(ticker())
+            results = [result async for result in plugin.aprocess_batch(paths(), {}, concurrency=5)]
+            tick_task.cancel()
+            return results
+
+        monkeypatch.setattr(plugin, 'aprocess', fake_aprocess)
+        results = asyncio.run(run())
+
+        assert len(results) == 200
+        assert peak == 5
+        assert ticks > 0
+
+    def test_aprocess_batch_close_cancels_pending(self, plugin, monkeypatch):
+        """Test that closing the generator early cancels the files in progress."""
+        cancelled = 0
+
+        async def fake_aprocess(file_path, config):
+            nonlocal cancelled
+            if file_path.endswith('0.jpg'):
+                return True
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled += 1
+                raise
+            return True
+
+        async def run():
+            batch = plugin.aprocess_batch([f'/watch/{number}.jpg' for number in range(10)], {}, concurrency=4)
+            first = await batch.__anext__()
+            await batch.aclose()
+            return first
+
+        monkeypatch.setattr(plugin, 'aprocess', fake_aprocess)
+
+        assert asyncio.run(run()) == ('/watch/0.jpg', True)
+        assert cancelled == 3
+
+    def test_aprocess_batch_rejects_bad_arguments(self, plugin):
+        """Test that an invalid concurrency is rejected."""
+        async def run():
+            return [result async for result in plugin.aprocess_batch([], {}, concurrency=0)]
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
+
+
+class TestWriteToProcessed:
+    """Test cases for the write_to_processed option."""
+
+    CONFIG = {'write_to_processed': True}
+    NAMES = [
+        '1950.06.15.12.00.00.E.FAM.POR.000001.jpg',
+        '1950.06.15.12.00.00.E.FAM.POR.000002.tiff',
+    ]
+
+    @pytest.fixture
+    def plugin(self, monkeypatch):
+        """Create plugin instance that sees processed/ as another filesystem."""
+        plugin = PhotoNamingExifPlugin()
+        monkeypatch.setattr(plugin, '_crosses_device', lambda source_dir, target_dir: True)
+        return plugin
+
+    @staticmethod
+    def read_metadata(path):
+        """Read EXIF and XMP back with pyexiv2."""
+        import pyexiv2
+
+        with pyexiv2.Image(str(path)) as img:
+            return img.read_exif(), img.read_xmp()
+
+    @pytest.mark.parametrize('name', NAMES)
+    def test_process(self, plugin, make_image, tmp_path, name):
+        """Test that the output is written into processed/ and the source removed."""
+        path = make_image(name)
+
+        assert plugin.process(str(path), self.CONFIG) is True
+
+        assert not path.exists()
+        assert [entry.name for entry in (tmp_path / 'processed').iterdir()] == [name]
+        exif_read, xmp_read = self.read_metadata(tmp_path / 'processed' / name)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+        assert 'Xmp.dc.identifier' in xmp_read
+
+    @pytest.mark.parametrize('name', NAMES)
+    def test_source_untouched_until_moved(self, plugin, make_image, tmp_path, name):
+        """Test that the write leaves the source as it was and only stages a copy."""
+        path = make_image(name)
+        before = path.read_bytes()
+        parsed = plugin.parser.parse(name)
+
+        assert plugin._write_metadata(path, parsed, self.CONFIG) is True
+
+        assert path.read_bytes() == before
+        staged = list((tmp_path / 'processed').iterdir())
+        assert len(staged) == 1 and staged[0].name.endswith('.tmp')
+
+        assert plugin._move_to_processed(path) is True
+        assert not path.exists()
+        assert [entry.name for entry in (tmp_path / 'processed').iterdir()] == [name]
+
+    def test_destination_exists(self, plugin, make_image, tmp_path):
+        """Test that an existing destination keeps the source and drops the staged copy."""
+        name = self.NAMES[0]
+        path = make_image(name)
+        existing = make_image(name, 'processed')
+        existing.write_bytes(b'older')
+
+        assert plugin.process(str(path), self.CONFIG) is False
+
+        assert path.exists()
+        assert [entry.name for entry in (tmp_path / 'processed').iterdir()] == [name]
+        assert existing.read_bytes() == b'older'
+
+    def test_failed_copy_keeps_source(self, plugin, make_image, tmp_path, monkeypatch):
+        """Test that an error while writing the copy leaves the source and no temporary file."""
+        name = self.NAMES[0]
+        path = make_image(name)
+        before = path.read_bytes()
+
+        def fail(*args):
+            raise OSError('disk full')
+
+        monkeypatch.setattr('hump_yard_naming_exif.jpeg.copy_jpeg_with_metadata', fail)
+
+        assert plugin.process(str(path), self.CONFIG) is False
+        assert path.read_bytes() == before
+        assert list((tmp_path / 'processed').iterdir()) == []
+
+    def test_falls_back_to_write_and_move(self, plugin, make_image, tmp_path, monkeypatch):
+        """Test that a file that cannot be copied natively is written in place and moved."""
+        name = self.NAMES[0]
+        path = make_image(name)
+        monkeypatch.setattr('hump_yard_naming_exif.jpeg.copy_jpeg_with_metadata', lambda *args: None)
+
+        assert plugin.process(str(path), self.CONFIG) is True
+
+        assert not path.exists()
+        assert [entry.name for entry in (tmp_path / 'processed').iterdir()] == [name]
+        exif_read, _ = self.read_metadata(tmp_path / 'processed' / name)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+
+    def test_retry_replaces_stale_copy(self, plugin, make_image, tmp_path):
+        """Test that writing a file again drops the copy of the earlier, unmoved write."""
+        name = self.NAMES[0]
+        path = make_image(name)
+        parsed = plugin.parser.parse(name)
+
+        assert plugin._write_metadata(path, parsed, self.CONFIG) is True
+        assert plugin._write_metadata(path, parsed, self.CONFIG) is True
+
+        assert len(list((tmp_path / 'processed').iterdir())) == 1
+
+    def test_processed_removed_between_files(self, plugin, make_image, tmp_path):
+        """Test that processed/ removed after it was cached is created again for the next copy."""
+        first, second = (make_image(name) for name in self.NAMES)
+
+        assert plugin.process(str(first), self.CONFIG) is True
+        shutil.rmtree(tmp_path / 'processed')
+        assert plugin.process(str(second), self.CONFIG) is True
+
+        assert not second.exists()
+        assert [entry.name for entry in (tmp_path / 'processed').iterdir()] == [self.NAMES[1]]
+
+    def test_same_device_writes_in_place(self, make_image, tmp_path):
+        """Test that on one filesystem the file is updated and moved, without a copy."""
+        plugin = PhotoNamingExifPlugin()
+        name = self.NAMES[1]
+        path = make_image(name)
+        parsed = plugin.parser.parse(name)
+
+        assert plugin._write_metadata(path, parsed, self.CONFIG) is True
+        assert list((tmp_path / 'processed').iterdir()) == []
+        assert path.stat().st_size > len(tiff_bytes())
+
+        assert plugin._move_to_processed(path) is True
+        assert [entry.name for entry in (tmp_path / 'processed').iterdir()] == [name]
@@ -0,0 +1,146 @@
+"""Unit tests for the persistent worker process pool."""
+
+import itertools
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+from hump_yard_naming_exif import pool as pool_module
+from hump_yard_naming_exif.pool import WorkerPool, _current_rss
+
+
+class TestWorkerPool:
+    """Test cases for WorkerPool."""
+
+    NAMES = [
+        '1950.06.15.12.00.00.E.FAM.POR.000001.jpg',
+        '1950.06.00.00.00.00.C.FAM.POR.000002.jpg',
+        '1950.00.00.00.00.00.C.TRV.LND.000003.tiff',
+        '1950.13.15.00.00.00.E.FAM.POR.000004.jpg',  # Invalid month
+    ]
+
+    def test_map(self, make_image, tmp_path):
+        """Test that every file is processed and reported once."""
+        paths = [str(make_image(name)) for name in self.NAMES]
+
+        with WorkerPool({}, workers=2) as pool:
+            results = dict(pool.map(paths))
+
+        assert results == {
+            paths[0]: True,
+            paths[1]: True,
+            paths[2]: True,
+            paths[3]: False,
+        }
+        assert sorted(path.name for path in (tmp_path / 'processed').iterdir()) == sorted(self.NAMES[:3])
+
+    def test_workers_persist_between_maps(self, make_image):
+        """Test that workers are reused across map() calls."""
+        with WorkerPool({}, workers=2) as pool:
+            pids = sorted(pool.pids())
+            list(pool.map([str(make_image(self.NAMES[0]))]))
+            list(pool.map([str(make_image(self.NAMES[1]))]))
+
+            assert sorted(pool.pids()) == pids
+            assert pool.recycled == 0
+
+    def test_recycle_after_max_tasks(self, make_image):
+        """Test that a worker is replaced after max_tasks files."""
+        paths = [str(make_image(name)) for name in self.NAMES]
+
+        with WorkerPool({}, workers=1, max_tasks=2) as pool:
+            first_pid = pool.pids()
+            results = list(pool.map(paths))
+
+            assert len(results) == 4
+            assert pool.recycled == 2
+            assert pool.pids() != first_pid
+
+    @pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+    def test_recycle_after_rss_growth(self, make_image, monkeypatch):
+        """Test that a worker is replaced once its RSS grows past the limit."""
+        # Forked workers inherit the patched function: 0 at startup, +1 GiB per file
+        sizes = itertools.count(0, 1 << 30)
+        monkeypatch.setattr(pool_module, '_current_rss', lambda: next(sizes))
+        paths = [str(make_image(name)) for name in self.NAMES[:2]]
+
+        with WorkerPool({}, workers=1, max_rss_growth=1 << 30, context='fork') as pool:
+            first_pid = pool.pids()
+            list(pool.map(paths))
+
+            assert pool.recycled == 2
+            assert pool.pids() != first_pid
+
+    @pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+    def test_crashed_worker_is_replaced(self, make_image, monkeypatch):
+        """Test that a worker dying mid-file fails that file only."""
+        crash = str(make_image(self.NAMES[0]))
+        survivor = str(make_image(self.NAMES[1]))
+        original = PhotoNamingExifPlugin.process
+
+        def process(self, file_path, config):
+            if file_path == crash:
+                os._exit(1)
+            return original(self, file_path, config)
+
+        # Forked workers inherit the patched method
+        monkeypatch.setattr(PhotoNamingExifPlugin, 'process', process)
+
+        with WorkerPool({}, workers=1, context='fork') as pool:
+            results = dict(pool.map([crash, survivor]))
+
+            assert results == {crash: False, survivor: True}
+            assert pool.crashed == 1
+            assert len(pool.pids()) == 1
+
+    def test_idle_worker_killed(self, make_image):
+        """Test that a worker killed while idle is replaced and the next file still processed."""
+        path = str(make_image(self.NAMES[0]))
+
+        with WorkerPool({}, workers=1) as pool:
+            [dead] = pool._workers
+            dead.process.kill()
+            dead.process.join()
+
+            assert list(pool.map([path])) == [(path, True)]
+            assert pool.pids() != [dead.process.pid]
+            assert pool.crashed == 0
+
+    @pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(), reason='needs fork')
+    def test_workers_import_pyexiv2_at_startup(self, make_image, monkeypatch):
+        """Test that pyexiv2 is loaded before a worker's first file."""
+        path = str(make_image(self.NAMES[0]))
+        # Forked workers inherit the patched method and the module table without pyexiv2
+        monkeypatch.delitem(sys.modules, 'pyexiv2', raising=False)
+        monkeypatch.setattr(PhotoNamingExifPlugin, 'process', lambda self, file_path, config: 'pyexiv2' in sys.modules)
+
+        with WorkerPool({}, workers=1, context='fork') as pool:
+            assert list(pool.map([path])) == [(path, True)]
+
+    def test_close_early(self, make_image):
+        """Test that closing the results early leaves the pool usable."""
+        paths = [str(make_image(name)) for name in self.NAMES[:3]]
+        invalid = str(make_image(self.NAMES[3]))
+
+        with WorkerPool({}, workers=2) as pool:
+            results = pool.map(paths)
+            next(results)
+            results.close()
+
+            assert list(pool.map([invalid])) == [(invalid, False)]
+
+    def test_rejects_bad_arguments(self):
+        """Test that invalid pool settings are rejected."""
+        with pytest.raises(ValueError):
+            WorkerPool({}, workers=0)
+        with pytest.raises(ValueError):
+            WorkerPool({}, max_tasks=0)
+        with pytest.raises(ValueError):
+            WorkerPool({}, max_rss_growth=0)
+
+    def test_current_rss(self):
+        """Test that the RSS of the current process is measured."""
+        assert _current_rss() > 0
@@ -0,0 +1,118 @@
+"""Unit tests for XMP sidecar output."""
+
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pyexiv2
+import pytest
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+from hump_yard_naming_exif.sidecar import XMP_NAMESPACES, build_xmp_packet, sidecar_path, write_sidecar
+
+EXIF = {'Exif.Image.DateTimeOriginal': '1950:06:15 12:00:00'}
+XMP = {
+    'Xmp.dc.identifier': 'id-1',
+    'Xmp.xmp.Identifier': 'id-1',
+    'Xmp.Iptc4xmpCore.DateCreated': '1950-06-15',
+    'Xmp.photoshop.DateCreated': '1950-06-15T12:00:00',
+}
+
+
+class TestSidecar:
+    """Test cases for the sidecar module."""
+
+    def test_sidecar_path_keeps_extension(self):
+        """Test that the sidecar name keeps the image extension."""
+        assert sidecar_path(Path('/a/photo.tiff')) == Path('/a/photo.tiff.xmp')
+        assert sidecar_path(Path('/a/photo.jpg')) != sidecar_path(Path('/a/photo.tiff'))
+
+    def test_packet_is_well_formed(self):
+        """Test that the packet parses as XML with the expected values."""
+        root = ET.fromstring(build_xmp_packet(EXIF, XMP))
+        description = root.find('.//{http://www.w3.org/1999/02/22-rdf-syntax-ns#}Description')
+
+        def text(prefix, name):
+            return description.find(f'{{{XMP_NAMESPACES[prefix]}}}{name}').text
+
+        assert text('exif', 'DateTimeOriginal') == '1950-06-15T12:00:00'
+        assert text('dc', 'identifier') == 'id-1'
+        assert text('photoshop', 'DateCreated') == '1950-06-15T12:00:00'
+        assert text('Iptc4xmpCore', 'DateCreated') == '1950-06-15'
+
+    def test_values_are_escaped(self):
+        """Test that XML special characters in values are escaped."""
+        root = ET.fromstring(build_xmp_packet({}, {'Xmp.dc.identifier': '<a & b>'}))
+        assert root.find(f'.//{{{XMP_NAMESPACES["dc"]}}}identifier').text == '<a & b>'
+
+    def test_unknown_namespace(self):
+        """Test that an unknown namespace prefix is rejected."""
+        with pytest.raises(ValueError):
+            build_xmp_packet({}, {'Xmp.unknown.Thing': 'value'})
+
+    def test_exiv2_reads_sidecar(self, tmp_path):
+        """Test that exiv2 reads the sidecar back."""
+        path = write_sidecar(tmp_path / 'photo.tiff', EXIF, XMP)
+
+        with pyexiv2.Image(str(path)) as img:
+            xmp = img.read_xmp()
+
+        assert xmp['Xmp.exif.DateTimeOriginal'] == '1950-06-15T12:00:00'
+        assert xmp['Xmp.dc.identifier'] == 'id-1'
+        assert xmp['Xmp.xmp.Identifier'] == ['id-1']
+        assert xmp['Xmp.photoshop.DateCreated'] == '1950-06-15T12:00:00'
+
+
+class TestSidecarProcessing:
+    """Test cases for PhotoNamingExifPlugin with metadata_mode 'sidecar'."""
+
+    CONFIG = {'metadata_mode': 'sidecar'}
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance."""
+        return PhotoNamingExifPlugin()
+
+    def test_process_leaves_image_untouched(self, plugin, make_image, tmp_path):
+        """Test that the image bytes are unchanged and the sidecar moves with it."""
+        path = make_image('1950.06.15.12.00.00.E.FAM.POR.000001.tiff')
+        original = path.read_bytes()
+
+        assert plugin.process(str(path), self.CONFIG) is True
+
+        moved = tmp_path / 'processed' / path.name
+        assert moved.read_bytes() == original
+        assert sidecar_path(moved).exists()
+        assert not sidecar_path(path).exists()
+
+        with pyexiv2.Image(str(sidecar_path(moved))) as img:
+            xmp = img.read_xmp()
+        assert xmp['Xmp.exif.DateTimeOriginal'] == '1950-06-15T12:00:00'
+        assert xmp['Xmp.dc.identifier'] == xmp['Xmp.xmp.Identifier'][0]
+
+    def test_process_no_exif_for_inexact_date(self, plugin, make_image, tmp_path):
+        """Test that inexact dates get no EXIF date in the sidecar."""
+        path = make_image('1950.06.00.00.00.00.C.FAM.POR.000002.jpg')
+
+        assert plugin.process(str(path), self.CONFIG) is True
+
+        with pyexiv2.Image(str(sidecar_path(tmp_path / 'processed' / path.name))) as img:
+            xmp = img.read_xmp()
+        assert 'Xmp.exif.DateTimeOriginal' not in xmp
+        assert xmp['Xmp.iptc.DateCreated'] == '1950-06'
+
+    def test_existing_destination_sidecar(self, plugin, make_image, tmp_path):
+        """Test that an existing sidecar in processed/ keeps the file in place."""
+        path = make_image('1950.06.15.12.00.00.E.FAM.POR.000003.jpg')
+        (tmp_path / 'processed').mkdir()
+        sidecar_path(tmp_path / 'processed' / path.name).write_bytes(b'')
+
+        assert plugin.process(str(path), self.CONFIG) is False
+        assert path.exists()
+        assert sidecar_path(path).exists()
+
+    def test_unknown_mode(self, plugin, make_image):
+        """Test that an unknown metadata_mode fails the file."""
+        path = make_image('1950.06.15.12.00.00.E.FAM.POR.000004.jpg')
+
+        assert plugin.process(str(path), {'metadata_mode': 'carrier-pigeon'}) is False
+        assert path.exists()
@@ -0,0 +1,230 @@
+"""Unit tests for append-only TIFF metadata updates."""
+
+import re
+import struct
+import xml.etree.ElementTree as ET
+
+import pyexiv2
+import pytest
+
+from hump_yard_naming_exif.plugin import PhotoNamingExifPlugin
+from hump_yard_naming_exif.tiff import XMP_TAG, _append_block, _Layout, update_tiff_by_append
+
+from .conftest import tiff_bytes
+
+EXIF = {'Exif.Image.DateTimeOriginal': '1950:06:15 12:00:00'}
+XMP = {
+    'Xmp.dc.identifier': 'new-id',
+    'Xmp.xmp.Identifier': 'new-id',
+    'Xmp.photoshop.DateCreated': '1950-06-15T12:00:00',
+}
+
+
+def bigtiff_bytes(byte_order='<'):
+    """Build a minimal uncompressed 1x1 grayscale BigTIFF."""
+    entries = [
+        (256, 3, 1, 1),  # ImageWidth
+        (257, 3, 1, 1),  # ImageLength
+        (258, 3, 1, 8),  # BitsPerSample
+        (259, 3, 1, 1),  # Compression: none
+        (262, 3, 1, 1),  # PhotometricInterpretation: BlackIsZero
+        (273, 16, 1, 0),  # StripOffsets (LONG8), patched below
+        (277, 3, 1, 1),  # SamplesPerPixel
+        (278, 3, 1, 1),  # RowsPerStrip
+        (279, 16, 1, 1),  # StripByteCounts (LONG8)
+    ]
+    ifd_size = 8 + 20 * len(entries) + 8
+    strip_offset = 16 + ifd_size
+    magic = b'II' if byte_order == '<' else b'MM'
+
+    data = magic + struct.pack(byte_order + 'HHHQ', 43, 8, 0, 16)
+    data += struct.pack(byte_order + 'Q', len(entries))
+    for tag, field_type, count, value in entries:
+        if tag == 273:
+            value = strip_offset
+        if field_type == 3:
+            data += struct.pack(byte_order + 'HHQH6x', tag, field_type, count, value)
+        else:
+            data += struct.pack(byte_order + 'HHQQ', tag, field_type, count, value)
+    data += struct.pack(byte_order + 'Q', 0)
+    return data + b'\x80'
+
+
+def read_bigtiff_ifd0(data):
+    """Read the IFD0 entries of a BigTIFF as {tag: (type, count, value bytes)}."""
+    byte_order = '<' if data[:2] == b'II' else '>'
+    (ifd,) = struct.unpack_from(byte_order + 'Q', data, 8)
+    (count,) = struct.unpack_from(byte_order + 'Q', data, ifd)
+    entries = {}
+    for position in range(ifd + 8, ifd + 8 + 20 * count, 20):
+        tag, field_type, length = struct.unpack_from(byte_order + 'HHQ', data, position)
+        field = data[position + 12:position + 20]
+        if field_type in (1, 2, 7) and length > 8:
+            (offset,) = struct.unpack_from(byte_order + 'Q', field)
+            field = data[offset:offset + length]
+        entries[tag] = (field_type, length, field)
+    return entries
+
+
+def read_metadata(path):
+    """Read EXIF and XMP back with pyexiv2."""
+    with pyexiv2.Image(str(path)) as img:
+        return img.read_exif(), img.read_xmp()
+
+
+class TestUpdateTiffByAppend:
+    """Test cases for update_tiff_by_append."""
+
+    @pytest.mark.parametrize('byte_order', ['<', '>'])
+    def test_classic_tiff(self, tmp_path, byte_order):
+        """Test that values are appended and read back by pyexiv2 in both byte orders."""
+        path = tmp_path / 'scan.tiff'
+        before = tiff_bytes(byte_order)
+        path.write_bytes(before)
+
+        written = update_tiff_by_append(path, EXIF, XMP)
+
+        after = path.read_bytes()
+        assert written == len(after) - len(before) + 4
+        assert written < 2048
+        # Only the first-IFD offset changes; everything else is appended
+        assert after[:4] == before[:4]
+        assert after[8:len(before)] == before[8:]
+
+        exif_read, xmp_read = read_metadata(path)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+        assert exif_read['Exif.Image.ImageWidth'] == '1'
+        assert xmp_read['Xmp.dc.identifier'] == 'new-id'
+        assert xmp_read['Xmp.xmp.Identifier'] == ['new-id']
+        assert xmp_read['Xmp.photoshop.DateCreated'] == '1950-06-15T12:00:00'
+
+    def test_merges_existing_xmp(self, tmp_path):
+        """Test that an existing XMP packet is kept and updated."""
+        path = tmp_path / 'scan.tiff'
+        path.write_bytes(tiff_bytes())
+        with pyexiv2.Image(str(path)) as img:
+            img.modify_exif(EXIF)
+            img.modify_xmp({'Xmp.dc.identifier': 'old-id', 'Xmp.xmp.CreatorTool': 'Scanner 1.0'})
+
+        assert update_tiff_by_append(path, {'Exif.Image.DateTimeOriginal': '1951:07:16 13:31:01'}, XMP)
+
+        exif_read, xmp_read = read_metadata(path)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1951:07:16 13:31:01'
+        assert xmp_read['Xmp.dc.identifier'] == 'new-id'
+        assert xmp_read['Xmp.xmp.CreatorTool'] == 'Scanner 1.0'
+
+    def test_added_namespaces_keep_their_prefixes(self, tmp_path, monkeypatch):
+        """Test that properties in namespaces the packet lacks get their usual prefixes, set per packet."""
+        path = tmp_path / 'scan.tiff'
+        path.write_bytes(tiff_bytes())
+        with pyexiv2.Image(str(path)) as img:
+            img.modify_xmp({'Xmp.dc.identifier': 'old-id'})
+        monkeypatch.setattr(ET, 'register_namespace', pytest.fail)
+
+        xmp = dict(XMP, **{'Xmp.Iptc4xmpCore.DateCreated': '1950-06-15'})
+        assert update_tiff_by_append(path, EXIF, xmp)
+
+        with pyexiv2.Image(str(path)) as img:
+            raw = img.read_raw_xmp()
+        assert 'photoshop:DateCreated="1950-06-15T12:00:00"' in raw
+        assert 'Iptc4xmpCore:DateCreated="1950-06-15"' in raw
+        assert 'xmlns:photoshop="http://ns.adobe.com/photoshop/1.0/"' in raw
+        assert not re.search(r'\bns\d+:', raw)
+        assert read_metadata(path)[1]['Xmp.iptc.DateCreated'] == '1950-06-15'
+
+    def test_repeated_updates(self, tmp_path):
+        """Test that each update replaces the values of the previous one."""
+        path = tmp_path / 'scan.tiff'
+        path.write_bytes(tiff_bytes())
+
+        for number in range(3):
+            assert update_tiff_by_append(path, EXIF, {'Xmp.dc.identifier': f'id-{number}'})
+
+        _, xmp_read = read_metadata(path)
+        assert xmp_read['Xmp.dc.identifier'] == 'id-2'
+
+    @pytest.mark.parametrize('byte_order', ['<', '>'])
+    def test_bigtiff(self, tmp_path, byte_order):
+        """Test that BigTIFF files get a new IFD0 with 8-byte offsets."""
+        path = tmp_path / 'scan.tiff'
+        before = bigtiff_bytes(byte_order)
+        path.write_bytes(before)
+
+        assert update_tiff_by_append(path, EXIF, XMP)
+
+        after = path.read_bytes()
+        assert after[16:len(before)] == before[16:]
+        old, new = read_bigtiff_ifd0(before), read_bigtiff_ifd0(after)
+        assert {tag: new[tag] for tag in old} == old
+        assert new[0x9003] == (2, 20, b'1950:06:15 12:00:00\x00')
+        field_type, length, packet = new[XMP_TAG]
+        assert (field_type, length) == (1, len(packet))
+        assert b'new-id' in packet
+        assert list(new) == sorted(new)
+
+    @pytest.mark.parametrize('data', [
+        b'',
+        b'not a tiff at all',
+        b'II*\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00',  # no IFD0
+        b'II*\x00\xff\xff\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00',  # IFD0 beyond the end
+    ])
+    def test_not_a_tiff(self, tmp_path, data):
+        """Test that empty, foreign and damaged files are left alone."""
+        path = tmp_path / 'broken.tiff'
+        path.write_bytes(data)
+
+        assert update_tiff_by_append(path, EXIF, XMP) is None
+        assert path.read_bytes() == data
+
+    def test_unsupported_exif_key(self, tmp_path):
+        """Test that an EXIF key without a known IFD0 tag is not written."""
+        path = tmp_path / 'scan.tiff'
+        path.write_bytes(tiff_bytes())
+
+        assert update_tiff_by_append(path, {'Exif.Photo.UserComment': 'x'}, XMP) is None
+        assert path.read_bytes() == tiff_bytes()
+
+    def test_classic_offset_limit(self):
+        """Test that a classic TIFF is not grown past what 32-bit offsets address."""
+        layout = _Layout('little', 4, 2, 4)
+
+        assert _append_block(layout, {}, {XMP_TAG: (1, b'x' * 100)}, 0, 2**32 - 64) is None
+        assert _append_block(layout, {}, {XMP_TAG: (1, b'x' * 100)}, 0, 2**31) is not None
+
+
+class TestTiffProcessing:
+    """Test cases for PhotoNamingExifPlugin writing TIFF metadata."""
+
+    @pytest.fixture
+    def plugin(self):
+        """Create plugin instance."""
+        return PhotoNamingExifPlugin()
+
+    @pytest.mark.parametrize('config', [{}, {'metadata_mode': 'inplace'}])
+    def test_process_appends(self, plugin, make_image, tmp_path, caplog, config):
+        """Test that TIFFs are updated by appending a new IFD0."""
+        name = '1950.06.15.12.00.00.E.FAM.POR.000001.tiff'
+        path = make_image(name)
+
+        with caplog.at_level('DEBUG'):
+            assert plugin.process(str(path), config) is True
+
+        assert 'by appending a new IFD0' in caplog.text
+        moved = tmp_path / 'processed' / name
+        assert moved.read_bytes()[8:len(tiff_bytes())] == tiff_bytes()[8:]
+        exif_read, xmp_read = read_metadata(moved)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
+        assert xmp_read['Xmp.xmp.Identifier'] == [xmp_read['Xmp.dc.identifier']]
+
+    def test_process_falls_back(self, plugin, make_image, tmp_path, monkeypatch, caplog):
+        """Test that TIFFs the appender cannot handle are written with pyexiv2."""
+        name = '1950.06.15.12.00.00.E.FAM.POR.000002.tiff'
+        path = make_image(name)
+        monkeypatch.setattr('hump_yard_naming_exif.tiff.update_tiff_by_append', lambda *args: None)
+
+        with caplog.at_level('DEBUG'):
+            assert plugin.process(str(path), {}) is True
+
+        assert 'using pyexiv2' in caplog.text
+        exif_read, _ = read_metadata(tmp_path / 'processed' / name)
+        assert exif_read['Exif.Image.DateTimeOriginal'] == '1950:06:15 12:00:00'
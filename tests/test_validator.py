@@ -2,7 +2,7 @@
 
 import pytest
 from hump_yard_naming_exif.parser import FilenameParser, ParsedFilename
-from hump_yard_naming_exif.validator import FilenameValidator
+from hump_yard_naming_exif.validator import FilenameValidator, Violation
 
 
 class TestFilenameValidator:
@@ -126,3 +126,30 @@ class TestFilenameValidator:
         errors = validator.validate(parsed)
         # Validator uses max 29 days for February, so this should pass
         assert len(errors) == 0
+
+    def test_check_valid(self, validator, parser):
+        """Test check returns no flags for a valid filename."""
+        parsed = parser.parse('1950.06.15.12.30.45.E.FAM.POR.000001.tiff')
+        assert validator.check(parsed) == 0
+
+    def test_check_flags(self, validator, parser):
+        """Test check returns one flag per violated rule."""
+        parsed = parser.parse('1950.13.15.25.00.00.E.FAM.POR.000001.tiff')
+        violations = Violation(validator.check(parsed))
+        assert violations == Violation.MONTH_RANGE | Violation.DAY_RANGE | Violation.HOUR_RANGE
+
+    def test_check_zero_sequence_flags(self, validator, parser):
+        """Test check flags each zero sequence rule separately."""
+        parsed = parser.parse('1950.00.15.12.00.30.C.FAM.POR.000001.tiff')
+        violations = Violation(validator.check(parsed))
+        assert violations == (
+            Violation.MONTH_ZERO_DAY | Violation.MONTH_ZERO_TIME | Violation.MINUTE_ZERO_SECOND
+        )
+
+    def test_describe_matches_validate(self, validator, parser):
+        """Test describe renders the same messages as validate."""
+        parsed = parser.parse('1950.00.32.25.61.00.C.FAM.POR.000001.tiff')
+        messages = validator.describe(parsed, validator.check(parsed))
+        assert messages == validator.validate(parsed)
+        assert len(messages) == bin(validator.check(parsed)).count('1')
+